@@ -1,14 +1,116 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
+from django.db import transaction
+from django.db.models.functions import Substr
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+from django.utils.translation import gettext as _
+
+from .busca import get_backend
+from .cache import GRUPO_QUESTOES, memorizar
 from .models import Post
 from .models import Questao
 from .models import Vestibular
 from .models import Tema
+from .paginacao import PaginatorEstimado
+from .revisoes import garantir_revisao_inicial, registrar_revisao
+
+# Caracteres dos textos longos exibidos nas listagens do admin.
+TRECHO = 80
+
+
+class ListagemLeve(ChangeList):
+    """Adia os textos longos e carrega só o começo de ``campo_trecho``."""
+
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs).defer(*self.model_admin.campos_adiados)
+        if self.model_admin.campo_trecho:
+            queryset = queryset.annotate(trecho=Substr(self.model_admin.campo_trecho, 1, TRECHO + 1))
+        return queryset
+
+
+class AdminEscalavel(admin.ModelAdmin):
+    paginator = PaginatorEstimado
+    # Sem o segundo COUNT(*) da tabela inteira nas buscas e filtros.
+    show_full_result_count = False
+    campo_trecho = None
+    campos_adiados = ()
+
+    def get_changelist(self, request, **kwargs):
+        return ListagemLeve
+
+    def _trecho(self, obj):
+        return Truncator(obj.trecho).chars(TRECHO)
+
+    @admin.display(description=mark_safe('<input type="checkbox" id="action-toggle">'))
+    def action_checkbox(self, obj):
+        # O original usa str(obj) no aria-label, o que carregaria o campo
+        # adiado de cada linha em uma consulta separada.
+        rotulo = self._trecho(obj) if self.campo_trecho else obj
+        attrs = {'class': 'action-select',
+                 'aria-label': format_html(_('Select this object for an action - {}'), rotulo)}
+        checkbox = forms.CheckboxInput(attrs, lambda value: False)
+        return checkbox.render(helpers.ACTION_CHECKBOX_NAME, str(obj.pk))
+
+
+class AnoFilter(admin.SimpleListFilter):
+    # O filtro padrão faz um SELECT DISTINCT na tabela toda a cada página.
+    title = 'ano'
+    parameter_name = 'ano'
+
+    def lookups(self, request, model_admin):
+        anos = memorizar(GRUPO_QUESTOES, 'anos', lambda: list(
+            Questao.objects.order_by('-ano').values_list('ano', flat=True).distinct()
+        ))
+        return [(ano, ano) for ano in anos]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(ano=self.value())
+        return queryset
+
+
+class QuestaoAdmin(AdminEscalavel):
+    list_display = ('enunciado_resumido', 'vestibular', 'tema', 'ano',)
+    list_select_related = ('vestibular', 'tema')
+    # Cobertos pelos índices blog_questao_filtros_idx (a partir do
+    # vestibular), blog_questao_tema_ano_idx e blog_questao_ano_idx.
+    list_filter = ('vestibular', 'tema', AnoFilter)
+    search_fields = ('enunciado',)
+    campo_trecho = 'enunciado'
+    campos_adiados = ('enunciado', 'alternativas', 'resposta', 'variantes')
+
+    @admin.display(description='enunciado')
+    def enunciado_resumido(self, obj):
+        return self._trecho(obj)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Busca textual indexada (blog.busca) em vez de icontains.
+        if not search_term.strip():
+            return queryset, False
+        return get_backend().buscar(queryset, search_term), False
+
+
+class PostAdmin(AdminEscalavel):
+    list_display = ('titulo', 'autor', 'publicado_em', 'atualizado_em',)
+    list_select_related = ('autor',)
+    # Coberto pelo índice blog_post_publicado_id_idx.
+    list_filter = ('publicado_em',)
+    search_fields = ('titulo',)
+    campos_adiados = ('texto', 'texto_html', 'texto_plano', 'resumo')
 
+    def save_model(self, request, obj, form, change):
+        if change:
+            garantir_revisao_inicial(obj)
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            registrar_revisao(obj, request.user)
 
-class QuestaoAdmin(admin.ModelAdmin):
-    list_display = ('enunciado', 'ano',)
 
 admin.site.register(Questao, QuestaoAdmin)
-admin.site.register(Post)
+admin.site.register(Post, PostAdmin)
 admin.site.register(Vestibular)
 admin.site.register(Tema)
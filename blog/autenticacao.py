@@ -0,0 +1,60 @@
+"""
+Usuário autenticado guardado na memória do processo.
+
+A cada requisição o ``AuthenticationMiddleware`` busca o usuário da sessão
+em ``auth_user``. O ``BackendComCache`` guarda os campos do usuário por
+``CACHE_USUARIOS_TIMEOUT`` segundos, em um dicionário do próprio processo,
+e devolve uma instância nova a cada chamada, para que uma requisição não
+altere o objeto de outra.
+
+Salvar ou apagar o usuário limpa a entrada deste processo; nos demais ela
+expira sozinha, por isso o tempo deve ser curto.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db import router
+
+# Acima disso o dicionário é esvaziado, para não crescer sem limite.
+USUARIOS_MAXIMO = 1000
+
+_usuarios = {}
+_trava = threading.Lock()
+
+
+def esquecer_usuario(user_id):
+    with _trava:
+        _usuarios.pop(str(user_id), None)
+
+
+def esquecer_todos():
+    with _trava:
+        _usuarios.clear()
+
+
+class BackendComCache(ModelBackend):
+    def get_user(self, user_id):
+        timeout = settings.CACHE_USUARIOS_TIMEOUT
+        if timeout <= 0:
+            return super().get_user(user_id)
+
+        UserModel = get_user_model()
+        agora = time.monotonic()
+        guardado = _usuarios.get(str(user_id))
+        if guardado is not None and guardado[0] > agora:
+            _, banco, campos, valores = guardado
+            return UserModel.from_db(banco, campos, valores)
+
+        user = super().get_user(user_id)
+        if user is not None:
+            campos = [campo.attname for campo in UserModel._meta.concrete_fields]
+            valores = [getattr(user, campo) for campo in campos]
+            banco = user._state.db or router.db_for_read(UserModel)
+            with _trava:
+                if len(_usuarios) >= USUARIOS_MAXIMO:
+                    _usuarios.clear()
+                _usuarios[str(user_id)] = (agora + timeout, banco, campos, valores)
+        return user
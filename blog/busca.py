@@ -0,0 +1,176 @@
+"""
+Busca textual no banco de questões.
+
+O backend é escolhido pelo banco em uso (ou por ``settings.BUSCA_BACKEND``):
+
+* PostgreSQL: coluna ``tsvector`` gerada com a configuração ``portuguese``
+  e índice GIN; a relevância vem de ``ts_rank``.
+* SQLite: tabela FTS5 de conteúdo externo, mantida em sincronia por
+  triggers; a relevância vem de ``bm25``.
+* Outros bancos: ``icontains``, sem índice, só para não quebrar.
+
+Cada backend sabe instalar as próprias estruturas (``instalar``), o que é
+feito pela migração e repetido no ``post_migrate``: o SQLite recria a
+tabela em várias alterações de schema e descarta os triggers junto.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Value, FloatField
+from django.utils.module_loading import import_string
+
+from .models import Questao
+
+
+class BuscaBackend:
+    def instalar(self, schema_editor):
+        """Cria índices/tabelas auxiliares; deve ser idempotente."""
+
+    def desinstalar(self, schema_editor):
+        """Desfaz ``instalar``."""
+
+    def buscar(self, queryset, termo):
+        """Filtra ``queryset`` por ``termo`` e anota ``relevancia``."""
+        raise NotImplementedError
+
+
+class ContemBusca(BuscaBackend):
+
+    def buscar(self, queryset, termo):
+        filtro = Q()
+        for palavra in termo.split():
+            filtro &= (Q(enunciado__icontains=palavra) | Q(alternativas__icontains=palavra)
+                       | Q(resposta__icontains=palavra))
+        return (queryset.filter(filtro)
+                .annotate(relevancia=Value(0.0, output_field=FloatField()))
+                .order_by('-id'))
+
+
+class PostgresBusca(BuscaBackend):
+    config = 'portuguese'
+
+    def instalar(self, schema_editor):
+        tabela = Questao._meta.db_table
+        schema_editor.execute(f"""
+            ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS busca tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('{self.config}', coalesce(enunciado, '')), 'A') ||
+                setweight(to_tsvector('{self.config}', coalesce(alternativas, '')), 'B') ||
+                setweight(to_tsvector('{self.config}', coalesce(resposta, '')), 'C')
+            ) STORED
+        """)
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {tabela}_busca_idx ON {tabela} USING GIN (busca)"
+        )
+
+    def desinstalar(self, schema_editor):
+        tabela = Questao._meta.db_table
+        schema_editor.execute(f"DROP INDEX IF EXISTS {tabela}_busca_idx")
+        schema_editor.execute(f"ALTER TABLE {tabela} DROP COLUMN IF EXISTS busca")
+
+    def buscar(self, queryset, termo):
+        tabela = Questao._meta.db_table
+        consulta = f"websearch_to_tsquery('{self.config}', %s)"
+        return queryset.extra(
+            select={'relevancia': f"ts_rank({tabela}.busca, {consulta})"},
+            select_params=[termo],
+            where=[f"{tabela}.busca @@ {consulta}"],
+            params=[termo],
+        ).order_by('-relevancia', '-id')
+
+
+class SqliteBusca(BuscaBackend):
+    # Pesos do bm25 para enunciado, alternativas e resposta.
+    pesos = (10.0, 5.0, 1.0)
+    campos = ('enunciado', 'alternativas', 'resposta')
+
+    @property
+    def tabela_fts(self):
+        return f'{Questao._meta.db_table}_fts'
+
+    def instalar(self, schema_editor):
+        tabela = Questao._meta.db_table
+        fts = self.tabela_fts
+        colunas = ', '.join(self.campos)
+        novos = ', '.join(f'new.{campo}' for campo in self.campos)
+        antigos = ', '.join(f'old.{campo}' for campo in self.campos)
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f'{fts}_%'],
+            )
+            if cursor.fetchone()[0] == 3:
+                return
+
+        schema_editor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {colunas}, content='{tabela}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabela} BEGIN
+                INSERT INTO {fts}(rowid, {colunas}) VALUES (new.id, {novos});
+            END
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabela} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {colunas}) VALUES ('delete', old.id, {antigos});
+            END
+        """)
+        schema_editor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {tabela} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {colunas}) VALUES ('delete', old.id, {antigos});
+                INSERT INTO {fts}(rowid, {colunas}) VALUES (new.id, {novos});
+            END
+        """)
+        # Os triggers podem ter sumido com linhas já alteradas: reindexa tudo.
+        schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+    def desinstalar(self, schema_editor):
+        fts = self.tabela_fts
+        for sufixo in ('ai', 'ad', 'au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}_{sufixo}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+    def buscar(self, queryset, termo):
+        palavras = re.findall(r'\w+', termo)
+        if not palavras:
+            return queryset.none()
+        # Cada palavra entre aspas: o usuário não consegue injetar a sintaxe do FTS5.
+        consulta = ' '.join(f'"{palavra}"' for palavra in palavras)
+        tabela = Questao._meta.db_table
+        fts = self.tabela_fts
+        pesos = ', '.join(str(peso) for peso in self.pesos)
+        return queryset.extra(
+            select={'relevancia': f"-bm25({fts}, {pesos})"},
+            tables=[fts],
+            where=[f"{fts}.rowid = {tabela}.id", f"{fts} MATCH %s"],
+            params=[consulta],
+        ).order_by('-relevancia', '-id')
+
+
+BACKENDS = {
+    'postgresql': 'blog.busca.PostgresBusca',
+    'sqlite': 'blog.busca.SqliteBusca',
+}
+
+
+def get_backend(conexao=None):
+    caminho = getattr(settings, 'BUSCA_BACKEND', None)
+    if not caminho:
+        vendor = (conexao or connection).vendor
+        caminho = BACKENDS.get(vendor, 'blog.busca.ContemBusca')
+    return import_string(caminho)()
+
+
+def buscar_questoes(termo, vestibular=None, tema=None, ano=None):
+    """Questões que casam com ``termo``, da mais para a menos relevante."""
+    termo = (termo or '').strip()
+    questoes = Questao.objects.select_related('vestibular', 'tema').filtrar(
+        vestibular=vestibular, tema=tema, ano=ano,
+    )
+    if not termo:
+        return questoes.none()
+    return get_backend().buscar(questoes, termo)
@@ -0,0 +1,190 @@
+"""
+Cache das páginas públicas renderizadas.
+
+Cada página pertence a um grupo (a listagem de posts ou um post
+específico). O grupo tem uma versão guardada no próprio cache e a versão
+faz parte da chave das páginas; invalidar um grupo é só trocar a versão,
+o que funciona igual no locmem, no file e no Redis.
+
+A hora da última invalidação de cada grupo também fica guardada, para o
+``Last-Modified`` perceber remoções, e ``memorizar`` guarda valores
+derivados do banco (como os validadores do GET condicional) enquanto a
+versão do grupo não mudar.
+
+``cache_pagina`` e ``condicional`` aceitam views síncronas e assíncronas.
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+GRUPO_LISTA = 'lista'
+GRUPO_QUESTOES = 'questoes'
+
+
+def grupo_post(pk):
+    return f'post:{pk}'
+
+
+def _chave_versao(grupo):
+    return f'blog:versao:{grupo}'
+
+
+def versao(grupo):
+    chave = _chave_versao(grupo)
+    atual = cache.get(chave)
+    if atual is None:
+        cache.add(chave, uuid.uuid4().hex, None)
+        atual = cache.get(chave)
+    return atual
+
+
+async def aversao(grupo):
+    chave = _chave_versao(grupo)
+    atual = await cache.aget(chave)
+    if atual is None:
+        await cache.aadd(chave, uuid.uuid4().hex, None)
+        atual = await cache.aget(chave)
+    return atual
+
+
+def _chave_modificado(grupo):
+    return f'blog:modificado:{grupo}'
+
+
+def invalidar(*grupos):
+    # Uma versão nova (e não um contador) evita reaproveitar páginas antigas
+    # se a chave da versão for descartada pelo cache.
+    agora = timezone.now()
+    valores = {}
+    for grupo in grupos:
+        valores[_chave_versao(grupo)] = uuid.uuid4().hex
+        valores[_chave_modificado(grupo)] = agora
+    cache.set_many(valores, None)
+
+
+def modificado_em(grupo):
+    """Hora da última invalidação do grupo, se o cache ainda a tiver."""
+    return cache.get(_chave_modificado(grupo))
+
+
+def memorizar(grupo, nome, calcular, timeout=None):
+    """
+    Devolve ``calcular()``, guardado no cache até o grupo ser invalidado.
+
+    ``timeout`` pode ser uma função sem argumentos, chamada só quando o
+    valor precisa ser calculado. ``None`` nunca é guardado.
+    """
+    chave = f'blog:valor:{grupo}:{versao(grupo)}:{nome}'
+    valor = cache.get(chave)
+    if valor is None:
+        valor = calcular()
+        segundos = settings.CACHE_PAGINAS_TIMEOUT
+        if timeout is not None:
+            segundos = min(segundos, timeout() if callable(timeout) else timeout)
+        if valor is not None and segundos > 0:
+            cache.set(chave, valor, segundos)
+    return valor
+
+
+def invalidar_post(pk):
+    invalidar(GRUPO_LISTA, grupo_post(pk))
+
+
+def _chave_pagina(request, grupo, versao_grupo):
+    caminho = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:pagina:{grupo}:{versao_grupo}:{request.method}:{caminho}'
+
+
+def _guardar(response):
+    return response.status_code == 200 and not response.streaming and not response.cookies
+
+
+def cache_pagina(grupo, timeout=None):
+    """
+    Guarda a resposta da view para usuários anônimos.
+
+    ``grupo`` é o nome do grupo ou uma função que o recebe a partir dos
+    argumentos da view. ``timeout`` pode ser uma função dos mesmos
+    argumentos que devolve em quantos segundos a página deve expirar.
+    Em views async, ``timeout`` roda em thread e pode consultar o banco.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def ainner(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or (await request.auser()).is_authenticated:
+                    return await view(request, *args, **kwargs)
+
+                nome = grupo(request, *args, **kwargs) if callable(grupo) else grupo
+                chave = _chave_pagina(request, nome, await aversao(nome))
+                guardada = await cache.aget(chave)
+                if guardada is not None:
+                    conteudo, content_type = guardada
+                    return HttpResponse(conteudo, content_type=content_type)
+
+                response = await view(request, *args, **kwargs)
+                if _guardar(response):
+                    segundos = settings.CACHE_PAGINAS_TIMEOUT
+                    if timeout is not None:
+                        segundos = min(segundos, await sync_to_async(timeout)(request, *args, **kwargs))
+                    if segundos > 0:
+                        await cache.aset(chave, (response.content, response['Content-Type']), segundos)
+                return response
+            return ainner
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            nome = grupo(request, *args, **kwargs) if callable(grupo) else grupo
+            chave = _chave_pagina(request, nome, versao(nome))
+            guardada = cache.get(chave)
+            if guardada is not None:
+                conteudo, content_type = guardada
+                return HttpResponse(conteudo, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if _guardar(response):
+                segundos = settings.CACHE_PAGINAS_TIMEOUT
+                if timeout is not None:
+                    segundos = min(segundos, timeout(request, *args, **kwargs))
+                if segundos > 0:
+                    cache.set(chave, (response.content, response['Content-Type']), segundos)
+            return response
+        return inner
+    return decorator
+
+
+def condicional(etag_func=None, last_modified_func=None):
+    """
+    O ``condition`` do Django, também para views async.
+
+    O ``condition`` chama as funções de validação direto no loop de eventos,
+    onde o ORM síncrono não pode ser usado; aqui elas rodam juntas em uma
+    thread e o resultado é repassado ao ``condition``.
+    """
+    def decorator(view):
+        if not iscoroutinefunction(view):
+            return condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        def validadores(request, *args, **kwargs):
+            return (etag_func(request, *args, **kwargs) if etag_func else None,
+                    last_modified_func(request, *args, **kwargs) if last_modified_func else None)
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag, last_modified = await sync_to_async(validadores)(request, *args, **kwargs)
+            return await condition(
+                etag_func=etag_func and (lambda *a, **k: etag),
+                last_modified_func=last_modified_func and (lambda *a, **k: last_modified),
+            )(view)(request, *args, **kwargs)
+        return inner
+    return decorator
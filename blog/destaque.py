@@ -0,0 +1,70 @@
+"""
+Destaque de sintaxe dos blocos de código dos posts, feito com o Pygments
+quando o post é salvo.
+
+Reconhece os blocos no formato do Quill 2 (``div.ql-code-block-container``
+com uma ``div.ql-code-block`` por linha) e ``<pre>`` / ``<pre><code>``
+(Quill 1 e HTML colado). O restante do HTML não é alterado.
+"""
+import html
+import re
+
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import TextLexer, get_lexer_by_name
+from pygments.util import ClassNotFound
+
+# Mesmo tema que o highlight.js usava (atom-one-dark).
+FORMATADOR = HtmlFormatter(cssclass='highlight', wrapcode=True, style='one-dark')
+
+# Uma única expressão para os dois formatos, para que o <pre> gerado para
+# um bloco do Quill não seja processado de novo.
+_BLOCO = re.compile(
+    r'<div class="ql-code-block-container"[^>]*>\s*(?:<select[^>]*>.*?</select>)?'
+    r'(?P<linhas>(?:\s*<div class="ql-code-block"[^>]*>.*?</div>)+)\s*</div>'
+    r'|<pre(?P<pre>\s[^>]*)?>\s*(?:<code(?P<code>[^>]*)>)?(?P<conteudo>.*?)(?:</code>\s*)?</pre>',
+    re.DOTALL,
+)
+_LINHA_QUILL = re.compile(r'<div class="ql-code-block"([^>]*)>(.*?)</div>', re.DOTALL)
+_LINGUAGEM = re.compile(r'(?:data-language="|class="[^"]*\blanguage-)([\w+#-]+)')
+_QUEBRA = re.compile(r'<br\s*/?>')
+_TAG = re.compile(r'<[^>]+>')
+
+
+def _texto(trecho):
+    """Código puro, sem o markup do editor (spans do highlight.js etc.)."""
+    return html.unescape(_TAG.sub('', _QUEBRA.sub('\n', trecho)))
+
+
+def _linguagem(*atributos):
+    for atributo in atributos:
+        encontrada = _LINGUAGEM.search(atributo or '')
+        if encontrada:
+            return encontrada.group(1)
+    return None
+
+
+def _destacar(codigo, linguagem):
+    try:
+        lexer = get_lexer_by_name(linguagem) if linguagem else TextLexer()
+    except ClassNotFound:
+        lexer = TextLexer()
+    return highlight(codigo, lexer, FORMATADOR)
+
+
+def _bloco(match):
+    if match.group('linhas') is not None:
+        linhas = _LINHA_QUILL.findall(match.group('linhas'))
+        codigo = '\n'.join(_texto(conteudo).rstrip('\n') for _, conteudo in linhas)
+        return _destacar(codigo, _linguagem(linhas[0][0]))
+    return _destacar(_texto(match.group('conteudo')), _linguagem(match.group('code'), match.group('pre')))
+
+
+def destacar_codigo(texto):
+    """Devolve ``texto`` com os blocos de código já destacados."""
+    return _BLOCO.sub(_bloco, texto)
+
+
+def estilos():
+    """CSS do tema usado em ``FORMATADOR`` (gera ``css/pygments.css``)."""
+    return FORMATADOR.get_style_defs('.highlight')
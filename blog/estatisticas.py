@@ -0,0 +1,74 @@
+"""
+Registro das respostas dos alunos.
+
+Cada lote de respostas vira um ``bulk_create`` de ``Tentativa`` e alguns
+``UPDATE ... SET tentativas = tentativas + n`` em ``Estatistica`` (por
+questão, tema, vestibular e usuário), na mesma transação. Os painéis leem
+esses contadores em vez de agregar as tentativas.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import Estatistica, Questao, Tentativa
+
+Tipo = Estatistica.Tipo
+
+
+def _normalizar(resposta):
+    return ' '.join(resposta.split()).casefold()
+
+
+def _incrementar(contagens):
+    """Soma ``{(tipo, chave): [tentativas, acertos]}`` aos contadores."""
+    Estatistica.objects.bulk_create(
+        [Estatistica(tipo=tipo, chave=chave) for tipo, chave in contagens],
+        ignore_conflicts=True,
+    )
+    # Um UPDATE por par de incrementos: num lote quase todas as linhas
+    # recebem (1, 0) ou (1, 1).
+    por_incremento = defaultdict(lambda: defaultdict(list))
+    for (tipo, chave), incremento in contagens.items():
+        por_incremento[tuple(incremento)][tipo].append(chave)
+    for (tentativas, acertos), por_tipo in por_incremento.items():
+        filtro = Q()
+        for tipo, chaves in por_tipo.items():
+            filtro |= Q(tipo=tipo, chave__in=chaves)
+        Estatistica.objects.filter(filtro).update(
+            tentativas=F('tentativas') + tentativas,
+            acertos=F('acertos') + acertos,
+        )
+
+
+def registrar_respostas(respostas, usuario=None):
+    """
+    Grava as ``respostas`` (pares ``(questao_id, resposta)``) e atualiza os
+    contadores. Questões inexistentes são ignoradas; devolve as tentativas.
+    """
+    if usuario is not None and not usuario.is_authenticated:
+        usuario = None
+    ids = {questao_id for questao_id, _ in respostas}
+    questoes = Questao.objects.only('id', 'resposta', 'tema_id', 'vestibular_id').in_bulk(ids)
+
+    tentativas = []
+    contagens = defaultdict(lambda: [0, 0])
+    for questao_id, resposta in respostas:
+        questao = questoes.get(questao_id)
+        if questao is None:
+            continue
+        correta = _normalizar(resposta) == _normalizar(questao.resposta)
+        tentativas.append(Tentativa(usuario=usuario, questao=questao, resposta=resposta, correta=correta))
+        chaves = [(Tipo.QUESTAO, questao.pk), (Tipo.TEMA, questao.tema_id),
+                  (Tipo.VESTIBULAR, questao.vestibular_id)]
+        if usuario is not None:
+            chaves.append((Tipo.USUARIO, usuario.pk))
+        for chave in chaves:
+            contagens[chave][0] += 1
+            contagens[chave][1] += correta
+
+    if tentativas:
+        with transaction.atomic():
+            Tentativa.objects.bulk_create(tentativas)
+            _incrementar(contagens)
+    return tentativas
@@ -0,0 +1,151 @@
+"""
+Exportação do banco de questões em JSONL, CSV ou ZIP (JSONL e imagens).
+
+Tudo é gerado aos pedaços: as questões vêm do banco com ``.iterator()``,
+as imagens são lidas do storage em blocos e o ZIP é escrito em um buffer
+esvaziado a cada bloco, então a memória não cresce com a exportação.
+Sob ASGI é preciso usar ``aexportar``: o Django 5.0 junta em uma lista
+todo o conteúdo de um gerador síncrono antes de enviar a resposta. Os
+campos são os que ``import_questoes`` lê, com vestibular e tema pelo nome.
+"""
+import csv
+import json
+import logging
+import time
+import zipfile
+
+from asgiref.sync import sync_to_async
+from django.core.files.storage import default_storage
+
+from .models import Questao
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = ('jsonl', 'csv', 'zip')
+TIPOS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+    'zip': 'application/zip',
+}
+CAMPOS = ('id', 'enunciado', 'alternativas', 'ano', 'resposta', 'vestibular', 'tema', 'imagem')
+# Questões lidas do banco por vez.
+TAMANHO_LOTE = 2000
+# Bytes acumulados antes de entregar um pedaço da resposta.
+TAMANHO_BLOCO = 64 * 1024
+
+
+def _questoes(filtros):
+    return Questao.objects.filtrar(**filtros).order_by('id')
+
+
+def _registros(filtros, tamanho_lote):
+    linhas = _questoes(filtros).values_list(
+        'id', 'enunciado', 'alternativas', 'ano', 'resposta', 'vestibular__nome', 'tema__nome', 'imagem')
+    for linha in linhas.iterator(chunk_size=tamanho_lote):
+        yield dict(zip(CAMPOS, linha))
+
+
+def _em_blocos(textos):
+    """Junta os textos em blocos de ``TAMANHO_BLOCO`` bytes."""
+    bloco = []
+    tamanho = 0
+    for texto in textos:
+        dados = texto.encode()
+        bloco.append(dados)
+        tamanho += len(dados)
+        if tamanho >= TAMANHO_BLOCO:
+            yield b''.join(bloco)
+            bloco = []
+            tamanho = 0
+    if bloco:
+        yield b''.join(bloco)
+
+
+def exportar_jsonl(filtros, tamanho_lote=TAMANHO_LOTE):
+    return _em_blocos(json.dumps(registro, ensure_ascii=False) + '\n'
+                      for registro in _registros(filtros, tamanho_lote))
+
+
+class _Eco:
+    """Arquivo falso para o ``csv.writer``: devolve a linha em vez de gravá-la."""
+
+    def write(self, valor):
+        return valor
+
+
+def exportar_csv(filtros, tamanho_lote=TAMANHO_LOTE):
+    escritor = csv.writer(_Eco())
+
+    def linhas():
+        yield escritor.writerow(CAMPOS)
+        for registro in _registros(filtros, tamanho_lote):
+            yield escritor.writerow(registro.values())
+
+    return _em_blocos(linhas())
+
+
+class _Buffer:
+    """Destino do ZIP sem seek; o zipfile grava com descritores de dados."""
+
+    def __init__(self):
+        self.pedacos = []
+
+    def write(self, dados):
+        self.pedacos.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def esvaziar(self):
+        dados = b''.join(self.pedacos)
+        self.pedacos = []
+        return dados
+
+
+def exportar_zip(filtros, tamanho_lote=TAMANHO_LOTE):
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as arquivo:
+        with arquivo.open('questoes.jsonl', 'w', force_zip64=True) as destino:
+            for bloco in exportar_jsonl(filtros, tamanho_lote):
+                destino.write(bloco)
+                yield buffer.esvaziar()
+
+        # Cada imagem uma vez, no mesmo caminho do storage, para o
+        # import_questoes encontrá-la depois de extraída no MEDIA_ROOT.
+        imagens = (_questoes(filtros).exclude(imagem__isnull=True).exclude(imagem='')
+                   .order_by('imagem').values_list('imagem', flat=True).distinct())
+        for nome in imagens.iterator(chunk_size=tamanho_lote):
+            try:
+                origem = default_storage.open(nome, 'rb')
+            except OSError:
+                logger.warning("Imagem não encontrada na exportação: %s", nome)
+                continue
+            info = zipfile.ZipInfo(nome, date_time=time.localtime()[:6])
+            # JPEG, PNG e WebP já são comprimidos.
+            info.compress_type = zipfile.ZIP_STORED
+            with origem, arquivo.open(info, 'w', force_zip64=True) as destino:
+                for bloco in origem.chunks(TAMANHO_BLOCO):
+                    destino.write(bloco)
+                    yield buffer.esvaziar()
+    yield buffer.esvaziar()
+
+
+def exportar(formato, filtros, tamanho_lote=TAMANHO_LOTE):
+    """Gerador de ``bytes`` com as questões filtradas no ``formato`` pedido."""
+    geradores = {'jsonl': exportar_jsonl, 'csv': exportar_csv, 'zip': exportar_zip}
+    if formato not in geradores:
+        raise ValueError(f"Formato desconhecido: {formato}")
+    return (bloco for bloco in geradores[formato](filtros, tamanho_lote) if bloco)
+
+
+async def aexportar(formato, filtros, tamanho_lote=TAMANHO_LOTE):
+    """Versão assíncrona de ``exportar``, que gera cada bloco em uma thread."""
+    blocos = exportar(formato, filtros, tamanho_lote)
+    # thread_sensitive: o cursor do banco fica sempre na mesma thread.
+    proximo = sync_to_async(next, thread_sensitive=True)
+    try:
+        while (bloco := await proximo(blocos, None)) is not None:
+            yield bloco
+    finally:
+        await sync_to_async(blocos.close, thread_sensitive=True)()
@@ -0,0 +1,49 @@
+"""
+Feeds RSS e Atom dos posts publicados.
+
+O texto de cada item é o ``resumo``, calculado uma vez quando o post é
+salvo; o XML pronto fica no cache da listagem (ver ``blog.views``).
+"""
+from django.contrib.syndication.views import Feed
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed
+
+from .models import Post
+
+FEED_POSTS = 20
+
+
+class UltimosPostsRss(Feed):
+    title = "Prof Vitor"
+    link = reverse_lazy('post_list')
+    description = "Últimos posts do blog do Prof Vitor."
+
+    def items(self):
+        return (Post.objects.filter(publicado_em__lte=timezone.now())
+                .select_related('autor')
+                .only('id', 'titulo', 'resumo', 'publicado_em', 'atualizado_em', 'autor__username')
+                .order_by('-publicado_em', '-id')[:FEED_POSTS])
+
+    def item_title(self, item):
+        return item.titulo
+
+    def item_description(self, item):
+        return item.resumo
+
+    def item_link(self, item):
+        return reverse('post_detail', args=[item.pk])
+
+    def item_author_name(self, item):
+        return item.autor.get_username()
+
+    def item_pubdate(self, item):
+        return item.publicado_em
+
+    def item_updateddate(self, item):
+        return item.atualizado_em
+
+
+class UltimosPostsAtom(UltimosPostsRss):
+    feed_type = Atom1Feed
+    subtitle = UltimosPostsRss.description
@@ -0,0 +1,145 @@
+"""
+Variantes redimensionadas das imagens das questões.
+
+Para cada largura em ``LARGURAS`` menor que a original são gravadas uma
+miniatura no formato da imagem (JPEG/PNG) e uma versão WebP, em uma pasta
+própria da questão (``PASTA_VARIANTES/<id>/``), onde nenhum envio cai. O
+storage escolhe nomes livres, então nada é sobrescrito, e só os arquivos
+registrados em ``Questao.variantes`` são apagados. O processamento roda em um pool de threads, fora da
+requisição, depois que a transação que salvou a questão for confirmada.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from PIL import Image, ImageOps
+
+from .models import Questao
+
+logger = logging.getLogger(__name__)
+
+LARGURAS = (320, 640, 1280)
+QUALIDADE_WEBP = 80
+QUALIDADE_JPEG = 85
+# Os envios ficam direto em img/questao/ (Questao.imagem.upload_to), nunca
+# em uma subpasta.
+PASTA_VARIANTES = 'img/questao/variantes'
+
+_executor = None
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.IMAGENS_WORKERS,
+                                       thread_name_prefix='variantes')
+    return _executor
+
+
+def _caminho(questao_id, largura, extensao):
+    return f'{PASTA_VARIANTES}/{questao_id}/{largura}.{extensao}'
+
+
+def _gravar(caminho, imagem, formato, **opcoes):
+    buffer = BytesIO()
+    imagem.save(buffer, format=formato, **opcoes)
+    # Se o nome estiver ocupado (variantes anteriores, ainda em uso até o
+    # update), o storage acrescenta um sufixo em vez de sobrescrever.
+    return default_storage.save(caminho, ContentFile(buffer.getvalue()))
+
+
+def criar_variantes(nome, questao_id):
+    """
+    Gera as variantes do arquivo ``nome`` do storage, na pasta da questão
+    ``questao_id``, e devolve o dicionário guardado em ``Questao.variantes``.
+    """
+    with default_storage.open(nome, 'rb') as arquivo:
+        imagem = Image.open(arquivo)
+        # A imagem girada pelo exif_transpose é uma cópia, sem ``format``.
+        formato_original = imagem.format
+        imagem = ImageOps.exif_transpose(imagem)
+        imagem.load()
+
+    if formato_original == 'PNG' or imagem.mode in ('RGBA', 'LA', 'P'):
+        formato, extensao, opcoes = 'PNG', 'png', {'optimize': True}
+        imagem = imagem.convert('RGBA')
+    else:
+        formato, extensao, opcoes = 'JPEG', 'jpg', {'quality': QUALIDADE_JPEG, 'optimize': True, 'progressive': True}
+        imagem = imagem.convert('RGB')
+
+    variantes = {'origem': nome, 'largura': imagem.width, 'miniaturas': {}, 'webp': {}}
+    # A original também entra no WebP, para servir telas largas sem o arquivo bruto.
+    larguras = [largura for largura in LARGURAS if largura < imagem.width] + [imagem.width]
+    for largura in larguras:
+        if largura == imagem.width:
+            redimensionada = imagem
+        else:
+            altura = round(imagem.height * largura / imagem.width)
+            redimensionada = imagem.resize((largura, altura), Image.LANCZOS)
+            variantes['miniaturas'][str(largura)] = _gravar(
+                _caminho(questao_id, largura, extensao), redimensionada, formato, **opcoes)
+        variantes['webp'][str(largura)] = _gravar(
+            _caminho(questao_id, largura, 'webp'), redimensionada, 'WEBP', quality=QUALIDADE_WEBP)
+    return variantes
+
+
+def _arquivos(variantes):
+    return {caminho for tipo in ('miniaturas', 'webp') for caminho in variantes.get(tipo, {}).values()}
+
+
+def apagar_variantes(variantes, manter=()):
+    """Apaga do storage os arquivos de ``variantes`` que não estão em ``manter``."""
+    caminhos = _arquivos(variantes) - set(manter)
+    # Variantes antigas ficavam ao lado dos envios, com nomes que um envio
+    # podia repetir; um arquivo que é a imagem de alguma questão fica.
+    caminhos -= set(Questao.objects.filter(imagem__in=caminhos).values_list('imagem', flat=True))
+    for caminho in caminhos:
+        try:
+            default_storage.delete(caminho)
+        except OSError:
+            logger.warning("Não foi possível apagar a variante %s", caminho)
+
+
+def processar_questao(questao_id, forcar=False):
+    """Gera e registra as variantes de uma questão; devolve se houve trabalho."""
+    questao = Questao.objects.only('id', 'imagem', 'variantes').get(pk=questao_id)
+    if not questao.imagem:
+        return False
+    if not forcar and questao.variantes.get('origem') == questao.imagem.name:
+        return False
+    variantes = criar_variantes(questao.imagem.name, questao_id)
+    # update() não dispara post_save, então não agenda o trabalho de novo;
+    # o filtro por imagem descarta o resultado se ela mudou no meio tempo.
+    if Questao.objects.filter(pk=questao_id, imagem=questao.imagem.name).update(variantes=variantes):
+        # As variantes anteriores (de outra imagem ou de outras larguras)
+        # deixaram de ser usadas.
+        apagar_variantes(questao.variantes, manter=_arquivos(variantes))
+    else:
+        apagar_variantes(variantes, manter=_arquivos(questao.variantes))
+    return True
+
+
+def processar_em_thread(questao_id, forcar=False):
+    """Versão de ``processar_questao`` para threads de um pool."""
+    try:
+        return processar_questao(questao_id, forcar=forcar)
+    except Exception:
+        logger.exception("Falha ao gerar variantes da questão %s", questao_id)
+        return False
+    finally:
+        # Cada thread abre sua própria conexão com o banco.
+        connections.close_all()
+
+
+def agendar_variantes(questao_id):
+    if settings.IMAGENS_ASSINCRONO:
+        _pool().submit(processar_em_thread, questao_id)
+    else:
+        try:
+            processar_questao(questao_id)
+        except Exception:
+            logger.exception("Falha ao gerar variantes da questão %s", questao_id)
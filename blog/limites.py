@@ -0,0 +1,114 @@
+"""
+Limite de tentativas de login, contado no cache.
+
+Cada tentativa soma um nos contadores do IP e do nome de usuário antes do
+``authenticate()``; acima do limite a tentativa é recusada sem calcular o
+hash da senha. A janela é deslizante, aproximada por duas janelas fixas:
+a contagem da anterior entra proporcional ao tempo que ainda se sobrepõe
+à janela atual.
+
+Os contadores usam o ``incr``/``decr`` síncrono do cache, atômico e sem
+mexer no tempo de expiração no locmem, no memcached e no Redis (as versões
+async do Django 5.0 são um ``get`` seguido de ``set`` com o timeout padrão).
+
+Um login bem-sucedido devolve a tentativa do IP e zera a do usuário, para
+que só as falhas consumam o limite.
+"""
+import hashlib
+import logging
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('blog.limites')
+
+ESCOPOS = ('ip', 'usuario')
+
+
+def _identificadores(request, username):
+    usuario = username.strip().lower()
+    return {
+        'ip': request.META.get('REMOTE_ADDR') or 'desconhecido',
+        # O hash mantém a chave válida no memcached (sem espaços, tamanho fixo).
+        'usuario': hashlib.md5(usuario.encode()).hexdigest(),
+    }
+
+
+def _limites():
+    return {'ip': settings.LOGIN_LIMITE_IP, 'usuario': settings.LOGIN_LIMITE_USUARIO}
+
+
+def _chave(escopo, identificador, janela):
+    return f'blog:login:{escopo}:{identificador}:{janela}'
+
+
+def _chave_rejeitadas(escopo):
+    return f'blog:login:rejeitadas:{escopo}'
+
+
+def _incrementar(chave, timeout):
+    cache.add(chave, 0, timeout)
+    try:
+        return cache.incr(chave)
+    except ValueError:
+        # Expirou entre o add e o incr.
+        cache.set(chave, 1, timeout)
+        return 1
+
+
+def _decrementar(chave):
+    try:
+        if cache.get(chave, 0) > 0:
+            cache.decr(chave)
+    except ValueError:
+        pass
+
+
+_aincrementar = sync_to_async(_incrementar)
+_adecrementar = sync_to_async(_decrementar)
+
+
+async def aregistrar_tentativa(request, username):
+    """
+    Conta a tentativa e devolve ``None`` se ela pode seguir, ou os segundos
+    sugeridos para o ``Retry-After`` se algum limite foi excedido.
+    """
+    duracao = settings.LOGIN_JANELA
+    janela, decorrido = divmod(time.time(), duracao)
+    janela = int(janela)
+    peso_anterior = 1 - decorrido / duracao
+    limites = _limites()
+    excedidos = []
+    for escopo, identificador in _identificadores(request, username).items():
+        atual = await _aincrementar(_chave(escopo, identificador, janela), 2 * duracao)
+        anterior = await cache.aget(_chave(escopo, identificador, janela - 1), 0)
+        if anterior * peso_anterior + atual > limites[escopo]:
+            excedidos.append(escopo)
+
+    if not excedidos:
+        return None
+    for escopo in excedidos:
+        await _aincrementar(_chave_rejeitadas(escopo), None)
+    logger.info("Login recusado (%s): ip=%s", ', '.join(excedidos), request.META.get('REMOTE_ADDR'))
+    return max(1, math.ceil(duracao - decorrido))
+
+
+async def aregistrar_sucesso(request, username):
+    janela = int(time.time() // settings.LOGIN_JANELA)
+    identificadores = _identificadores(request, username)
+    await _adecrementar(_chave('ip', identificadores['ip'], janela))
+    await cache.adelete_many([_chave('usuario', identificadores['usuario'], janela),
+                              _chave('usuario', identificadores['usuario'], janela - 1)])
+
+
+def rejeicoes():
+    """Tentativas recusadas por escopo desde a última ``zerar_rejeicoes``."""
+    valores = cache.get_many([_chave_rejeitadas(escopo) for escopo in ESCOPOS])
+    return {escopo: valores.get(_chave_rejeitadas(escopo), 0) for escopo in ESCOPOS}
+
+
+def zerar_rejeicoes():
+    cache.delete_many([_chave_rejeitadas(escopo) for escopo in ESCOPOS])
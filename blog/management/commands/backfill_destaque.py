@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import grupo_post, invalidar
+from blog.destaque import destacar_codigo
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Refaz o destaque de sintaxe (texto_html) de todos os posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Quantidade de posts atualizados por consulta.")
+
+    def handle(self, *args, **options):
+        tamanho = options['batch_size']
+        lote = []
+        total = 0
+        for post in Post.objects.only('id', 'texto').order_by('id').iterator(chunk_size=tamanho):
+            post.texto_html = destacar_codigo(post.texto)
+            lote.append(post)
+            if len(lote) >= tamanho:
+                total += self._gravar(lote)
+                lote = []
+        if lote:
+            total += self._gravar(lote)
+        self.stdout.write(self.style.SUCCESS(f"{total} posts atualizados."))
+
+    def _gravar(self, lote):
+        # bulk_update ignora o auto_now; sem a data nova, o ETag e o
+        # Last-Modified do post continuariam validando o HTML antigo.
+        agora = timezone.now()
+        for post in lote:
+            post.atualizado_em = agora
+        Post.objects.bulk_update(lote, ['texto_html', 'atualizado_em'])
+        # bulk_update não dispara post_save.
+        invalidar(*(grupo_post(post.pk) for post in lote))
+        return len(lote)
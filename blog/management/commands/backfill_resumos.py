@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import GRUPO_LISTA, invalidar
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recalcula resumo e texto_plano de todos os posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Quantidade de posts atualizados por consulta.")
+
+    def handle(self, *args, **options):
+        tamanho = options['batch_size']
+        lote = []
+        total = 0
+        for post in Post.objects.only('id', 'texto').order_by('id').iterator(chunk_size=tamanho):
+            post.atualizar_derivados()
+            lote.append(post)
+            if len(lote) >= tamanho:
+                total += self._gravar(lote)
+                lote = []
+        if lote:
+            total += self._gravar(lote)
+
+        # bulk_update não dispara post_save.
+        invalidar(GRUPO_LISTA)
+        self.stdout.write(self.style.SUCCESS(f"{total} posts atualizados."))
+
+    def _gravar(self, lote):
+        Post.objects.bulk_update(lote, ['resumo', 'texto_plano'])
+        return len(lote)
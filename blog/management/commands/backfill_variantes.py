@@ -0,0 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from blog.imagens import processar_em_thread
+from blog.models import Questao
+
+
+class Command(BaseCommand):
+    help = "Gera miniaturas e WebP das imagens de questões já cadastradas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help="Quantidade de imagens processadas em paralelo.")
+        parser.add_argument('--forcar', action='store_true',
+                            help="Refaz também as variantes que já existem.")
+
+    def handle(self, *args, **options):
+        questoes = Questao.objects.exclude(imagem='').exclude(imagem__isnull=True)
+        if not options['forcar']:
+            # Quem já tem variantes é filtrado de novo em processar_questao.
+            questoes = questoes.filter(variantes={})
+        ids = questoes.order_by('id').values_list('id', flat=True).iterator(chunk_size=1000)
+
+        geradas = 0
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+            for gerou in pool.map(lambda pk: processar_em_thread(pk, forcar=options['forcar']), ids):
+                geradas += gerou
+        self.stdout.write(self.style.SUCCESS(f"Variantes geradas para {geradas} questões."))
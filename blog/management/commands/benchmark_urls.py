@@ -0,0 +1,240 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import urls as blog_urls
+from blog.cache import GRUPO_LISTA, grupo_post, invalidar
+from blog.medicao import latencias_ms
+from blog.models import Post, Questao, Rascunho, Revisao, Tema, Vestibular
+from blog.revisoes import registrar_revisao
+
+SENHA = 'benchmark'
+PALAVRAS = (
+    'função derivada integral limite vetor matriz energia força massa aceleração '
+    'velocidade célula enzima proteína equação gráfico área volume triângulo '
+    'probabilidade conjunto número primo fração razão proporção onda luz carga '
+    'campo elétrico reação ácido base molécula átomo história geografia clima'
+).split()
+CODIGO = '<pre><code class="language-python">def soma(a, b):\n    return a + b\n</code></pre>'
+
+
+class Command(BaseCommand):
+    help = (
+        "Semeia um banco com volumes configuráveis, requisita todas as URLs do "
+        "blog pelo test client e imprime, em JSON, latência (p50/p95/p99), "
+        "consultas SQL e tamanho de cada resposta. Com --banco-atual, que só "
+        "mede o que já está no banco e por isso exige --sem-semear, os POSTs e "
+        "as rotas autenticadas são pulados: o login grava sessão e last_login."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--questoes', type=int, default=2000)
+        parser.add_argument('--vestibulares', type=int, default=10)
+        parser.add_argument('--temas', type=int, default=30)
+        parser.add_argument('--usuarios', type=int, default=5)
+        parser.add_argument('--repeticoes', type=int, default=20,
+                            help="Requisições medidas por URL, fora a primeira (cache frio).")
+        parser.add_argument('--semente', type=int, default=42,
+                            help="Semente dos dados gerados, para resultados comparáveis.")
+        parser.add_argument('--banco-atual', action='store_true',
+                            help="Usa o banco configurado em vez de um banco de teste temporário; "
+                                 "exige --sem-semear, para nunca gerar dados nele.")
+        parser.add_argument('--sem-semear', action='store_true',
+                            help="Não gera dados; mede com o que já está no banco. Só com --banco-atual.")
+        parser.add_argument('--saida', help="Arquivo onde gravar o JSON (padrão: saída padrão).")
+
+    def handle(self, *args, **options):
+        if options['repeticoes'] < 1:
+            raise CommandError("--repeticoes deve ser positivo.")
+        if options['sem_semear'] != options['banco_atual']:
+            # Semear o banco configurado misturaria dados falsos aos reais, e
+            # uma segunda execução falharia nos usuários benchmark{i}.
+            raise CommandError("--banco-atual e --sem-semear devem ser usados juntos.")
+        self.verbosity = options['verbosity']
+
+        nome_original = connection.settings_dict['NAME']
+        if not options['banco_atual']:
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            if not options['sem_semear']:
+                self._semear(options)
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                rotas = self._medir(options['repeticoes'], escrever=not options['banco_atual'])
+        finally:
+            if not options['banco_atual']:
+                connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+        resultado = {
+            'django': django.get_version(),
+            'banco': connection.vendor,
+            'repeticoes': options['repeticoes'],
+            'rotas': rotas,
+        }
+        if not options['sem_semear']:
+            resultado['volumes'] = {campo: options[campo] for campo in
+                                    ('posts', 'questoes', 'vestibulares', 'temas', 'usuarios')}
+        saida = json.dumps(resultado, indent=2, ensure_ascii=False)
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as f:
+                f.write(saida + '\n')
+        else:
+            self.stdout.write(saida)
+
+    def _semear(self, options):
+        aleatorio = random.Random(options['semente'])
+        agora = timezone.now()
+
+        def texto(palavras):
+            return ' '.join(aleatorio.choice(PALAVRAS) for _ in range(palavras))
+
+        senha = make_password(SENHA)
+        get_user_model().objects.bulk_create(
+            get_user_model()(username=f'benchmark{i}', password=senha)
+            for i in range(max(options['usuarios'], 1))
+        )
+        autores = list(get_user_model().objects.filter(username__startswith='benchmark')
+                       .values_list('id', flat=True))
+        Vestibular.objects.bulk_create(Vestibular(nome=f'Vestibular {i}')
+                                       for i in range(max(options['vestibulares'], 1)))
+        Tema.objects.bulk_create(Tema(nome=f'Tema {i}') for i in range(max(options['temas'], 1)))
+        vestibulares = list(Vestibular.objects.values_list('id', flat=True))
+        temas = list(Tema.objects.values_list('id', flat=True))
+
+        posts = []
+        for i in range(options['posts']):
+            paragrafos = ''.join(f'<p>{texto(60)}</p>' for _ in range(5))
+            post = Post(autor_id=aleatorio.choice(autores), titulo=texto(6).capitalize(),
+                        texto=paragrafos + (CODIGO if i % 5 == 0 else ''),
+                        publicado_em=agora - timedelta(hours=i))
+            # bulk_create não chama save(): os campos derivados vêm daqui.
+            post.atualizar_derivados()
+            posts.append(post)
+        Post.objects.bulk_create(posts, batch_size=500)
+        if posts:
+            # Histórico para as páginas de revisões do post mais recente.
+            recente = posts[0]
+            for _ in range(3):
+                recente.texto += f'<p>{texto(30)}</p>'
+                registrar_revisao(recente)
+            recente.save()
+            # Rascunho do tamanho de um post longo, para o autosave.
+            Rascunho.objects.create(autor_id=min(autores), post=recente, titulo=recente.titulo,
+                                    conteudo=[{'insert': texto(15000) + '\n'}])
+
+        Questao.objects.bulk_create((
+            Questao(enunciado=texto(40), alternativas=texto(25), ano=str(aleatorio.randint(2000, 2024)),
+                    resposta=aleatorio.choice('ABCDE'), vestibular_id=aleatorio.choice(vestibulares),
+                    tema_id=aleatorio.choice(temas))
+            for _ in range(options['questoes'])
+        ), batch_size=1000)
+        if self.verbosity > 1:
+            self.stderr.write("Dados gerados.")
+
+    def _cenarios(self):
+        """(nome da URL, descrição, método, caminho, dados, autenticado)."""
+        post = (Post.objects.filter(publicado_em__lte=timezone.now())
+                .order_by('-publicado_em', '-id').values_list('pk', flat=True).first())
+        questao = Questao.objects.values('id', 'vestibular_id', 'tema_id', 'ano').order_by('id').first()
+        usuario = get_user_model().objects.order_by('id').values_list('username', flat=True).first()
+        if post is None or questao is None or usuario is None:
+            raise CommandError("O banco precisa de ao menos um post publicado, uma questão e um usuário.")
+        texto_curto = ' '.join(PALAVRAS[:20])
+        revisao = (Revisao.objects.filter(post=post).order_by('numero')
+                   .values_list('numero', flat=True).first() or 1)
+        rascunho = (Rascunho.objects.filter(autor__username=usuario).order_by('id')
+                    .values_list('id', flat=True).first() or 0)
+        delta = json.dumps({'delta': [{'insert': texto_curto + '\n'}], 'titulo': 'Rascunho'})
+        filtros = f"vestibular={questao['vestibular_id']}&tema={questao['tema_id']}&ano={questao['ano']}"
+        busca = f"q={PALAVRAS[0]}+{PALAVRAS[1]}"
+        respostas = json.dumps({'respostas': [{'questao': questao['id'], 'resposta': 'A'}] * 20})
+        return post, usuario, [
+            ('post_list', 'primeira página', 'get', reverse('post_list'), None, False),
+            ('post_detail', '', 'get', reverse('post_detail', args=[post]), None, False),
+            ('post_feed_rss', '', 'get', reverse('post_feed_rss'), None, False),
+            ('post_feed_atom', '', 'get', reverse('post_feed_atom'), None, False),
+            ('post_json', '', 'get', reverse('post_json', args=[post]), None, True),
+            ('painel', '', 'get', reverse('painel'), None, True),
+            ('login', 'formulário', 'get', reverse('login'), None, False),
+            ('login', 'POST', 'post', reverse('login'), {'username': usuario, 'password': SENHA}, False),
+            ('logout', '', 'get', reverse('logout'), None, True),
+            ('criar_post', 'formulário', 'get', reverse('criar_post'), None, True),
+            ('editar', '', 'get', reverse('editar'), None, True),
+            ('deletar', '', 'get', reverse('deletar'), None, True),
+            ('rascunho_salvar', 'novo', 'post', reverse('rascunho_salvar'), delta, True),
+            ('rascunho_detalhe', '', 'get', reverse('rascunho_detalhe', args=[rascunho]), None, True),
+            ('post_revisoes', '', 'get', f"{reverse('post_revisoes', args=[post])}?revisao={revisao}", None, True),
+            ('post_revisao_restaurar', '', 'post', reverse('post_revisao_restaurar', args=[post, revisao]),
+             None, True),
+            ('questao_list', '', 'get', reverse('questao_list'), None, False),
+            ('questao_list', 'filtrada', 'get', f"{reverse('questao_list')}?{filtros}", None, False),
+            ('questao_list_json', '', 'get', reverse('questao_list_json'), None, False),
+            ('questao_list_json', 'filtrada', 'get', f"{reverse('questao_list_json')}?{filtros}", None, False),
+            ('questao_busca', '', 'get', f"{reverse('questao_busca')}?{busca}", None, False),
+            ('questao_simulado', '', 'get', f"{reverse('questao_simulado')}?quantidade=20", None, False),
+            ('questao_simulado_json', 'proporcional', 'get',
+             f"{reverse('questao_simulado_json')}?quantidade=20&distribuicao=proporcional", None, False),
+            ('questao_responder', 'lote de 20', 'post', reverse('questao_responder'), respostas, True),
+            ('questao_exportar', 'jsonl', 'get', reverse('questao_exportar'), None, True),
+            ('questao_exportar', 'csv filtrada', 'get', f"{reverse('questao_exportar')}?formato=csv&{filtros}",
+             None, True),
+            ('questao_exportar', 'zip', 'get', f"{reverse('questao_exportar')}?formato=zip", None, True),
+            ('questao_estatisticas', '', 'get', f"{reverse('questao_estatisticas')}?tipo=tema", None, False),
+        ]
+
+    def _medir(self, repeticoes, escrever=True):
+        post, usuario, cenarios = self._cenarios()
+        usuario = get_user_model().objects.get(username=usuario)
+        cobertas = {cenario[0] for cenario in cenarios}
+        for padrao in blog_urls.urlpatterns:
+            if padrao.name and padrao.name not in cobertas:
+                self.stderr.write(f"URL sem cenário no benchmark: {padrao.name}")
+
+        rotas = {}
+        for nome, descricao, metodo, caminho, dados, autenticado in cenarios:
+            # Todo POST grava (até o login, na sessão), e force_login grava
+            # sessão e last_login: no banco real, só as leituras anônimas.
+            if not escrever and (metodo == 'post' or autenticado):
+                continue
+            # Primeira requisição com o cache das páginas frio.
+            invalidar(GRUPO_LISTA, grupo_post(post))
+            cliente = Client()
+            medidas = []
+            for _ in range(repeticoes + 1):
+                if autenticado:
+                    # O logout encerra a sessão a cada requisição.
+                    cliente.force_login(usuario)
+                with CaptureQueriesContext(connection) as consultas:
+                    inicio = time.perf_counter()
+                    if isinstance(dados, str):
+                        response = getattr(cliente, metodo)(caminho, dados, content_type='application/json')
+                    else:
+                        response = getattr(cliente, metodo)(caminho, dados)
+                    tamanho = len(b''.join(response) if response.streaming else response.content)
+                    medidas.append((time.perf_counter() - inicio, len(consultas)))
+            (primeira, consultas_primeira), *demais = medidas
+            chave = f'{nome} {descricao}'.strip()
+            rotas[chave] = {
+                'metodo': metodo.upper(),
+                'url': caminho,
+                'status': response.status_code,
+                'bytes': tamanho,
+                'primeira_ms': round(primeira * 1000, 2),
+                'consultas_primeira': consultas_primeira,
+                'consultas': max(quantidade for _, quantidade in demais),
+                **latencias_ms([duracao for duracao, _ in demais]),
+            }
+            if self.verbosity > 1:
+                self.stderr.write(f"{chave}: {rotas[chave]}")
+        return rotas
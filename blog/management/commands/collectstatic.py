@@ -0,0 +1,26 @@
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectStaticCommand
+from django.core.management.base import CommandError
+
+from blog.vendor import VENDOR
+
+
+class Command(CollectStaticCommand):
+    help = (
+        "O collectstatic do Django, que antes confere se as bibliotecas de "
+        "blog.vendor foram baixadas com o vendor_static."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--permitir-cdn', action='store_true',
+                            help="Publica mesmo sem as cópias locais; as páginas usarão a CDN.")
+
+    def handle(self, **options):
+        faltando = [caminho for _, caminho in VENDOR.values() if finders.find(caminho) is None]
+        if faltando and not options['permitir_cdn']:
+            raise CommandError(
+                "Bibliotecas de front-end não baixadas: " + ', '.join(faltando)
+                + ". Rode o vendor_static ou use --permitir-cdn."
+            )
+        return super().handle(**options)
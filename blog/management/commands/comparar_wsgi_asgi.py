@@ -0,0 +1,169 @@
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.medicao import latencias_ms
+from blog.models import Post
+
+
+def _resumo(latencias, erros, duracao):
+    return {
+        'requisicoes': len(latencias),
+        'erros': erros,
+        'req_por_segundo': round(len(latencias) / duracao, 1) if duracao else 0.0,
+        **latencias_ms(latencias),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara vazão e latência das páginas públicas servidas pelo handler "
+        "WSGI (um pool de threads, como o gunicorn com gthread) e pelo ASGI "
+        "(um loop de eventos, como o uvicorn), com a mesma concorrência."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=2000,
+                            help="Requisições por modo.")
+        parser.add_argument('--concorrencia', type=int, default=64,
+                            help="Requisições simultâneas (threads no WSGI, tarefas no ASGI).")
+        parser.add_argument('--url', action='append', dest='urls',
+                            help="URL a requisitar (pode repetir); por padrão, a listagem "
+                                 "e o post publicado mais recente.")
+        parser.add_argument('--sem-cache', action='store_true',
+                            help="Desliga o cache de páginas, para medir a renderização.")
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def handle(self, *args, **options):
+        total = options['requisicoes']
+        concorrencia = options['concorrencia']
+        if total < 1 or concorrencia < 1:
+            raise CommandError("--requisicoes e --concorrencia devem ser positivos.")
+        urls = options['urls'] or self._urls_padrao()
+        alvos = [urls[i % len(urls)] for i in range(total)]
+        ajustes = {'ALLOWED_HOSTS': [options['host']]}
+        if options['sem_cache']:
+            ajustes['CACHE_PAGINAS_TIMEOUT'] = 0
+
+        with override_settings(**ajustes):
+            resultado = {
+                'urls': urls,
+                'concorrencia': concorrencia,
+                'wsgi': self._wsgi(alvos, urls, concorrencia, options['host']),
+                'asgi': asyncio.run(self._asgi(alvos, urls, concorrencia, options['host'])),
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, indent=2))
+            return
+        self.stdout.write(f"{total} requisições, concorrência {concorrencia}: {', '.join(urls)}")
+        self.stdout.write(f"{'modo':<6}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'erros':>8}")
+        for modo in ('wsgi', 'asgi'):
+            r = resultado[modo]
+            self.stdout.write(
+                f"{modo:<6}{r['req_por_segundo']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+                f"{r['p99_ms']:>10}{r['max_ms']:>10}{r['erros']:>8}"
+            )
+
+    def _urls_padrao(self):
+        urls = [reverse('post_list')]
+        ultimo = (Post.objects.filter(publicado_em__lte=timezone.now())
+                  .order_by('-publicado_em', '-id').values_list('pk', flat=True).first())
+        if ultimo is None:
+            self.stderr.write("Nenhum post publicado; medindo só a listagem.")
+        else:
+            urls.append(reverse('post_detail', args=[ultimo]))
+        return urls
+
+    def _wsgi(self, alvos, urls, concorrencia, host):
+        handler = WSGIHandler()
+
+        def requisitar(url):
+            partes = urlsplit(url)
+            environ = {
+                'REQUEST_METHOD': 'GET', 'SCRIPT_NAME': '', 'PATH_INFO': partes.path,
+                'QUERY_STRING': partes.query, 'SERVER_NAME': host, 'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': host, 'REMOTE_ADDR': '127.0.0.1',
+                'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(),
+                'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            status = []
+            inicio = time.perf_counter()
+            resposta = handler(environ, lambda s, headers, exc_info=None: status.append(s))
+            try:
+                for _ in resposta:
+                    pass
+            finally:
+                resposta.close()
+            return time.perf_counter() - inicio, int(status[0].split()[0])
+
+        with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+            list(pool.map(requisitar, urls))
+            inicio = time.perf_counter()
+            medidas = list(pool.map(requisitar, alvos))
+            duracao = time.perf_counter() - inicio
+        return _resumo([m[0] for m in medidas], sum(m[1] >= 400 for m in medidas), duracao)
+
+    async def _asgi(self, alvos, urls, concorrencia, host):
+        handler = ASGIHandler()
+
+        async def requisitar(url):
+            partes = urlsplit(url)
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'path': partes.path,
+                'raw_path': partes.path.encode(), 'query_string': partes.query.encode(),
+                'root_path': '', 'headers': [(b'host', host.encode())],
+                'client': ('127.0.0.1', 0), 'server': (host, 80),
+            }
+            fim = asyncio.Event()
+            corpo_enviado = False
+            status = []
+
+            async def receive():
+                nonlocal corpo_enviado
+                if not corpo_enviado:
+                    corpo_enviado = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await fim.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(mensagem):
+                if mensagem['type'] == 'http.response.start':
+                    status.append(mensagem['status'])
+                elif not mensagem.get('more_body'):
+                    fim.set()
+
+            inicio = time.perf_counter()
+            await handler(scope, receive, send)
+            return time.perf_counter() - inicio, status[0]
+
+        fila = iter(alvos)
+        medidas = []
+
+        async def cliente():
+            for url in fila:
+                medidas.append(await requisitar(url))
+
+        for url in urls:
+            await requisitar(url)
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+        duracao = time.perf_counter() - inicio
+        await sync_to_async(connections.close_all)()
+        return _resumo([m[0] for m in medidas], sum(m[1] >= 400 for m in medidas), duracao)
@@ -0,0 +1,50 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.exportacao import FORMATOS, TAMANHO_LOTE, exportar
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta as questões em JSONL, CSV ou ZIP (JSONL e imagens), no "
+        "formato lido pelo import_questoes, sem carregar o banco na memória."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do arquivo ou '-' para a saída padrão.")
+        parser.add_argument('--formato', choices=FORMATOS,
+                            help="Formato da saída; por padrão, deduzido da extensão.")
+        parser.add_argument('--vestibular', type=int, help="Id do vestibular.")
+        parser.add_argument('--tema', type=int, help="Id do tema.")
+        parser.add_argument('--ano')
+        parser.add_argument('--chunk-size', type=int, default=TAMANHO_LOTE,
+                            help="Questões lidas do banco por vez.")
+
+    def handle(self, *args, **options):
+        arquivo = options['arquivo']
+        formato = options['formato'] or self._deduzir_formato(arquivo)
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size deve ser positivo.")
+        filtros = {campo: options[campo] for campo in ('vestibular', 'tema', 'ano')}
+
+        saida = sys.stdout.buffer if arquivo == '-' else open(arquivo, 'wb')
+        escritos = 0
+        try:
+            for bloco in exportar(formato, filtros, options['chunk_size']):
+                saida.write(bloco)
+                escritos += len(bloco)
+        finally:
+            if arquivo == '-':
+                saida.flush()
+            else:
+                saida.close()
+        if arquivo != '-':
+            self.stdout.write(self.style.SUCCESS(f"{escritos} bytes exportados em {arquivo}."))
+
+    def _deduzir_formato(self, arquivo):
+        extensao = os.path.splitext(arquivo)[1].lower()[1:]
+        if extensao in FORMATOS:
+            return extensao
+        raise CommandError("Não foi possível deduzir o formato; use --formato.")
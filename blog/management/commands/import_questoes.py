@@ -0,0 +1,168 @@
+import csv
+import json
+import os
+import sys
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blog.cache import GRUPO_QUESTOES, invalidar
+from blog.models import Questao, Tema, Vestibular
+
+CAMPOS_OBRIGATORIOS = ('enunciado', 'alternativas', 'ano', 'resposta', 'vestibular', 'tema')
+
+
+class RegistroInvalido(Exception):
+    pass
+
+
+class CacheDeNomes:
+    """Resolve nomes de Vestibular/Tema para ids, criando os que faltarem."""
+
+    def __init__(self, model, criar=True):
+        self.model = model
+        self.criar = criar
+        self.ids = dict(model.objects.values_list('nome', 'id'))
+        self.criados = 0
+
+    def resolver(self, nome):
+        if nome not in self.ids:
+            if self.criar:
+                self.ids[nome] = self.model.objects.get_or_create(nome=nome)[0].pk
+            else:
+                # Dry-run: só reserva o nome, sem gravar.
+                self.ids[nome] = None
+            self.criados += 1
+        return self.ids[nome]
+
+
+class Command(BaseCommand):
+    help = "Importa questões de um arquivo CSV ou JSONL (um objeto por linha)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do arquivo ou '-' para a entrada padrão.")
+        parser.add_argument('--formato', choices=('csv', 'jsonl'),
+                            help="Formato da entrada; por padrão, deduzido da extensão.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Questões gravadas por bulk_create/transação.")
+        parser.add_argument('--checkpoint',
+                            help="Arquivo onde o progresso é salvo para retomar a importação.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Só valida a entrada, sem gravar nada.")
+
+    def handle(self, *args, **options):
+        arquivo = options['arquivo']
+        formato = options['formato'] or self._deduzir_formato(arquivo)
+        tamanho = options['batch_size']
+        dry_run = options['dry_run']
+        checkpoint = options['checkpoint']
+        self.verbosity = options['verbosity']
+        if tamanho < 1:
+            raise CommandError("--batch-size deve ser positivo.")
+
+        inicio = self._ler_checkpoint(checkpoint, arquivo) if checkpoint and not dry_run else 0
+        vestibulares = CacheDeNomes(Vestibular, criar=not dry_run)
+        temas = CacheDeNomes(Tema, criar=not dry_run)
+
+        entrada = sys.stdin if arquivo == '-' else open(arquivo, encoding='utf-8-sig', newline='')
+        importadas = invalidas = 0
+        processados = inicio
+        try:
+            registros = islice(enumerate(self._registros(entrada, formato), start=1), inicio, None)
+            lote = []
+            for numero, registro in registros:
+                processados = numero
+                try:
+                    lote.append(self._questao(registro, vestibulares, temas))
+                except RegistroInvalido as erro:
+                    invalidas += 1
+                    self.stderr.write(f"Registro {numero}: {erro}")
+                if len(lote) >= tamanho:
+                    importadas += self._gravar(lote, dry_run, checkpoint, arquivo, processados)
+                    lote = []
+            importadas += self._gravar(lote, dry_run, checkpoint, arquivo, processados)
+        finally:
+            if entrada is not sys.stdin:
+                entrada.close()
+
+        acao = "validadas" if dry_run else "importadas"
+        self.stdout.write(self.style.SUCCESS(
+            f"{importadas} questões {acao}, {invalidas} inválidas, "
+            f"{vestibulares.criados} vestibulares e {temas.criados} temas novos."
+        ))
+
+    def _deduzir_formato(self, arquivo):
+        extensao = os.path.splitext(arquivo)[1].lower()
+        if extensao in ('.csv', '.jsonl'):
+            return extensao[1:]
+        raise CommandError("Não foi possível deduzir o formato; use --formato.")
+
+    def _registros(self, entrada, formato):
+        if formato == 'csv':
+            yield from csv.DictReader(entrada)
+            return
+        for linha in entrada:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                yield json.loads(linha)
+            except ValueError as erro:
+                # Mantém a numeração dos registros; a validação rejeita o item.
+                yield RegistroInvalido(f"JSON inválido ({erro})")
+
+    def _questao(self, registro, vestibulares, temas):
+        if isinstance(registro, RegistroInvalido):
+            raise registro
+        if not isinstance(registro, dict):
+            raise RegistroInvalido("esperado um objeto")
+        dados = {campo: str(registro.get(campo) or '').strip() for campo in CAMPOS_OBRIGATORIOS}
+        faltando = [campo for campo, valor in dados.items() if not valor]
+        if faltando:
+            raise RegistroInvalido(f"campos obrigatórios vazios: {', '.join(faltando)}")
+        if len(dados['ano']) > 4 or not dados['ano'].isdigit():
+            raise RegistroInvalido(f"ano inválido: {dados['ano']!r}")
+        return Questao(
+            enunciado=dados['enunciado'],
+            alternativas=dados['alternativas'],
+            ano=dados['ano'],
+            resposta=dados['resposta'],
+            imagem=str(registro.get('imagem') or '').strip() or None,
+            vestibular_id=vestibulares.resolver(dados['vestibular']),
+            tema_id=temas.resolver(dados['tema']),
+        )
+
+    def _gravar(self, lote, dry_run, checkpoint, arquivo, processados):
+        if dry_run or not lote:
+            return len(lote)
+        with transaction.atomic():
+            Questao.objects.bulk_create(lote)
+        # bulk_create não dispara post_save: invalida os simulados aqui.
+        invalidar(GRUPO_QUESTOES)
+        if checkpoint:
+            self._salvar_checkpoint(checkpoint, arquivo, processados)
+        if self.verbosity > 1:
+            self.stdout.write(f"{processados} registros processados.")
+        return len(lote)
+
+    def _ler_checkpoint(self, checkpoint, arquivo):
+        try:
+            with open(checkpoint, encoding='utf-8') as f:
+                dados = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            raise CommandError(f"Checkpoint corrompido: {checkpoint}")
+        if dados.get('arquivo') != os.path.abspath(arquivo):
+            raise CommandError(f"O checkpoint {checkpoint} é de outro arquivo: {dados.get('arquivo')}")
+        self.stdout.write(f"Retomando após o registro {dados['registros']}.")
+        return dados['registros']
+
+    def _salvar_checkpoint(self, checkpoint, arquivo, processados):
+        # Grava em um arquivo temporário e renomeia, para nunca deixar o
+        # checkpoint pela metade.
+        temporario = f'{checkpoint}.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump({'arquivo': os.path.abspath(arquivo), 'registros': processados}, f)
+        os.replace(temporario, checkpoint)
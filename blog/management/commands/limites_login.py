@@ -0,0 +1,18 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from blog.limites import rejeicoes, zerar_rejeicoes
+
+
+class Command(BaseCommand):
+    help = "Mostra quantas tentativas de login foram recusadas pelo limite, por IP e por usuário."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zerar', action='store_true',
+                            help="Zera os contadores depois de mostrá-los.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(json.dumps({'rejeitadas': rejeicoes()}))
+        if options['zerar']:
+            zerar_rejeicoes()
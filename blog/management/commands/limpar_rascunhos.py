@@ -0,0 +1,47 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.models import Rascunho
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga, em lotes pequenos, os rascunhos (e suas alterações) que não "
+        "são salvos há mais de --dias dias: os de posts publicados sem que o "
+        "editor avisasse e os abandonados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=30,
+                            help="Idade mínima, em dias desde o último salvamento.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rascunhos apagados por lote.")
+        parser.add_argument('--pausa', type=float, default=0.0,
+                            help="Segundos de espera entre os lotes.")
+
+    def handle(self, *args, **options):
+        tamanho = options['batch_size']
+        if tamanho < 1:
+            raise CommandError("--batch-size deve ser positivo.")
+        if options['dias'] < 1:
+            raise CommandError("--dias deve ser positivo.")
+
+        limite = timezone.now() - timedelta(days=options['dias'])
+        apagados = 0
+        while True:
+            chaves = list(Rascunho.objects.filter(atualizado_em__lt=limite)
+                          .values_list('pk', flat=True)[:tamanho])
+            if not chaves:
+                break
+            # O delete em cascata leva junto as AlteracaoRascunho de cada um.
+            apagados += Rascunho.objects.filter(pk__in=chaves).delete()[1].get(Rascunho._meta.label, 0)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{apagados} rascunhos apagados.")
+            if len(chaves) < tamanho:
+                break
+            if options['pausa']:
+                time.sleep(options['pausa'])
+        self.stdout.write(self.style.SUCCESS(f"{apagados} rascunhos antigos apagados."))
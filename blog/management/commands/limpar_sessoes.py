@@ -0,0 +1,47 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga as sessões expiradas em lotes pequenos, cada um em sua própria "
+        "transação, em vez do DELETE único do clearsessions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Sessões apagadas por lote.")
+        parser.add_argument('--pausa', type=float, default=0.0,
+                            help="Segundos de espera entre os lotes.")
+
+    def handle(self, *args, **options):
+        tamanho = options['batch_size']
+        if tamanho < 1:
+            raise CommandError("--batch-size deve ser positivo.")
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            self.stdout.write(f"{settings.SESSION_ENGINE} não guarda sessões no banco; nada a limpar.")
+            return
+
+        Session = store.get_model_class()
+        # O limite é fixado no início: sessões que expirarem durante a
+        # limpeza ficam para a próxima execução.
+        agora = timezone.now()
+        apagadas = 0
+        while True:
+            chaves = list(Session.objects.filter(expire_date__lt=agora)
+                          .values_list('pk', flat=True)[:tamanho])
+            if not chaves:
+                break
+            apagadas += Session.objects.filter(pk__in=chaves).delete()[0]
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{apagadas} sessões apagadas.")
+            if len(chaves) < tamanho:
+                break
+            if options['pausa']:
+                time.sleep(options['pausa'])
+        self.stdout.write(self.style.SUCCESS(f"{apagadas} sessões expiradas apagadas."))
@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from blog.revisoes import relatorio
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra, por post, quantas revisões existem e quantos bytes elas "
+        "ocupam no banco, comparados ao texto sem compressão."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limite', type=int, default=20,
+                            help="Posts listados, dos que mais ocupam espaço (0 para todos).")
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def handle(self, *args, **options):
+        linhas = relatorio()
+        total = {
+            'posts': len(linhas),
+            'revisoes': sum(linha['revisoes'] for linha in linhas),
+            'completas': sum(linha['completas'] for linha in linhas),
+            'armazenado': sum(linha['armazenado'] for linha in linhas),
+            'tamanho': sum(linha['tamanho'] for linha in linhas),
+        }
+        total['proporcao'] = round(total['armazenado'] / total['tamanho'], 4) if total['tamanho'] else 0.0
+        if options['limite']:
+            linhas = linhas[:options['limite']]
+
+        if options['json']:
+            self.stdout.write(json.dumps({'total': total, 'posts': linhas}, indent=2, ensure_ascii=False))
+            return
+        self.stdout.write(f"{'post':>6}{'revisões':>10}{'completas':>11}{'guardado':>12}{'texto':>12}{'proporção':>11}  título")
+        for linha in linhas:
+            self.stdout.write(
+                f"{linha['post']:>6}{linha['revisoes']:>10}{linha['completas']:>11}{linha['armazenado']:>12}"
+                f"{linha['tamanho']:>12}{linha['proporcao']:>11}  {linha['post__titulo']}"
+            )
+        self.stdout.write(
+            f"{total['revisoes']} revisões de {total['posts']} posts ocupam {total['armazenado']} bytes "
+            f"para {total['tamanho']} bytes de texto ({total['proporcao']:.1%})."
+        )
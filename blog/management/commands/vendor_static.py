@@ -0,0 +1,67 @@
+import posixpath
+import re
+from pathlib import Path
+from urllib.error import URLError
+from urllib.parse import urljoin
+from urllib.request import Request, urlopen
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.vendor import VENDOR
+
+# Referências a outros arquivos dentro de um CSS (fontes da KaTeX, por exemplo).
+URL_CSS = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+# Source maps: o collectstatic com manifesto falha se o arquivo citado faltar.
+SOURCE_MAP = re.compile(r'(?m)^/[/*]# sourceMappingURL=([^\s*]+)')
+
+
+class Command(BaseCommand):
+    help = "Baixa as bibliotecas de front-end de blog.vendor para blog/static/vendor."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--forcar', action='store_true',
+                            help="Baixa de novo arquivos que já existem.")
+        parser.add_argument('--destino',
+                            help="Diretório de arquivos estáticos; por padrão, blog/static.")
+
+    def handle(self, *args, **options):
+        self.static = Path(options['destino'] or Path(apps.get_app_config('blog').path) / 'static')
+        self.forcar = options['forcar']
+        self.verbosity = options['verbosity']
+        self.baixados = 0
+        for url, caminho in VENDOR.values():
+            conteudo = self._baixar(url, caminho).decode('utf-8')
+            referencias = set(SOURCE_MAP.findall(conteudo))
+            if caminho.endswith('.css'):
+                referencias |= set(URL_CSS.findall(conteudo))
+            self._baixar_referencias(url, caminho, referencias)
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.baixados} arquivos baixados. Rode o collectstatic para publicá-los."
+        ))
+
+    def _baixar_referencias(self, url, caminho, referencias):
+        for referencia in referencias:
+            if referencia.startswith(('data:', 'http:', 'https:', '//', '#')):
+                continue
+            referencia = re.split(r'[?#]', referencia)[0]
+            local = posixpath.normpath(posixpath.join(posixpath.dirname(caminho), referencia))
+            if not local.startswith('vendor/'):
+                raise CommandError(f"Referência fora de vendor/ em {url}: {referencia}")
+            self._baixar(urljoin(url, referencia), local)
+
+    def _baixar(self, url, caminho):
+        destino = self.static / caminho
+        if destino.exists() and not self.forcar:
+            return destino.read_bytes()
+        try:
+            with urlopen(Request(url, headers={'User-Agent': 'profvitor-vendor'}), timeout=30) as resposta:
+                conteudo = resposta.read()
+        except URLError as erro:
+            raise CommandError(f"Falha ao baixar {url}: {erro}")
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        destino.write_bytes(conteudo)
+        self.baixados += 1
+        if self.verbosity > 1:
+            self.stdout.write(f"{url} -> {caminho}")
+        return conteudo
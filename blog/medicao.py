@@ -0,0 +1,18 @@
+"""Estatísticas de latência usadas pelos comandos de benchmark."""
+import math
+
+
+def percentil(ordenadas, p):
+    """Percentil por posição (nearest-rank) de uma lista já ordenada."""
+    if not ordenadas:
+        return 0.0
+    return ordenadas[max(0, math.ceil(p / 100 * len(ordenadas)) - 1)]
+
+
+def latencias_ms(latencias):
+    """p50/p95/p99/máximo, em milissegundos, de latências em segundos."""
+    ordenadas = sorted(latencias)
+    return {
+        **{f'p{p}_ms': round(percentil(ordenadas, p) * 1000, 2) for p in (50, 95, 99)},
+        'max_ms': round(ordenadas[-1] * 1000, 2) if ordenadas else 0.0,
+    }
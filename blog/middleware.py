@@ -0,0 +1,181 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.template.base import Template
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+logger = logging.getLogger('blog.instrumentacao')
+
+
+class WhiteNoiseAssincrono(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware que também roda como middleware async.
+
+    O original só é síncrono, e sob ASGI o Django faria toda requisição,
+    estática ou não, passar por ele na thread única de ``sync_to_async``.
+    Aqui só a busca e a entrega dos arquivos estáticos vão para uma thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+# Métricas da requisição em andamento; o contexto acompanha o sync_to_async,
+# então consultas feitas em threads pelas views async também são contadas.
+_metricas = ContextVar('blog_metricas', default=None)
+
+
+class Metricas:
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_banco = 0.0
+        self.tempo_templates = 0.0
+        self.mais_lenta = (0.0, '')
+        self.renderizando = False
+
+    def registrar_consulta(self, sql, duracao):
+        self.consultas += 1
+        self.tempo_banco += duracao
+        if duracao > self.mais_lenta[0]:
+            self.mais_lenta = (duracao, sql)
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    metricas = _metricas.get()
+    if metricas is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metricas.registrar_consulta(sql, time.perf_counter() - inicio)
+
+
+def _instalar_nas_conexoes(**kwargs):
+    # request_started roda na thread que fará as consultas (no ASGI, a do
+    # sync_to_async), que tem as próprias conexões.
+    for connection in connections.all():
+        if _medir_consulta not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_medir_consulta)
+
+
+def _instalar_nos_templates():
+    # O Django não tem um sinal de renderização fora dos testes; como o
+    # próprio test runner, envolvemos Template._render. Só o template mais
+    # externo é cronometrado (extends/include renderizam dentro dele).
+    original = Template._render
+    if getattr(original, 'instrumentado', False):
+        return
+
+    def _render(self, context):
+        metricas = _metricas.get()
+        if metricas is None or metricas.renderizando:
+            return original(self, context)
+        metricas.renderizando = True
+        inicio = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            metricas.renderizando = False
+            metricas.tempo_templates += time.perf_counter() - inicio
+
+    _render.instrumentado = True
+    Template._render = _render
+
+
+class InstrumentacaoMiddleware:
+    """
+    Mede consultas, tempo de banco e de templates de cada requisição.
+
+    Os números vão no cabeçalho ``Server-Timing`` e em uma linha de log JSON
+    (logger ``blog.instrumentacao``), em WARNING quando a requisição passa
+    de ``INSTRUMENTACAO_LIMITE_MS`` ou ``INSTRUMENTACAO_LIMITE_CONSULTAS``.
+    Com ``INSTRUMENTACAO`` desligado o middleware sai da pilha
+    (``MiddlewareNotUsed``) e nada é instalado.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTACAO:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+        request_started.connect(_instalar_nas_conexoes, dispatch_uid='blog_instrumentacao')
+        _instalar_nos_templates()
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        metricas, inicio = Metricas(), time.perf_counter()
+        token = _metricas.set(metricas)
+        try:
+            response = self.get_response(request)
+        finally:
+            _metricas.reset(token)
+        self._registrar(request, response, metricas, time.perf_counter() - inicio)
+        return response
+
+    async def __acall__(self, request):
+        metricas, inicio = Metricas(), time.perf_counter()
+        token = _metricas.set(metricas)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _metricas.reset(token)
+        self._registrar(request, response, metricas, time.perf_counter() - inicio)
+        return response
+
+    def _registrar(self, request, response, metricas, total):
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metricas.tempo_banco * 1000:.1f};desc="{metricas.consultas} consultas"',
+            f'tpl;dur={metricas.tempo_templates * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        alertas = []
+        if total * 1000 > settings.INSTRUMENTACAO_LIMITE_MS:
+            alertas.append('tempo')
+        if metricas.consultas > settings.INSTRUMENTACAO_LIMITE_CONSULTAS:
+            alertas.append('consultas')
+        dados = {
+            'metodo': request.method,
+            'caminho': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'banco_ms': round(metricas.tempo_banco * 1000, 2),
+            'consultas': metricas.consultas,
+            'templates_ms': round(metricas.tempo_templates * 1000, 2),
+            'consulta_mais_lenta_ms': round(metricas.mais_lenta[0] * 1000, 2),
+            'consulta_mais_lenta': metricas.mais_lenta[1][:500],
+            'alertas': alertas,
+        }
+        logger.log(logging.WARNING if alertas else logging.INFO,
+                   json.dumps(dados, ensure_ascii=False))
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_remove_questao_conteudo_questao_alternativas_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-publicado_em', '-id'], name='blog_post_publicado_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_publicado_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='resumo',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='texto_plano',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
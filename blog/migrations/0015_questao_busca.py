@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def instalar_busca(apps, schema_editor):
+    from blog.busca import get_backend
+    get_backend(schema_editor.connection).instalar(schema_editor)
+
+
+def desinstalar_busca(apps, schema_editor):
+    from blog.busca import get_backend
+    get_backend(schema_editor.connection).desinstalar(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_resumo_texto_plano'),
+    ]
+
+    operations = [
+        migrations.RunPython(instalar_busca, desinstalar_busca),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_questao_busca'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['vestibular', 'tema', 'ano', '-id'], name='blog_questao_filtros_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_questao_filtros_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questao',
+            name='variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_questao_variantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='texto_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_post_texto_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
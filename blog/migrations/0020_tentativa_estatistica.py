@@ -0,0 +1,54 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_atualizado_em'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Estatistica',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('questao', 'Questão'), ('tema', 'Tema'), ('vestibular', 'Vestibular'), ('usuario', 'Usuário')], max_length=10)),
+                ('chave', models.PositiveIntegerField()),
+                ('tentativas', models.PositiveIntegerField(default=0)),
+                ('acertos', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tentativa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resposta', models.CharField(max_length=200)),
+                ('correta', models.BooleanField()),
+                ('criada_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='estatistica',
+            constraint=models.UniqueConstraint(fields=('tipo', 'chave'), name='blog_estatistica_tipo_chave'),
+        ),
+        migrations.AddField(
+            model_name='tentativa',
+            name='questao',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='blog.questao'),
+        ),
+        migrations.AddField(
+            model_name='tentativa',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tentativa',
+            index=models.Index(fields=['usuario', '-criada_em'], name='blog_tentativa_usuario_idx'),
+        ),
+    ]
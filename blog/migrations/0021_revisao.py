@@ -0,0 +1,36 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0020_tentativa_estatistica'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Revisao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.PositiveIntegerField()),
+                ('titulo', models.CharField(max_length=200)),
+                ('dados', models.BinaryField()),
+                ('profundidade', models.PositiveSmallIntegerField(default=0)),
+                ('tamanho', models.PositiveIntegerField()),
+                ('armazenado', models.PositiveIntegerField()),
+                ('criada_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('autor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisoes', to='blog.post')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='revisao',
+            constraint=models.UniqueConstraint(fields=('post', 'numero'), name='blog_revisao_post_numero'),
+        ),
+    ]
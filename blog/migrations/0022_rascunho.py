@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0021_revisao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rascunho',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titulo', models.CharField(blank=True, max_length=200)),
+                ('conteudo', models.JSONField(default=list)),
+                ('versao', models.PositiveIntegerField(default=1)),
+                ('versao_base', models.PositiveIntegerField(default=1)),
+                ('comprimento', models.PositiveIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('autor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='blog.post')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AlteracaoRascunho',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('versao', models.PositiveIntegerField()),
+                ('delta', models.JSONField()),
+                ('rascunho', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alteracoes', to='blog.rascunho')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='alteracaorascunho',
+            constraint=models.UniqueConstraint(fields=('rascunho', 'versao'), name='blog_alteracao_rascunho_versao'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0022_rascunho'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='estatistica',
+            name='chave',
+            field=models.PositiveBigIntegerField(),
+        ),
+    ]
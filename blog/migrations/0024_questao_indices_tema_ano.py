@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0023_estatistica_chave_bigint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['tema', 'ano', '-id'], name='blog_questao_tema_ano_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questao',
+            index=models.Index(fields=['ano', '-id'], name='blog_questao_ano_idx'),
+        ),
+    ]
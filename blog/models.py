@@ -1,18 +1,63 @@
+import html
+import re
+
 from django.conf import settings
 from django.db import models
 from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+from .destaque import destacar_codigo
+
+# Quantidade de palavras do resumo exibido nos cards da listagem.
+RESUMO_PALAVRAS = 10
+
+# Fim de blocos do HTML do Quill, que separam palavras no texto plano.
+_FIM_DE_BLOCO = re.compile(r'(</(?:p|div|li|h[1-6]|pre|blockquote)>|<br\s*/?>)', re.IGNORECASE)
+
 
 class Post(models.Model):
     autor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     titulo = models.CharField(max_length=200)
     texto = models.TextField()
+    # Derivados de texto, recalculados em save().
+    resumo = models.TextField(blank=True, editable=False)
+    texto_plano = models.TextField(blank=True, editable=False)
+    # Texto com os blocos de código já destacados pelo Pygments.
+    texto_html = models.TextField(blank=True, editable=False)
     criado_em = models.DateField(default=timezone.now)
     publicado_em = models.DateTimeField(blank=True, null=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Suporta a paginação por cursor de post_list.
+            models.Index(fields=['-publicado_em', '-id'], name='blog_post_publicado_id_idx'),
+        ]
 
     def publish(self):
         self.publicado_em = timezone.now()
         self.save()
 
+    def atualizar_derivados(self):
+        self.resumo = Truncator(self.texto).words(RESUMO_PALAVRAS, html=True)
+        texto = strip_tags(_FIM_DE_BLOCO.sub(r'\1 ', self.texto))
+        self.texto_plano = ' '.join(html.unescape(texto).split())
+        self.texto_html = destacar_codigo(self.texto)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # atualizado_em alimenta o ETag/Last-Modified das páginas do post.
+            update_fields = {*update_fields, 'atualizado_em'}
+        if 'texto' not in self.get_deferred_fields():
+            self.atualizar_derivados()
+            if update_fields is not None and 'texto' in update_fields:
+                update_fields |= {'resumo', 'texto_plano', 'texto_html'}
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return self.titulo
     
@@ -28,15 +73,173 @@ class Tema(models.Model):
     def __str__(self) -> str:
         return self.nome
 
+class QuestaoQuerySet(models.QuerySet):
+
+    def filtrar(self, vestibular=None, tema=None, ano=None):
+        """Aplica os filtros informados; valores vazios são ignorados."""
+        filtros = {}
+        if vestibular:
+            filtros['vestibular'] = vestibular
+        if tema:
+            filtros['tema'] = tema
+        if ano:
+            filtros['ano'] = ano
+        return self.filter(**filtros)
+
+
 class Questao(models.Model):
     enunciado = models.TextField()
     imagem = models.ImageField(upload_to='img/questao/', blank=True, null=True)
+    # Miniaturas e WebP gerados a partir de imagem (ver blog.imagens).
+    variantes = models.JSONField(default=dict, blank=True, editable=False)
     alternativas = models.TextField()
     ano = models.CharField(max_length=4)
     resposta = models.TextField()
     vestibular = models.ForeignKey(Vestibular, on_delete=models.CASCADE)
     tema = models.ForeignKey(Tema, on_delete=models.CASCADE)
 
+    objects = QuestaoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Filtros da listagem de questões, com o id para a paginação por cursor.
+            models.Index(fields=['vestibular', 'tema', 'ano', '-id'], name='blog_questao_filtros_idx'),
+            # Filtros sem vestibular (os do admin, por exemplo), que o índice
+            # acima não atende por começar pelo vestibular.
+            models.Index(fields=['tema', 'ano', '-id'], name='blog_questao_tema_ano_idx'),
+            models.Index(fields=['ano', '-id'], name='blog_questao_ano_idx'),
+        ]
+
+    def _srcset(self, tipo):
+        storage = self.imagem.storage
+        return ', '.join(f'{storage.url(nome)} {largura}w'
+                         for largura, nome in self.variantes.get(tipo, {}).items())
+
+    @property
+    def srcset(self):
+        """Miniaturas no formato original, mais o arquivo enviado."""
+        if not self.imagem:
+            return ''
+        original = f"{self.imagem.url} {self.variantes['largura']}w" if self.variantes else ''
+        return ', '.join(filter(None, [self._srcset('miniaturas'), original]))
+
+    @property
+    def srcset_webp(self):
+        return self._srcset('webp') if self.imagem else ''
+
+    def __str__(self) -> str:
+        return self.enunciado               
+
+class Tentativa(models.Model):
+    """Uma resposta dada a uma questão; ``usuario`` é vazio para anônimos."""
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    questao = models.ForeignKey(Questao, on_delete=models.CASCADE)
+    resposta = models.CharField(max_length=200)
+    correta = models.BooleanField()
+    criada_em = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['usuario', '-criada_em'], name='blog_tentativa_usuario_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.questao_id}: {self.resposta}'
+
+
+class Estatistica(models.Model):
+    """
+    Contadores de tentativas e acertos, mantidos a cada lote de respostas
+    (ver blog.estatisticas), para os painéis não agregarem as tentativas.
+    """
+    class Tipo(models.TextChoices):
+        QUESTAO = 'questao', 'Questão'
+        TEMA = 'tema', 'Tema'
+        VESTIBULAR = 'vestibular', 'Vestibular'
+        USUARIO = 'usuario', 'Usuário'
+
+    tipo = models.CharField(max_length=10, choices=Tipo.choices)
+    # Id da questão, tema, vestibular ou usuário, conforme o tipo; os ids
+    # são BigAutoField, então a chave também precisa de 64 bits.
+    chave = models.PositiveBigIntegerField()
+    tentativas = models.PositiveIntegerField(default=0)
+    acertos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'chave'], name='blog_estatistica_tipo_chave'),
+        ]
+
+    @property
+    def taxa_de_acerto(self):
+        return self.acertos / self.tentativas if self.tentativas else 0.0
+
+    def __str__(self) -> str:
+        return f'{self.tipo} {self.chave}: {self.acertos}/{self.tentativas}'
+
+
+class Revisao(models.Model):
+    """
+    Uma versão de um post. O texto é guardado comprimido, inteiro
+    (``profundidade`` 0) ou como diferença para a revisão anterior
+    (ver blog.revisoes).
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='revisoes')
+    numero = models.PositiveIntegerField()
+    titulo = models.CharField(max_length=200)
+    dados = models.BinaryField()
+    # Diferenças até a última revisão completa; 0 na revisão completa.
+    profundidade = models.PositiveSmallIntegerField(default=0)
+    # Bytes do texto em UTF-8 e bytes guardados em dados, para o relatório.
+    tamanho = models.PositiveIntegerField()
+    armazenado = models.PositiveIntegerField()
+    autor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    criada_em = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'numero'], name='blog_revisao_post_numero'),
+        ]
+
+    @property
+    def completa(self):
+        return self.profundidade == 0
+
+    def __str__(self) -> str:
+        return f'{self.post_id} #{self.numero}'
+
+
+class Rascunho(models.Model):
+    """
+    Rascunho salvo automaticamente pelo editor, como um Delta do Quill.
+    ``conteudo`` corresponde a ``versao_base``; as alterações seguintes
+    ficam em AlteracaoRascunho até serem compactadas (ver blog.rascunhos).
+    """
+    autor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Vazio para um post ainda não criado.
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, null=True, blank=True)
+    titulo = models.CharField(max_length=200, blank=True)
+    conteudo = models.JSONField(default=list)
+    versao = models.PositiveIntegerField(default=1)
+    versao_base = models.PositiveIntegerField(default=1)
+    # Comprimento do documento na versão atual, nas unidades do Quill.
+    comprimento = models.PositiveIntegerField(default=0)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f'{self.titulo or "Sem título"} (v{self.versao})'
+
+
+class AlteracaoRascunho(models.Model):
+    rascunho = models.ForeignKey(Rascunho, on_delete=models.CASCADE, related_name='alteracoes')
+    # Versão do rascunho que esta alteração produz.
+    versao = models.PositiveIntegerField()
+    delta = models.JSONField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rascunho', 'versao'], name='blog_alteracao_rascunho_versao'),
+        ]
 
     def __str__(self) -> str:
-        return self.enunciado               
\ No newline at end of file
+        return f'{self.rascunho_id} v{self.versao}'
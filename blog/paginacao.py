@@ -0,0 +1,152 @@
+"""
+Paginação por cursor (keyset) para as listagens públicas.
+
+Em vez de OFFSET, cada página é buscada a partir dos valores da última
+linha vista, o que mantém o custo da consulta constante independente do
+tamanho da tabela (desde que exista um índice nos campos de ordenação).
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class Pagina:
+    """Resultado de uma paginação: os itens e os cursores vizinhos."""
+
+    def __init__(self, itens, proximo=None, anterior=None):
+        self.itens = itens
+        self.proximo = proximo
+        self.anterior = anterior
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+
+def codificar_cursor(obj, campos):
+    valores = []
+    for campo in campos:
+        valor = getattr(obj, campo)
+        if isinstance(valor, (datetime.date, datetime.datetime)):
+            valor = valor.isoformat()
+        valores.append(valor)
+    dados = json.dumps(valores, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(dados).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, model, campos):
+    """Retorna os valores do cursor ou None se ele for inválido."""
+    try:
+        dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valores = json.loads(dados)
+        if not isinstance(valores, list) or len(valores) != len(campos):
+            return None
+        return [model._meta.get_field(campo).to_python(valor)
+                for campo, valor in zip(campos, valores)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _filtro_keyset(campos, valores, lookup):
+    # (a, b) < (x, y)  ==>  a < x OR (a = x AND b < y)
+    filtro = Q()
+    for i, campo in enumerate(campos):
+        condicao = Q(**{f'{campo}__{lookup}': valores[i]})
+        for anterior, valor in zip(campos[:i], valores[:i]):
+            condicao &= Q(**{anterior: valor})
+        filtro |= condicao
+    return filtro
+
+
+def _consulta(queryset, campos, depois, antes, tamanho):
+    model = queryset.model
+    valores = None
+    voltando = False
+    if antes:
+        valores = decodificar_cursor(antes, model, campos)
+        voltando = valores is not None
+    if valores is None and depois:
+        valores = decodificar_cursor(depois, model, campos)
+
+    consulta = queryset
+    if valores is not None:
+        consulta = consulta.filter(_filtro_keyset(campos, valores, 'gt' if voltando else 'lt'))
+    ordem = list(campos) if voltando else ['-' + campo for campo in campos]
+    return consulta.order_by(*ordem)[:tamanho + 1], valores, voltando
+
+
+def _pagina(itens, campos, valores, voltando, tamanho):
+    """Monta a página a partir das linhas lidas; ``None`` pede a primeira página."""
+    tem_mais = len(itens) > tamanho
+    itens = itens[:tamanho]
+
+    if voltando:
+        if not tem_mais:
+            # Chegamos ao início da lista: devolve a primeira página completa.
+            return None
+        itens.reverse()
+        tem_proximo, tem_anterior = True, True
+    else:
+        tem_proximo, tem_anterior = tem_mais, valores is not None
+
+    proximo = codificar_cursor(itens[-1], campos) if itens and tem_proximo else None
+    anterior = codificar_cursor(itens[0], campos) if itens and tem_anterior else None
+    return Pagina(itens, proximo=proximo, anterior=anterior)
+
+
+def paginar(queryset, campos, depois=None, antes=None, tamanho=10):
+    """
+    Pagina ``queryset`` em ordem decrescente de ``campos``.
+
+    ``depois`` e ``antes`` são cursores gerados por esta função; o último
+    campo deve ser único (normalmente ``id``) para desempatar as linhas.
+    Cursores inválidos são ignorados e levam à primeira página.
+    """
+    consulta, valores, voltando = _consulta(queryset, campos, depois, antes, tamanho)
+    pagina = _pagina(list(consulta), campos, valores, voltando, tamanho)
+    if pagina is None:
+        return paginar(queryset, campos, tamanho=tamanho)
+    return pagina
+
+
+async def apaginar(queryset, campos, depois=None, antes=None, tamanho=10):
+    """Versão assíncrona de ``paginar``, para views async."""
+    consulta, valores, voltando = _consulta(queryset, campos, depois, antes, tamanho)
+    pagina = _pagina([item async for item in consulta], campos, valores, voltando, tamanho)
+    if pagina is None:
+        return await apaginar(queryset, campos, tamanho=tamanho)
+    return pagina
+
+
+def estimar_linhas(queryset):
+    """
+    Linhas que o planejador do PostgreSQL espera para ``queryset``, sem
+    executá-lo; ``None`` nos outros bancos.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    plano = json.loads(queryset.order_by().explain(format='json'))
+    return int(plano[0]['Plan']['Plan Rows'])
+
+
+class PaginatorEstimado(Paginator):
+    """
+    Paginator para tabelas grandes (admin): acima de ``limite_exato``
+    linhas estimadas, usa a estimativa em vez de um ``COUNT(*)``.
+    """
+    limite_exato = 10000
+
+    @cached_property
+    def count(self):
+        estimativa = estimar_linhas(self.object_list)
+        if estimativa is None or estimativa < self.limite_exato:
+            return super().count
+        return estimativa
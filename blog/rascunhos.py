@@ -0,0 +1,199 @@
+"""
+Rascunhos salvos automaticamente pelo editor Quill.
+
+O editor envia só o Delta das mudanças desde o último salvamento, junto
+com a versão sobre a qual ele foi feito. Cada salvamento é um UPDATE
+condicional da versão (controle de concorrência otimista: quem estiver
+atrás recebe ``ConflitoDeVersao``) mais o INSERT do delta, sem regravar o
+documento. A cada ``COMPACTAR_A_CADA`` versões os deltas são aplicados a
+``Rascunho.conteudo`` e apagados. Rascunhos que ninguém mais salva são
+removidos pelo comando ``limpar_rascunhos``.
+
+Os comprimentos seguem o Quill: texto conta em unidades UTF-16, como o
+``length`` do JavaScript, e cada embed (imagem, fórmula) conta 1.
+"""
+from collections import deque
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import AlteracaoRascunho, Rascunho
+
+COMPACTAR_A_CADA = 50
+
+
+class DeltaInvalido(ValueError):
+    pass
+
+
+class ConflitoDeVersao(Exception):
+    def __init__(self, versao):
+        super().__init__(f"O rascunho já está na versão {versao}.")
+        self.versao = versao
+
+
+def _comprimento(insert):
+    if isinstance(insert, str):
+        return len(insert.encode('utf-16-le', 'surrogatepass')) // 2
+    return 1
+
+
+def _fatiar(texto, inicio, fim):
+    unidades = texto.encode('utf-16-le', 'surrogatepass')
+    return unidades[2 * inicio:2 * fim].decode('utf-16-le', 'surrogatepass')
+
+
+def validar(delta, comprimento):
+    """
+    Confere a forma de ``delta`` e se ele cabe em um documento de
+    ``comprimento`` unidades; devolve o comprimento depois de aplicá-lo.
+    """
+    if not isinstance(delta, list):
+        raise DeltaInvalido("O delta deve ser uma lista de operações.")
+    consumido = inserido = removido = 0
+    for op in delta:
+        if not isinstance(op, dict) or not isinstance(op.get('attributes', {}), dict):
+            raise DeltaInvalido(f"Operação inválida: {op!r}")
+        tipos = set(op) - {'attributes'}
+        if len(tipos) != 1:
+            raise DeltaInvalido(f"Operação inválida: {op!r}")
+        tipo = tipos.pop()
+        valor = op[tipo]
+        if tipo == 'insert':
+            if not (isinstance(valor, str) and valor or isinstance(valor, dict) and len(valor) == 1):
+                raise DeltaInvalido(f"Inserção inválida: {valor!r}")
+            inserido += _comprimento(valor)
+        elif tipo in ('retain', 'delete'):
+            if type(valor) is not int or valor < 1:
+                raise DeltaInvalido(f"Valor inválido para {tipo}: {valor!r}")
+            consumido += valor
+            if tipo == 'delete':
+                removido += valor
+        else:
+            raise DeltaInvalido(f"Operação desconhecida: {tipo}")
+    if consumido > comprimento:
+        raise DeltaInvalido("O delta passa do fim do documento.")
+    return comprimento + inserido - removido
+
+
+def _com_atributos(op, atributos):
+    combinados = {**op.get('attributes', {}), **atributos}
+    combinados = {nome: valor for nome, valor in combinados.items() if valor is not None}
+    op = {'insert': op['insert']}
+    if combinados:
+        op['attributes'] = combinados
+    return op
+
+
+def _acrescentar(documento, op):
+    op = ({'insert': op['insert'], 'attributes': op['attributes']} if op.get('attributes')
+          else {'insert': op['insert']})
+    if documento:
+        ultima = documento[-1]
+        if (isinstance(ultima['insert'], str) and isinstance(op['insert'], str)
+                and ultima.get('attributes') == op.get('attributes')):
+            documento[-1] = {**ultima, 'insert': ultima['insert'] + op['insert']}
+            return
+    documento.append(op)
+
+
+def compor(documento, delta):
+    """Aplica ``delta`` a ``documento`` (um Delta só de inserções)."""
+    fila = deque(documento)
+    resultado = []
+
+    def tirar(quantidade):
+        while quantidade > 0:
+            if not fila:
+                raise DeltaInvalido("O delta passa do fim do documento.")
+            op = fila.popleft()
+            tamanho = _comprimento(op['insert'])
+            if tamanho > quantidade:
+                fila.appendleft({**op, 'insert': _fatiar(op['insert'], quantidade, tamanho)})
+                op = {**op, 'insert': _fatiar(op['insert'], 0, quantidade)}
+                tamanho = quantidade
+            quantidade -= tamanho
+            yield op
+
+    for op in delta:
+        if 'insert' in op:
+            _acrescentar(resultado, op)
+        elif 'retain' in op:
+            for parte in tirar(op['retain']):
+                if op.get('attributes'):
+                    parte = _com_atributos(parte, op['attributes'])
+                _acrescentar(resultado, parte)
+        else:
+            for _ in tirar(op['delete']):
+                pass
+    for op in fila:
+        _acrescentar(resultado, op)
+    return resultado
+
+
+def criar_rascunho(autor, delta, titulo='', post=None):
+    comprimento = validar(delta, 0)
+    return Rascunho.objects.create(autor=autor, post=post, titulo=titulo,
+                                   conteudo=compor([], delta), comprimento=comprimento)
+
+
+def salvar_rascunho(rascunho_id, autor, versao, delta, titulo=None, substituir=False):
+    """
+    Registra ``delta``, feito sobre a ``versao`` do rascunho, e devolve a
+    nova versão. Com ``substituir``, ``delta`` é o documento inteiro.
+    """
+    with transaction.atomic():
+        atual = (Rascunho.objects.filter(pk=rascunho_id, autor=autor)
+                 .values('versao', 'versao_base', 'comprimento').first())
+        if atual is None:
+            raise Rascunho.DoesNotExist
+        if atual['versao'] != versao:
+            raise ConflitoDeVersao(atual['versao'])
+
+        campos = {'versao': F('versao') + 1, 'atualizado_em': timezone.now()}
+        if titulo is not None:
+            campos['titulo'] = titulo
+        if substituir:
+            campos.update(comprimento=validar(delta, 0), conteudo=compor([], delta), versao_base=versao + 1)
+        else:
+            campos['comprimento'] = validar(delta, atual['comprimento'])
+        # O filtro pela versão fecha a corrida com outro salvamento simultâneo.
+        if not Rascunho.objects.filter(pk=rascunho_id, versao=versao).update(**campos):
+            raise ConflitoDeVersao(Rascunho.objects.values_list('versao', flat=True).get(pk=rascunho_id))
+
+        if substituir:
+            AlteracaoRascunho.objects.filter(rascunho_id=rascunho_id).delete()
+        else:
+            AlteracaoRascunho.objects.create(rascunho_id=rascunho_id, versao=versao + 1, delta=delta)
+            if versao + 1 - atual['versao_base'] >= COMPACTAR_A_CADA:
+                compactar(rascunho_id)
+    return versao + 1
+
+
+def _pendentes(rascunho):
+    return (rascunho.alteracoes.filter(versao__gt=rascunho.versao_base)
+            .order_by('versao').values_list('versao', 'delta'))
+
+
+def documento(rascunho):
+    """
+    Conteúdo atual: ``conteudo`` mais os deltas ainda não compactados.
+    ``rascunho`` deve ter sido lido com ``select_for_update``, na mesma
+    transação, para ``compactar`` não mudar nada entre as duas leituras.
+    """
+    conteudo = rascunho.conteudo
+    for _, delta in _pendentes(rascunho):
+        conteudo = compor(conteudo, delta)
+    return conteudo
+
+
+def compactar(rascunho_id):
+    with transaction.atomic():
+        rascunho = Rascunho.objects.select_for_update().get(pk=rascunho_id)
+        conteudo = rascunho.conteudo
+        versao_base = rascunho.versao_base
+        for versao_base, delta in _pendentes(rascunho):
+            conteudo = compor(conteudo, delta)
+        Rascunho.objects.filter(pk=rascunho_id).update(conteudo=conteudo, versao_base=versao_base)
+        rascunho.alteracoes.filter(versao__lte=versao_base).delete()
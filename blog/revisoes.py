@@ -0,0 +1,117 @@
+"""
+Histórico de revisões dos posts.
+
+Cada revisão guarda o texto comprimido com zlib: a cada
+``INTERVALO_COMPLETAS`` revisões, o texto inteiro; nas demais, só a
+diferença para a revisão anterior. A diferença é calculada sobre tokens do
+HTML (tags, palavras e espaços) e gravada como uma lista em JSON em que
+``[inicio, fim]`` copia um trecho do texto anterior e uma string é texto
+novo. Remontar qualquer revisão lê no máximo ``INTERVALO_COMPLETAS``
+linhas e aplica as diferenças a partir da última revisão completa.
+"""
+import json
+import re
+import zlib
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import Post, Revisao
+
+INTERVALO_COMPLETAS = 10
+
+_TOKENS = re.compile(r'<[^>]*>|[^<\s]+|\s+|<')
+
+
+def _comprimir(texto):
+    return zlib.compress(texto.encode(), 9)
+
+
+def _descomprimir(dados):
+    return zlib.decompress(bytes(dados)).decode()
+
+
+def diferenca(anterior, novo):
+    """Operações que transformam ``anterior`` em ``novo``."""
+    tokens_anteriores = _TOKENS.findall(anterior)
+    tokens_novos = _TOKENS.findall(novo)
+    posicoes = [0]
+    for token in tokens_anteriores:
+        posicoes.append(posicoes[-1] + len(token))
+
+    operacoes = []
+    matcher = SequenceMatcher(None, tokens_anteriores, tokens_novos)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            operacoes.append([posicoes[i1], posicoes[i2]])
+        elif tag != 'delete':
+            operacoes.append(''.join(tokens_novos[j1:j2]))
+    return operacoes
+
+
+def aplicar(anterior, operacoes):
+    return ''.join(anterior[op[0]:op[1]] if isinstance(op, list) else op for op in operacoes)
+
+
+def texto_da_revisao(revisao):
+    """Remonta o texto de ``revisao`` a partir da última revisão completa."""
+    cadeia = (Revisao.objects
+              .filter(post_id=revisao.post_id,
+                      numero__range=(revisao.numero - revisao.profundidade, revisao.numero))
+              .order_by('numero').values_list('profundidade', 'dados'))
+    texto = None
+    for profundidade, dados in cadeia:
+        conteudo = _descomprimir(dados)
+        texto = conteudo if profundidade == 0 else aplicar(texto, json.loads(conteudo))
+    return texto
+
+
+def registrar_revisao(post, autor=None):
+    """
+    Grava o título e o texto atuais de ``post`` como uma nova revisão.
+    Devolve ``None`` se nada mudou desde a última.
+    """
+    with transaction.atomic():
+        # Serializa as revisões do mesmo post, para o número não se repetir.
+        Post.objects.select_for_update().filter(pk=post.pk).values_list('pk').first()
+        ultima = post.revisoes.defer('dados').order_by('-numero').first()
+        completa = _comprimir(post.texto)
+        revisao = Revisao(post=post, titulo=post.titulo, autor=autor,
+                          tamanho=len(post.texto.encode()), numero=1, dados=completa)
+        if ultima is not None:
+            anterior = texto_da_revisao(ultima)
+            if anterior == post.texto and ultima.titulo == post.titulo:
+                return None
+            revisao.numero = ultima.numero + 1
+            if ultima.profundidade + 1 < INTERVALO_COMPLETAS:
+                delta = _comprimir(json.dumps(diferenca(anterior, post.texto), ensure_ascii=False))
+                # Uma reescrita quase total sai maior como diferença.
+                if len(delta) < len(completa):
+                    revisao.dados = delta
+                    revisao.profundidade = ultima.profundidade + 1
+        revisao.armazenado = len(revisao.dados)
+        revisao.save()
+    return revisao
+
+
+def garantir_revisao_inicial(post):
+    """Registra o texto atual de posts anteriores ao histórico."""
+    if not post.revisoes.exists():
+        registrar_revisao(Post.objects.only('id', 'titulo', 'texto').get(pk=post.pk))
+
+
+def relatorio(posts=None):
+    """Revisões e bytes guardados por post, com o que ocupariam sem compressão."""
+    revisoes = Revisao.objects.all()
+    if posts is not None:
+        revisoes = revisoes.filter(post__in=posts)
+    linhas = list(revisoes.values('post', 'post__titulo').annotate(
+        revisoes=Count('id'),
+        completas=Count('id', filter=Q(profundidade=0)),
+        armazenado=Sum('armazenado'),
+        tamanho=Sum('tamanho'),
+    ).order_by('-armazenado'))
+    for linha in linhas:
+        linha['proporcao'] = round(linha['armazenado'] / linha['tamanho'], 4) if linha['tamanho'] else 0.0
+    return linhas
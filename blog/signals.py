@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autenticacao import esquecer_usuario
+from .cache import GRUPO_QUESTOES, invalidar, invalidar_post
+from .imagens import agendar_variantes
+from .models import Post, Questao
+
+# Migração que cria as estruturas da busca textual (ver blog.busca).
+MIGRACAO_BUSCA = ('blog', '0015_questao_busca')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidar_cache_do_post(sender, instance, **kwargs):
+    # Cobre criar_post, editar, deletar, o admin e Post.publish().
+    invalidar_post(instance.pk)
+
+
+@receiver(post_save, sender=Questao)
+@receiver(post_delete, sender=Questao)
+def invalidar_cache_das_questoes(sender, instance, **kwargs):
+    # Os ids candidatos dos simulados (blog.simulado) dependem do banco todo.
+    invalidar(GRUPO_QUESTOES)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def esquecer_usuario_em_cache(sender, instance, **kwargs):
+    # Inclui o last_login gravado a cada login e as trocas de senha.
+    esquecer_usuario(instance.pk)
+
+
+@receiver(post_save, sender=Questao)
+def gerar_variantes_da_imagem(sender, instance, **kwargs):
+    if instance.imagem and instance.variantes.get('origem') != instance.imagem.name:
+        pk = instance.pk
+        transaction.on_commit(lambda: agendar_variantes(pk))
+
+
+def instalar_busca(sender, using='default', **kwargs):
+    # Conectado ao post_migrate em BlogConfig.ready(): refaz os triggers do
+    # SQLite caso uma migração tenha recriado a tabela de questões.
+    from .busca import get_backend
+
+    conexao = connections[using]
+    if MIGRACAO_BUSCA not in MigrationRecorder(conexao).applied_migrations():
+        return
+    with conexao.schema_editor() as schema_editor:
+        get_backend(conexao).instalar(schema_editor)
+
@@ -0,0 +1,89 @@
+"""
+Simulados: questões sorteadas por tema.
+
+Em vez de ``order_by('?')``, que ordena a tabela inteira a cada sorteio,
+o cache guarda, para cada combinação de vestibular/ano, quantas questões
+há em cada tema e, separadamente, a lista de ids de cada tema. As
+contagens bastam para distribuir as cotas; depois só as listas dos temas
+sorteados são lidas, e sortear N questões é um ``random.sample`` nelas
+mais um ``in_bulk`` dos ids escolhidos, independente do tamanho do banco.
+Tudo é descartado quando alguma questão muda (sinais e ``import_questoes``).
+"""
+import random
+from django.db.models import Count
+
+from .cache import GRUPO_QUESTOES, memorizar
+from .models import Questao
+
+DISTRIBUICOES = ('uniforme', 'proporcional')
+
+
+def _filtro(vestibular, ano):
+    return f'{vestibular or ""}:{ano or ""}'
+
+
+def contagem_por_tema(vestibular=None, ano=None):
+    """``{tema_id: quantidade}`` das questões do vestibular/ano, vindo do cache."""
+    def calcular():
+        linhas = (Questao.objects.filtrar(vestibular=vestibular, ano=ano).order_by()
+                  .values_list('tema_id').annotate(quantidade=Count('id')))
+        return dict(linhas)
+    return memorizar(GRUPO_QUESTOES, f'simulado:contagem:{_filtro(vestibular, ano)}', calcular)
+
+
+def ids_do_tema(tema, vestibular=None, ano=None):
+    """Ids das questões do tema no vestibular/ano, vindos do cache."""
+    def calcular():
+        return list(Questao.objects.filtrar(vestibular=vestibular, tema=tema, ano=ano)
+                    .order_by().values_list('id', flat=True))
+    return memorizar(GRUPO_QUESTOES, f'simulado:ids:{_filtro(vestibular, ano)}:{tema}', calcular)
+
+
+def distribuir(total, disponiveis, modo='uniforme', aleatorio=random):
+    """
+    Divide ``total`` questões entre os temas de ``disponiveis``
+    (``{tema: quantidade de questões}``), sem passar do que cada um tem.
+
+    ``uniforme`` dá a mesma cota a cada tema; ``proporcional`` segue o
+    tamanho de cada tema. O que sobra da divisão vai para temas sorteados.
+    """
+    if modo not in DISTRIBUICOES:
+        raise ValueError(f"Distribuição desconhecida: {modo}")
+    cotas = {tema: 0 for tema, quantidade in disponiveis.items() if quantidade > 0}
+    restante = min(total, sum(disponiveis[tema] for tema in cotas))
+    abertos = list(cotas)
+    while restante > 0:
+        livres = {tema: disponiveis[tema] - cotas[tema] for tema in abertos}
+        soma = sum(livres.values())
+        parcelas = {}
+        for tema in abertos:
+            peso = livres[tema] / soma if modo == 'proporcional' else 1 / len(abertos)
+            parcelas[tema] = min(int(restante * peso), livres[tema])
+        if not any(parcelas.values()):
+            for tema in aleatorio.sample(abertos, min(restante, len(abertos))):
+                parcelas[tema] = 1
+        for tema, parcela in parcelas.items():
+            cotas[tema] += parcela
+            restante -= parcela
+        abertos = [tema for tema in abertos if cotas[tema] < disponiveis[tema]]
+    return {tema: cota for tema, cota in cotas.items() if cota}
+
+
+def sortear(cotas, vestibular=None, ano=None, aleatorio=random, candidatos=None):
+    """
+    Sorteia ``cotas[tema]`` questões de cada tema e devolve as questões
+    (com vestibular e tema) em ordem aleatória.
+
+    ``candidatos`` (``{tema_id: [ids]}``) evita reler do cache as listas
+    que quem chama já tem; as demais vêm de ``ids_do_tema``.
+    """
+    candidatos = candidatos or {}
+    escolhidos = []
+    for tema, quantidade in cotas.items():
+        tema = int(tema)
+        ids = candidatos[tema] if tema in candidatos else ids_do_tema(tema, vestibular=vestibular, ano=ano)
+        escolhidos += aleatorio.sample(ids, min(quantidade, len(ids)))
+    aleatorio.shuffle(escolhidos)
+    questoes = Questao.objects.select_related('vestibular', 'tema').in_bulk(escolhidos)
+    # Uma questão removida depois do cache só some do simulado.
+    return [questoes[pk] for pk in escolhidos if pk in questoes]
@@ -0,0 +1,150 @@
+// Autosave dos rascunhos do editor (ver blog/rascunhos.py). O primeiro
+// salvamento envia o documento inteiro; os seguintes, só o Delta das
+// mudanças feitas desde então, com a versão sobre a qual ele se aplica.
+function autosaveRascunho(quill, opcoes) {
+  const Delta = Quill.import('delta');
+  const csrf = document.querySelector('[name=csrfmiddlewaretoken]').value;
+  const campo = document.getElementById('rascunho');
+  const titulo = document.getElementById('titulo');
+  let rascunho = null;
+  let versao = null;
+  let pendente = new Delta();
+  let tituloAlterado = false;
+  let substituir = false;
+  let enviando = false;
+  // Muda a cada reiniciar(): respostas de pedidos feitos antes dele são de
+  // outro documento e não podem mexer no estado atual.
+  let geracao = 0;
+
+  function chave() {
+    const post = opcoes.post();
+    return post ? 'rascunho:post:' + post : 'rascunho:novo';
+  }
+
+  function definir(id, novaVersao) {
+    rascunho = id;
+    versao = novaVersao;
+    campo.value = id || '';
+    if (id) {
+      localStorage.setItem(chave(), id);
+    }
+  }
+
+  quill.on('text-change', function(delta, antigo, origem) {
+    // Conteúdo carregado pela página (origem 'api') não é edição.
+    if (origem === 'user') {
+      pendente = pendente.compose(delta);
+    }
+  });
+  titulo.addEventListener('input', function() {
+    tituloAlterado = true;
+  });
+
+  async function salvar() {
+    if (enviando || opcoes.post() === undefined || (!pendente.ops.length && !tituloAlterado)) {
+      return;
+    }
+    let corpo;
+    if (!rascunho) {
+      corpo = {delta: quill.getContents().ops, titulo: titulo.value, post: opcoes.post()};
+    } else if (substituir) {
+      corpo = {rascunho: rascunho, versao: versao, delta: quill.getContents().ops,
+               titulo: titulo.value, substituir: true};
+    } else {
+      corpo = {rascunho: rascunho, versao: versao, delta: pendente.ops, titulo: titulo.value};
+    }
+    const enviado = pendente;
+    const minha = geracao;
+    const chaveDoPedido = chave();
+    pendente = new Delta();
+    tituloAlterado = false;
+    enviando = true;
+    try {
+      const resposta = await fetch(opcoes.url, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrf},
+        body: JSON.stringify(corpo),
+      });
+      const dados = await resposta.json();
+      if (minha !== geracao) {
+        // O editor já está em outro post: só guarda o rascunho do anterior.
+        if (resposta.ok) {
+          localStorage.setItem(chaveDoPedido, dados.rascunho);
+        }
+        return;
+      }
+      if (resposta.ok) {
+        substituir = false;
+        definir(dados.rascunho, dados.versao);
+      } else if (resposta.status === 409) {
+        // Outra aba salvou antes: a próxima gravação envia o documento inteiro.
+        versao = dados.versao;
+        substituir = true;
+        pendente = enviado.compose(pendente);
+        tituloAlterado = true;
+      } else if (resposta.status === 404) {
+        definir(null, null);
+        localStorage.removeItem(chave());
+      } else {
+        pendente = enviado.compose(pendente);
+      }
+    } catch (erro) {
+      if (minha === geracao) {
+        pendente = enviado.compose(pendente);
+      }
+    } finally {
+      if (minha === geracao) {
+        enviando = false;
+      }
+    }
+  }
+
+  async function recuperar() {
+    const minha = geracao;
+    const id = localStorage.getItem(chave());
+    if (!id) {
+      return;
+    }
+    // urlDetalhe termina em /0/; só esse último trecho é trocado, para um 0
+    // em outra parte da URL (um prefixo como /v0/) não ser substituído.
+    const resposta = await fetch(opcoes.urlDetalhe.replace(/\/0\/$/, '/' + encodeURIComponent(id) + '/'));
+    if (minha !== geracao) {
+      return;
+    }
+    if (!resposta.ok) {
+      localStorage.removeItem(chave());
+      return;
+    }
+    const dados = await resposta.json();
+    if (minha !== geracao) {
+      return;
+    }
+    const quando = new Date(dados.atualizado_em).toLocaleString();
+    if (confirm('Recuperar o rascunho salvo em ' + quando + '?')) {
+      quill.setContents(dados.delta, 'api');
+      titulo.value = dados.titulo;
+      definir(dados.rascunho, dados.versao);
+    } else {
+      // Continua no mesmo rascunho; a próxima edição sobrescreve o conteúdo.
+      definir(dados.rascunho, dados.versao);
+      substituir = true;
+    }
+  }
+
+  setInterval(salvar, opcoes.intervalo || 5000);
+  return {
+    // Chamado quando o editor recebe outro documento (outro post).
+    reiniciar: function() {
+      geracao += 1;
+      definir(null, null);
+      pendente = new Delta();
+      tituloAlterado = false;
+      substituir = false;
+      enviando = false;
+      return recuperar();
+    },
+    concluir: function() {
+      localStorage.removeItem(chave());
+    },
+  };
+}
@@ -0,0 +1,15 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticComprimido(CompressedManifestStaticFilesStorage):
+    """
+    Nomes com hash (cache de longa duração) e versões .gz/.br geradas no
+    collectstatic.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # Sem staticfiles.json o collectstatic ainda não rodou, como no
+            # desenvolvimento e nos testes: usa o nome original.
+            return name
+        return super().stored_name(name)
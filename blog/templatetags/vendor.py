@@ -0,0 +1,23 @@
+from django import template
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+
+from ..vendor import VENDOR
+
+register = template.Library()
+
+
+def _vendorizado(caminho):
+    manifesto = getattr(staticfiles_storage, 'hashed_files', None)
+    if manifesto:
+        # Depois do collectstatic vale o que foi publicado, não o que está no disco.
+        return caminho in manifesto
+    return finders.find(caminho) is not None
+
+
+@register.simple_tag
+def vendor(nome):
+    """URL da cópia local da biblioteca ou, se ela não existir, da CDN."""
+    cdn, caminho = VENDOR[nome]
+    return static(caminho) if _vendorizado(caminho) else cdn
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post, Questao, Tema, Vestibular
+from ..paginacao import PaginatorEstimado
+
+
+class AdminTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(username='admin', password='12345')
+        self.client.force_login(self.user)
+        self.enem = Vestibular.objects.create(nome='ENEM')
+        self.tema = Tema.objects.create(nome='Biologia')
+        for i in range(30):
+            Questao.objects.create(enunciado=f'Enunciado {i} ' + 'muito longo ' * 20, alternativas='-',
+                                   resposta='A', ano=str(2000 + i % 3), vestibular=self.enem, tema=self.tema)
+        Questao.objects.create(enunciado='Mitocôndria e respiração celular', alternativas='-', resposta='A',
+                               ano='2020', vestibular=self.enem, tema=self.tema)
+
+    def test_listagem_de_questoes_resumida(self):
+        response = self.client.get(reverse('admin:blog_questao_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Enunciado 29 muito longo')
+        self.assertNotContains(response, 'muito longo ' * 20)
+        self.assertContains(response, '?ano=2002')
+
+    def test_consultas_nao_dependem_do_tamanho_da_pagina(self):
+        url = reverse('admin:blog_questao_changelist')
+        self.client.get(url)
+        # Opções dos filtros de vestibular e tema, COUNT e a página; sessão,
+        # usuário e anos vêm do cache e nada é buscado linha a linha.
+        with self.assertNumQueries(4):
+            response = self.client.get(url, {'vestibular__id__exact': self.enem.pk, 'ano': '2001'})
+        self.assertEqual(response.context['cl'].result_count, 10)
+
+    def test_busca_usa_o_backend_de_busca(self):
+        response = self.client.get(reverse('admin:blog_questao_changelist'), {'q': 'mitocondria'})
+        self.assertContains(response, 'Mitocôndria e respiração celular')
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_listagem_de_posts(self):
+        Post.objects.create(autor=self.user, titulo='Post 1', texto='<p>x</p>', publicado_em=timezone.now())
+        response = self.client.get(reverse('admin:blog_post_changelist'))
+        self.assertContains(response, 'Post 1')
+        self.assertEqual(self.client.get(reverse('admin:blog_questao_change',
+                                                 args=[Questao.objects.first().pk])).status_code, 200)
+
+
+class PaginatorEstimadoTests(TestCase):
+
+    def setUp(self):
+        Vestibular.objects.bulk_create(Vestibular(nome=str(i)) for i in range(5))
+
+    def test_contagem_exata_fora_do_postgresql(self):
+        self.assertEqual(PaginatorEstimado(Vestibular.objects.all(), 2).count, 5)
+
+    def test_usa_a_estimativa_em_tabelas_grandes(self):
+        with mock.patch('blog.paginacao.estimar_linhas', return_value=500000):
+            paginator = PaginatorEstimado(Vestibular.objects.all(), 100)
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, 500000)
+        with mock.patch('blog.paginacao.estimar_linhas', return_value=3):
+            self.assertEqual(PaginatorEstimado(Vestibular.objects.all(), 2).count, 5)
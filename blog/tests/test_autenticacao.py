@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..autenticacao import esquecer_todos
+
+
+class SessaoEUsuarioEmCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        esquecer_todos()
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.client.force_login(self.user)
+
+    def consultas_de_sessao(self, url):
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in consultas
+                if 'django_session' in q['sql'] or 'auth_user' in q['sql']]
+
+    def test_painel_sem_consultas_de_sessao_com_cache_quente(self):
+        self.assertEqual(len(self.consultas_de_sessao(reverse('painel'))), 1)
+        self.assertEqual(self.consultas_de_sessao(reverse('painel')), [])
+        self.assertEqual(self.consultas_de_sessao(reverse('editar')), [])
+
+    def test_sessao_anterior_ao_backend_com_cache(self):
+        self.client.logout()
+        self.client.force_login(self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get(reverse('painel'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_salvar_o_usuario_descarta_o_cache(self):
+        self.client.get(reverse('painel'))
+        self.user.username = 'renomeado'
+        self.user.save()
+        response = self.client.get(reverse('painel'))
+        self.assertContains(response, 'renomeado')
+
+    def test_trocar_a_senha_encerra_a_sessao(self):
+        self.client.get(reverse('painel'))
+        self.user.set_password('outra')
+        self.user.save()
+        response = self.client.get(reverse('painel'))
+        self.assertRedirects(response, f"{reverse('login')}?next={reverse('painel')}")
+
+    @override_settings(CACHE_USUARIOS_TIMEOUT=0)
+    def test_cache_de_usuarios_desligado(self):
+        self.client.get(reverse('painel'))
+        self.assertEqual(len(self.consultas_de_sessao(reverse('painel'))), 1)
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+class SessaoEmCookieTests(TestCase):
+
+    def test_login_sem_tabela_de_sessoes(self):
+        esquecer_todos()
+        get_user_model().objects.create_user(username='testuser', password='12345')
+        response = self.client.post(reverse('login'), {'username': 'testuser', 'password': '12345'})
+        self.assertEqual(response.status_code, 302)
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get(reverse('painel'))
+            self.client.get(reverse('painel'))
+        self.assertFalse([q for q in consultas if 'django_session' in q['sql']])
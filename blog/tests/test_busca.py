@@ -0,0 +1,61 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..busca import ContemBusca, buscar_questoes, get_backend
+from ..models import Questao, Tema, Vestibular
+
+
+class BuscaQuestoesTests(TestCase):
+
+    def setUp(self):
+        self.enem = Vestibular.objects.create(nome='ENEM')
+        self.fuvest = Vestibular.objects.create(nome='FUVEST')
+        self.biologia = Tema.objects.create(nome='Biologia')
+        self.fisica = Tema.objects.create(nome='Física')
+        self.mitocondria = Questao.objects.create(
+            enunciado='Qual é a função da mitocôndria na célula?',
+            alternativas='A) Respiração celular B) Fotossíntese', ano='2020',
+            resposta='A', vestibular=self.enem, tema=self.biologia)
+        self.celula = Questao.objects.create(
+            enunciado='Compare a célula animal e a vegetal.',
+            alternativas='A) Ambas possuem mitocondria B) Só a vegetal', ano='2021',
+            resposta='A', vestibular=self.fuvest, tema=self.biologia)
+        self.velocidade = Questao.objects.create(
+            enunciado='Um carro percorre 100 km em 2 horas.',
+            alternativas='A) 50 km/h B) 100 km/h', ano='2020',
+            resposta='A', vestibular=self.enem, tema=self.fisica)
+
+    def test_ordena_por_relevancia_ignorando_acentos(self):
+        resultado = list(buscar_questoes('mitocondria'))
+        self.assertEqual(resultado, [self.mitocondria, self.celula])
+
+    def test_filtros(self):
+        self.assertEqual(list(buscar_questoes('mitocondria', vestibular=self.fuvest.pk)), [self.celula])
+        self.assertEqual(list(buscar_questoes('mitocondria', ano='2020')), [self.mitocondria])
+        self.assertEqual(list(buscar_questoes('km', tema=self.biologia.pk)), [])
+
+    def test_indice_acompanha_alteracoes(self):
+        self.velocidade.enunciado = 'Um trem percorre 100 km em 2 horas.'
+        self.velocidade.save()
+        self.assertEqual(list(buscar_questoes('carro')), [])
+        self.assertEqual(list(buscar_questoes('trem')), [self.velocidade])
+        self.velocidade.delete()
+        self.assertEqual(list(buscar_questoes('trem')), [])
+
+    def test_termo_vazio_ou_com_sintaxe(self):
+        self.assertEqual(list(buscar_questoes('  ')), [])
+        self.assertEqual(list(buscar_questoes('"*) OR (')), [])
+        self.assertEqual(list(buscar_questoes('célula NEAR')), [])
+
+    @override_settings(BUSCA_BACKEND='blog.busca.ContemBusca')
+    def test_backend_configuravel(self):
+        self.assertIsInstance(get_backend(), ContemBusca)
+        self.assertEqual(list(buscar_questoes('carro')), [self.velocidade])
+
+    def test_view(self):
+        response = self.client.get(reverse('questao_busca'), {'q': 'mitocôndria', 'ano': '2020'})
+        self.assertEqual(response.status_code, 200)
+        resultados = response.json()['resultados']
+        self.assertEqual([r['id'] for r in resultados], [self.mitocondria.pk])
+        self.assertEqual(resultados[0]['vestibular'], 'ENEM')
+        self.assertNotIn('resposta', resultados[0])
@@ -0,0 +1,274 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from ..management.commands import benchmark_urls
+from ..management.commands.benchmark_urls import SENHA
+from ..models import AlteracaoRascunho, Post, Questao, Rascunho, Tema, Vestibular
+from ..revisoes import registrar_revisao
+
+
+class BackfillResumosTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+
+    def test_preenche_posts_existentes(self):
+        post = Post.objects.create(autor=self.user, titulo='Antigo', texto='<p>Texto antigo</p>')
+        Post.objects.filter(pk=post.pk).update(resumo='', texto_plano='')
+
+        saida = StringIO()
+        call_command('backfill_resumos', '--batch-size', '1', stdout=saida)
+
+        post.refresh_from_db()
+        self.assertEqual(post.resumo, '<p>Texto antigo</p>')
+        self.assertEqual(post.texto_plano, 'Texto antigo')
+        self.assertIn('1 posts atualizados', saida.getvalue())
+
+
+class BackfillDestaqueTests(TestCase):
+
+    def test_refaz_texto_html(self):
+        user = get_user_model().objects.create_user(username='testuser', password='12345')
+        post = Post.objects.create(autor=user, titulo='Código', texto='<pre data-language="python">x = 1</pre>')
+        Post.objects.filter(pk=post.pk).update(texto_html='')
+        antes = post.atualizado_em
+
+        call_command('backfill_destaque', stdout=StringIO())
+
+        post.refresh_from_db()
+        self.assertIn('<div class="highlight">', post.texto_html)
+        # O validador do GET condicional muda junto com o HTML.
+        self.assertGreater(post.atualizado_em, antes)
+
+
+class ImportQuestoesTests(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        Vestibular.objects.create(nome='ENEM')
+
+    def arquivo(self, nome, conteudo):
+        caminho = os.path.join(self.dir.name, nome)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        return caminho
+
+    def jsonl(self, registros):
+        return self.arquivo('questoes.jsonl', ''.join(json.dumps(r) + '\n' for r in registros))
+
+    def registro(self, i, **extra):
+        dados = {'enunciado': f'Enunciado {i}', 'alternativas': 'A) 1 B) 2', 'ano': '2020',
+                 'resposta': 'A', 'vestibular': 'ENEM', 'tema': f'Tema {i % 2}'}
+        dados.update(extra)
+        return dados
+
+    def test_importa_csv(self):
+        caminho = self.arquivo('questoes.csv', (
+            'enunciado,alternativas,ano,resposta,vestibular,tema\n'
+            '"Qual, afinal?","A) sim\nB) não",2021,A,FUVEST,Biologia\n'
+        ))
+        call_command('import_questoes', caminho, stdout=StringIO())
+        questao = Questao.objects.select_related('vestibular', 'tema').get()
+        self.assertEqual(questao.enunciado, 'Qual, afinal?')
+        self.assertEqual(questao.alternativas, 'A) sim\nB) não')
+        self.assertEqual(questao.vestibular.nome, 'FUVEST')
+        self.assertEqual(questao.tema.nome, 'Biologia')
+
+    def test_importa_jsonl_em_lotes_reaproveitando_nomes(self):
+        caminho = self.jsonl([self.registro(i) for i in range(7)])
+        saida = StringIO()
+        with self.assertNumQueries(2 + 2 * 4 + 4 * 3):
+            # Cache de nomes + get_or_create dos 2 temas novos + 4 lotes
+            # (savepoint, insert, release); nada por questão.
+            call_command('import_questoes', caminho, '--batch-size', '2', stdout=saida)
+        self.assertEqual(Questao.objects.count(), 7)
+        self.assertEqual(Vestibular.objects.count(), 1)
+        self.assertEqual(Tema.objects.count(), 2)
+        self.assertIn('7 questões importadas, 0 inválidas, 0 vestibulares e 2 temas novos', saida.getvalue())
+
+    def test_dry_run_valida_sem_gravar(self):
+        caminho = self.jsonl([self.registro(0), self.registro(1, ano='20x0'),
+                              self.registro(2, enunciado='')])
+        with open(caminho, 'a', encoding='utf-8') as f:
+            f.write('{quebrado\n')
+        saida, erros = StringIO(), StringIO()
+        call_command('import_questoes', caminho, '--dry-run', stdout=saida, stderr=erros)
+        self.assertEqual(Questao.objects.count(), 0)
+        self.assertEqual(Tema.objects.count(), 0)
+        self.assertIn('1 questões validadas, 3 inválidas', saida.getvalue())
+        self.assertIn('Registro 2: ano inválido', erros.getvalue())
+        self.assertIn('Registro 3: campos obrigatórios vazios: enunciado', erros.getvalue())
+        self.assertIn('Registro 4: JSON inválido', erros.getvalue())
+
+    def test_retoma_do_checkpoint(self):
+        caminho = self.jsonl([self.registro(i) for i in range(5)])
+        checkpoint = os.path.join(self.dir.name, 'checkpoint.json')
+        with open(checkpoint, 'w', encoding='utf-8') as f:
+            json.dump({'arquivo': os.path.abspath(caminho), 'registros': 3}, f)
+        call_command('import_questoes', caminho, '--checkpoint', checkpoint, stdout=StringIO())
+        self.assertEqual(sorted(Questao.objects.values_list('enunciado', flat=True)),
+                         ['Enunciado 3', 'Enunciado 4'])
+        with open(checkpoint, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['registros'], 5)
+
+
+class VendorStaticTests(TestCase):
+
+    CSS = b"@font-face{src:url(fonts/KaTeX_Main.woff2) format('woff2'),url(data:font/woff;base64,AAAA)}"
+    JS = b"var x;\n//# sourceMappingURL=quill.js.map"
+
+    def resposta(self, request, timeout):
+        corpo = self.CSS if request.full_url.endswith('.css') else self.JS
+        self.urls.append(request.full_url)
+        return BytesIO(corpo)
+
+    def test_baixa_arquivos_e_referencias_do_css(self):
+        self.urls = []
+        with tempfile.TemporaryDirectory() as destino, \
+                mock.patch('blog.management.commands.vendor_static.urlopen', self.resposta):
+            call_command('vendor_static', '--destino', destino, stdout=StringIO())
+            self.assertTrue(os.path.exists(os.path.join(destino, 'vendor/quill@2.0.2/quill.js')))
+            self.assertTrue(os.path.exists(os.path.join(destino, 'vendor/katex@0.16.9/fonts/KaTeX_Main.woff2')))
+            self.assertIn('https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/fonts/KaTeX_Main.woff2', self.urls)
+            self.assertTrue(os.path.exists(os.path.join(destino, 'vendor/quill@2.0.2/quill.js.map')))
+
+            # Arquivos existentes só são baixados de novo com --forcar.
+            self.urls = []
+            call_command('vendor_static', '--destino', destino, stdout=StringIO())
+            self.assertEqual(self.urls, [])
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class CollectstaticTests(TestCase):
+
+    def collectstatic(self, *args):
+        with tempfile.TemporaryDirectory() as raiz, override_settings(STATIC_ROOT=raiz):
+            call_command('collectstatic', '--noinput', *args, stdout=StringIO())
+            return os.path.exists(os.path.join(raiz, 'css', 'blog.css'))
+
+    def test_recusa_sem_as_bibliotecas(self):
+        with mock.patch('blog.management.commands.collectstatic.finders.find', return_value=None):
+            with self.assertRaisesMessage(CommandError, 'vendor/quill@2.0.2/quill.js'):
+                self.collectstatic()
+
+    def test_permitir_cdn(self):
+        self.assertTrue(self.collectstatic('--permitir-cdn'))
+
+
+
+class LimparSessoesTests(TestCase):
+
+    def test_apaga_so_as_expiradas_em_lotes(self):
+        agora = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expirada{i}', session_data='',
+                                   expire_date=agora - timedelta(days=1))
+        Session.objects.create(session_key='valida', session_data='',
+                               expire_date=agora + timedelta(days=1))
+        saida = StringIO()
+        call_command('limpar_sessoes', batch_size=2, verbosity=2, stdout=saida)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['valida'])
+        self.assertIn('5 sessões expiradas apagadas', saida.getvalue())
+        self.assertIn('4 sessões apagadas', saida.getvalue())
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_sessoes_em_cookie(self):
+        saida = StringIO()
+        call_command('limpar_sessoes', stdout=saida)
+        self.assertIn('nada a limpar', saida.getvalue())
+
+
+class LimparRascunhosTests(TestCase):
+
+    def test_apaga_so_os_antigos_com_as_alteracoes(self):
+        user = get_user_model().objects.create_user(username='testuser', password='12345')
+        for i in range(5):
+            rascunho = Rascunho.objects.create(autor=user, titulo=f'Antigo {i}')
+            AlteracaoRascunho.objects.create(rascunho=rascunho, versao=2, delta=[{'insert': 'x'}])
+        Rascunho.objects.update(atualizado_em=timezone.now() - timedelta(days=31))
+        recente = Rascunho.objects.create(autor=user, titulo='Recente')
+        AlteracaoRascunho.objects.create(rascunho=recente, versao=2, delta=[{'insert': 'x'}])
+
+        saida = StringIO()
+        call_command('limpar_rascunhos', dias=30, batch_size=2, verbosity=2, stdout=saida)
+        self.assertEqual(list(Rascunho.objects.all()), [recente])
+        self.assertEqual(list(AlteracaoRascunho.objects.values_list('rascunho', flat=True)), [recente.pk])
+        self.assertIn('5 rascunhos antigos apagados', saida.getvalue())
+        self.assertIn('4 rascunhos apagados', saida.getvalue())
+
+
+class CompararWsgiAsgiTests(TransactionTestCase):
+
+    def test_mede_os_dois_modos(self):
+        user = get_user_model().objects.create_user(username='testuser', password='12345')
+        Post.objects.create(autor=user, titulo='Post', texto='<p>Texto</p>', publicado_em=timezone.now())
+        saida = StringIO()
+        call_command('comparar_wsgi_asgi', '--requisicoes', '6', '--concorrencia', '2',
+                     '--sem-cache', '--json', stdout=saida)
+        resultado = json.loads(saida.getvalue())
+        self.assertEqual(len(resultado['urls']), 2)
+        for modo in ('wsgi', 'asgi'):
+            self.assertEqual(resultado[modo]['requisicoes'], 6)
+            self.assertEqual(resultado[modo]['erros'], 0)
+            self.assertLessEqual(resultado[modo]['p50_ms'], resultado[modo]['p99_ms'])
+
+
+class BenchmarkUrlsTests(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='benchmark0', password=SENHA)
+        post = Post.objects.create(autor=user, titulo='Post', texto='<p>Texto</p>', publicado_em=timezone.now())
+        registrar_revisao(post)
+        Rascunho.objects.create(autor=user, post=post, conteudo=[{'insert': 'Rascunho\n'}])
+        Questao.objects.create(enunciado='Enunciado', alternativas='A) 1', ano='2020', resposta='A',
+                               vestibular=Vestibular.objects.create(nome='ENEM'),
+                               tema=Tema.objects.create(nome='Física'))
+
+    def test_mede_todas_as_urls(self):
+        erros = StringIO()
+        comando = benchmark_urls.Command(stderr=erros)
+        comando.verbosity = 1
+        # O banco de teste pode ser gravado: mede também POSTs e rotas autenticadas.
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            rotas = comando._medir(2)
+        self.assertEqual(erros.getvalue(), '')
+        rota = rotas['post_list primeira página']
+        self.assertEqual(rota['status'], 200)
+        self.assertEqual(rota['consultas'], 0)
+        self.assertGreater(rota['bytes'], 0)
+        self.assertEqual(rotas['login POST']['status'], 302)
+        for rota in rotas.values():
+            self.assertLess(rota['status'], 400)
+            self.assertLessEqual(rota['p50_ms'], rota['max_ms'])
+
+    def test_banco_atual_nao_grava(self):
+        saida, erros = StringIO(), StringIO()
+        call_command('benchmark_urls', '--banco-atual', '--sem-semear', '--repeticoes', '2',
+                     stdout=saida, stderr=erros)
+        resultado = json.loads(saida.getvalue())
+        self.assertEqual(erros.getvalue(), '')
+        self.assertNotIn('volumes', resultado)
+        self.assertIn('questao_list filtrada', resultado['rotas'])
+        for chave in ('login POST', 'logout', 'painel', 'rascunho_salvar novo'):
+            self.assertNotIn(chave, resultado['rotas'])
+        self.assertFalse(Session.objects.exists())
+        self.assertIsNone(get_user_model().objects.get().last_login)
+
+    def test_banco_atual_exige_sem_semear(self):
+        with self.assertRaisesMessage(CommandError, '--banco-atual e --sem-semear'):
+            call_command('benchmark_urls', '--banco-atual', stdout=StringIO())
+        self.assertEqual(get_user_model().objects.count(), 1)
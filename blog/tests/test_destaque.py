@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from ..destaque import destacar_codigo
+from ..models import Post
+
+QUILL = (
+    '<p>Veja:</p>'
+    '<div class="ql-code-block-container" spellcheck="false">'
+    '<select class="ql-ui" contenteditable="false"><option value="python">Python</option></select>'
+    '<div class="ql-code-block" data-language="python"><span class="hljs-keyword">def</span> f(x):</div>'
+    '<div class="ql-code-block" data-language="python"><br></div>'
+    '<div class="ql-code-block" data-language="python">    return x &lt; 1</div>'
+    '</div>'
+    '<p>Fim.</p>'
+)
+
+
+class DestacarCodigoTests(SimpleTestCase):
+
+    def test_bloco_do_quill(self):
+        resultado = destacar_codigo(QUILL)
+        self.assertTrue(resultado.startswith('<p>Veja:</p><div class="highlight"><pre>'))
+        self.assertTrue(resultado.endswith('<p>Fim.</p>'))
+        self.assertIn('<span class="k">def</span>', resultado)
+        self.assertIn('<span class="o">&lt;</span>', resultado)
+        self.assertNotIn('hljs', resultado)
+        self.assertNotIn('ql-ui', resultado)
+        self.assertEqual(resultado.count('<div class="highlight">'), 1)
+
+    def test_pre_com_linguagem(self):
+        resultado = destacar_codigo('<pre><code class="language-js">let a = 1;</code></pre>')
+        self.assertIn('<span class="kd">let</span>', resultado)
+
+    def test_linguagem_desconhecida_vira_texto(self):
+        resultado = destacar_codigo('<pre data-language="plain">if x</pre>')
+        self.assertIn('<code>if x\n</code>', resultado)
+
+    def test_sem_codigo_nao_altera(self):
+        self.assertEqual(destacar_codigo('<p>Nada de <code>código</code> aqui</p>'),
+                         '<p>Nada de <code>código</code> aqui</p>')
+
+
+class PostDestaqueTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+
+    def test_post_detail_recebe_html_destacado(self):
+        post = Post.objects.create(autor=self.user, titulo='Código', texto=QUILL)
+        response = self.client.get(reverse('post_detail', args=[post.pk]))
+        self.assertContains(response, '<span class="k">def</span>')
+        self.assertContains(response, 'css/pygments.css')
+        self.assertNotContains(response, 'highlight.min.js')
@@ -0,0 +1,90 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from ..estatisticas import registrar_respostas
+from ..models import Estatistica, Questao, Tema, Tentativa, Vestibular
+
+Tipo = Estatistica.Tipo
+
+
+class RegistrarRespostasTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='aluno', password='12345')
+        self.enem = Vestibular.objects.create(nome='ENEM')
+        self.biologia = Tema.objects.create(nome='Biologia')
+        self.fisica = Tema.objects.create(nome='Física')
+        self.q1 = Questao.objects.create(enunciado='1', alternativas='-', resposta='A', ano='2020',
+                                         vestibular=self.enem, tema=self.biologia)
+        self.q2 = Questao.objects.create(enunciado='2', alternativas='-', resposta='B', ano='2020',
+                                         vestibular=self.enem, tema=self.fisica)
+
+    def contador(self, tipo, chave):
+        estatistica = Estatistica.objects.get(tipo=tipo, chave=chave)
+        return estatistica.tentativas, estatistica.acertos
+
+    def test_grava_tentativas_e_contadores(self):
+        tentativas = registrar_respostas([(self.q1.pk, ' a '), (self.q2.pk, 'C'), (9999, 'A')], usuario=self.user)
+        self.assertEqual([t.correta for t in tentativas], [True, False])
+        self.assertEqual(Tentativa.objects.count(), 2)
+        self.assertEqual(self.contador(Tipo.QUESTAO, self.q1.pk), (1, 1))
+        self.assertEqual(self.contador(Tipo.TEMA, self.fisica.pk), (1, 0))
+        self.assertEqual(self.contador(Tipo.VESTIBULAR, self.enem.pk), (2, 1))
+        self.assertEqual(self.contador(Tipo.USUARIO, self.user.pk), (2, 1))
+
+        registrar_respostas([(self.q1.pk, 'B'), (self.q1.pk, 'A')])
+        self.assertEqual(self.contador(Tipo.QUESTAO, self.q1.pk), (3, 2))
+        self.assertEqual(self.contador(Tipo.VESTIBULAR, self.enem.pk), (4, 2))
+        self.assertEqual(self.contador(Tipo.USUARIO, self.user.pk), (2, 1))
+
+    def test_consultas_nao_crescem_com_o_lote(self):
+        registrar_respostas([(self.q1.pk, 'A')])
+        # Questões + tentativas + contadores novos + um UPDATE por incremento
+        # distinto (25/25, 25/0 e 50/25), dentro de um savepoint.
+        with self.assertNumQueries(8):
+            registrar_respostas([(self.q1.pk, 'A'), (self.q2.pk, 'C')] * 25)
+
+
+class RespostasViewTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='aluno', password='12345')
+        enem = Vestibular.objects.create(nome='ENEM')
+        self.tema = Tema.objects.create(nome='Biologia')
+        self.questao = Questao.objects.create(enunciado='1', alternativas='-', resposta='A', ano='2020',
+                                              vestibular=enem, tema=self.tema)
+
+    def responder(self, corpo):
+        return self.client.post(reverse('questao_responder'), corpo, content_type='application/json')
+
+    def test_lote(self):
+        self.client.login(username='aluno', password='12345')
+        response = self.responder({'respostas': [{'questao': self.questao.pk, 'resposta': 'A'},
+                                                 {'questao': self.questao.pk, 'resposta': 'B'}]})
+        self.assertEqual(response.json(), {
+            'resultados': [{'questao': self.questao.pk, 'correta': True},
+                           {'questao': self.questao.pk, 'correta': False}],
+            'acertos': 1, 'total': 2,
+        })
+        response = self.client.get(reverse('questao_estatisticas'), {'tipo': 'tema'})
+        self.assertEqual(response.json()['resultados'], [
+            {'id': self.tema.pk, 'tentativas': 2, 'acertos': 1, 'taxa_de_acerto': 0.5},
+        ])
+        response = self.client.get(reverse('questao_estatisticas'), {'tipo': 'usuario'})
+        self.assertEqual(response.json()['resultados'][0]['id'], self.user.pk)
+
+    def test_lote_invalido(self):
+        self.assertEqual(self.responder('nada').status_code, 400)
+        self.assertEqual(self.responder({'respostas': [{'questao': 'x', 'resposta': 'A'}]}).status_code, 400)
+        grande = {'respostas': [{'questao': self.questao.pk, 'resposta': 'A'}] * 101}
+        self.assertEqual(self.responder(grande).status_code, 400)
+        self.assertEqual(self.client.get(reverse('questao_responder')).status_code, 405)
+        self.assertFalse(Tentativa.objects.exists())
+
+    def test_estatisticas_do_usuario_exigem_login(self):
+        response = self.client.get(reverse('questao_estatisticas'), {'tipo': 'usuario'})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get(reverse('questao_estatisticas'), {'tipo': 'x'}).status_code, 400)
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import exportacao
+from ..models import Questao, Tema, Vestibular
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ExportacaoTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.enem = Vestibular.objects.create(nome='ENEM')
+        fuvest = Vestibular.objects.create(nome='FUVEST')
+        tema = Tema.objects.create(nome='Física')
+        for i in range(5):
+            Questao.objects.create(enunciado=f'Enunciado "{i}", com vírgula\nem duas linhas', alternativas='A) B)',
+                                   ano='2020', resposta='A', vestibular=self.enem, tema=tema)
+        self.outra = Questao.objects.create(enunciado='Da Fuvest', alternativas='-', ano='2021', resposta='B',
+                                            vestibular=fuvest, tema=tema)
+        self.imagem = default_storage.save('img/questao/figura.png', ContentFile(b'\x89PNG' + b'0' * 200000))
+        Questao.objects.filter(pk=self.outra.pk).update(imagem=self.imagem)
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+
+    def test_jsonl_em_lotes(self):
+        # Lotes pequenos: o resultado não depende do chunk_size.
+        linhas = b''.join(exportacao.exportar('jsonl', {}, tamanho_lote=2)).decode().splitlines()
+        registros = [json.loads(linha) for linha in linhas]
+        self.assertEqual(len(registros), 6)
+        self.assertEqual(registros[-1], {
+            'id': self.outra.pk, 'enunciado': 'Da Fuvest', 'alternativas': '-', 'ano': '2021',
+            'resposta': 'B', 'vestibular': 'FUVEST', 'tema': 'Física', 'imagem': self.imagem,
+        })
+
+    def test_csv_filtrado(self):
+        dados = b''.join(exportacao.exportar('csv', {'vestibular': self.enem.pk})).decode()
+        linhas = list(csv.DictReader(io.StringIO(dados)))
+        self.assertEqual(len(linhas), 5)
+        self.assertEqual(linhas[0]['enunciado'], 'Enunciado "0", com vírgula\nem duas linhas')
+
+    def test_zip_com_imagens(self):
+        blocos = list(exportacao.exportar('zip', {}))
+        with zipfile.ZipFile(io.BytesIO(b''.join(blocos))) as arquivo:
+            self.assertEqual(arquivo.namelist(), ['questoes.jsonl', self.imagem])
+            self.assertEqual(len(arquivo.read('questoes.jsonl').splitlines()), 6)
+            self.assertEqual(arquivo.read(self.imagem), default_storage.open(self.imagem).read())
+        # A imagem sai em vários pedaços, não em um só.
+        self.assertGreater(len(blocos), 3)
+
+    def test_view(self):
+        url = reverse('questao_exportar')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.user)
+        response = self.client.get(url, {'formato': 'csv', 'ano': '2021'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="questoes.csv"')
+        self.assertIn('Da Fuvest', b''.join(response.streaming_content).decode())
+        self.assertEqual(self.client.get(url, {'formato': 'xml'}).status_code, 400)
+
+    async def test_view_sob_asgi_envia_aos_pedacos(self):
+        gerados = []
+
+        def exportar(formato, filtros, tamanho_lote=exportacao.TAMANHO_LOTE):
+            for i in range(3):
+                gerados.append(i)
+                yield f'bloco {i}\n'.encode()
+
+        await self.async_client.aforce_login(self.user)
+        with mock.patch.object(exportacao, 'exportar', exportar):
+            response = await self.async_client.get(reverse('questao_exportar'))
+            self.assertTrue(response.is_async)
+            blocos = aiter(response.streaming_content)
+            self.assertEqual(await anext(blocos), b'bloco 0\n')
+            # O restante só é gerado quando o cliente pede.
+            self.assertEqual(gerados, [0])
+            self.assertEqual([bloco async for bloco in blocos], [b'bloco 1\n', b'bloco 2\n'])
+
+    async def test_aexportar(self):
+        blocos = [bloco async for bloco in exportacao.aexportar('jsonl', {'ano': '2021'})]
+        self.assertIn('Da Fuvest', b''.join(blocos).decode())
+
+    def test_comando_e_reimportacao(self):
+        destino = os.path.join(MEDIA_ROOT, 'questoes.jsonl')
+        saida = StringIO()
+        call_command('export_questoes', destino, '--ano', '2020', '--chunk-size', '2', stdout=saida)
+        self.assertIn('bytes exportados', saida.getvalue())
+        Questao.objects.all().delete()
+        call_command('import_questoes', destino, stdout=StringIO())
+        self.assertEqual(Questao.objects.filter(vestibular=self.enem).count(), 5)
+
+    def test_comando_sem_formato(self):
+        with self.assertRaisesMessage(Exception, 'use --formato'):
+            call_command('export_questoes', 'saida.txt')
@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from ..imagens import processar_questao
+from ..models import Questao, Tema, Vestibular
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def imagem(nome='scan.jpg', largura=800, altura=400, formato='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', (largura, altura), 'white').save(buffer, format=formato)
+    return SimpleUploadedFile(nome, buffer.getvalue())
+
+
+def criar_questao(**extra):
+    return Questao.objects.create(
+        enunciado='Observe a figura.', alternativas='A) B)', ano='2020', resposta='A',
+        vestibular=Vestibular.objects.get_or_create(nome='ENEM')[0],
+        tema=Tema.objects.get_or_create(nome='Física')[0], **extra)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGENS_ASSINCRONO=False)
+class VariantesTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_gera_variantes_depois_do_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            questao = criar_questao(imagem=imagem())
+        questao.refresh_from_db()
+
+        self.assertEqual(questao.variantes['origem'], questao.imagem.name)
+        self.assertEqual(sorted(questao.variantes['miniaturas']), ['320', '640'])
+        self.assertEqual(sorted(questao.variantes['webp']), ['320', '640', '800'])
+        miniatura = os.path.join(MEDIA_ROOT, questao.variantes['miniaturas']['320'])
+        with Image.open(miniatura) as arquivo:
+            self.assertEqual(arquivo.size, (320, 160))
+        with Image.open(os.path.join(MEDIA_ROOT, questao.variantes['webp']['640'])) as arquivo:
+            self.assertEqual(arquivo.format, 'WEBP')
+
+        self.assertRegex(questao.srcset_webp, rf'variantes/{questao.pk}/320[^ ]*\.webp 320w')
+        self.assertTrue(questao.srcset.endswith(f'{questao.imagem.url} 800w'))
+
+    def test_imagem_pequena_so_ganha_webp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            questao = criar_questao(imagem=imagem('icone.png', 100, 100, 'PNG'))
+        questao.refresh_from_db()
+        self.assertEqual(questao.variantes['miniaturas'], {})
+        self.assertEqual(list(questao.variantes['webp']), ['100'])
+
+    def test_png_girado_pelo_exif_continua_png(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: girar 90°.
+        buffer = BytesIO()
+        Image.new('RGB', (400, 800), 'white').save(buffer, format='PNG', exif=exif)
+        with self.captureOnCommitCallbacks(execute=True):
+            questao = criar_questao(imagem=SimpleUploadedFile('girada.png', buffer.getvalue()))
+        questao.refresh_from_db()
+        self.assertEqual(questao.variantes['largura'], 800)
+        miniatura = questao.variantes['miniaturas']['320']
+        self.assertTrue(miniatura.startswith(f'img/questao/variantes/{questao.pk}/320'), miniatura)
+        self.assertTrue(miniatura.endswith('.png'), miniatura)
+
+    def test_nova_imagem_apaga_as_variantes_anteriores(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            questao = criar_questao(imagem=imagem())
+        questao.refresh_from_db()
+        anteriores = [*questao.variantes['miniaturas'].values(), *questao.variantes['webp'].values()]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            questao.imagem = imagem('outra.png', 700, 350, 'PNG')
+            questao.save()
+        questao.refresh_from_db()
+        for caminho in anteriores:
+            self.assertFalse(os.path.exists(os.path.join(MEDIA_ROOT, caminho)), caminho)
+        for caminho in questao.variantes['webp'].values():
+            self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, caminho)), caminho)
+
+    def test_variantes_nao_sobrescrevem_envios_de_outras_questoes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            outra = criar_questao(imagem=imagem('prova_320.jpg', 500, 250))
+            questao = criar_questao(imagem=imagem('prova.jpg'))
+        outra.refresh_from_db()
+        questao.refresh_from_db()
+        with Image.open(os.path.join(MEDIA_ROOT, outra.imagem.name)) as arquivo:
+            self.assertEqual(arquivo.size, (500, 250))
+
+        # Refazer grava arquivos novos e apaga só os registrados antes.
+        anteriores = set(questao.variantes['webp'].values())
+        processar_questao(questao.pk, forcar=True)
+        questao.refresh_from_db()
+        self.assertFalse(anteriores & set(questao.variantes['webp'].values()))
+        for caminho in anteriores:
+            self.assertFalse(os.path.exists(os.path.join(MEDIA_ROOT, caminho)), caminho)
+        self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, outra.imagem.name)))
+        for caminho in outra.variantes['webp'].values():
+            self.assertTrue(os.path.exists(os.path.join(MEDIA_ROOT, caminho)), caminho)
+
+    def test_nao_refaz_variantes_existentes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            questao = criar_questao(imagem=imagem())
+        questao.refresh_from_db()
+        with self.captureOnCommitCallbacks() as callbacks:
+            questao.enunciado = 'Outro enunciado'
+            questao.save()
+        self.assertEqual(callbacks, [])
+
+    def test_listagem_usa_srcset(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            criar_questao(imagem=imagem())
+        response = self.client.get('/questoes/')
+        self.assertContains(response, 'type="image/webp"')
+        self.assertRegex(response.content.decode(), r'variantes/\d+/640[^ ]*\.webp 640w')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGENS_ASSINCRONO=False)
+class BackfillVariantesTests(TransactionTestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_gera_variantes_das_imagens_existentes(self):
+        for i in range(3):
+            questao = criar_questao(imagem=imagem(f'antiga{i}.jpg'))
+            Questao.objects.filter(pk=questao.pk).update(variantes={})
+        criar_questao()
+
+        saida = StringIO()
+        call_command('backfill_variantes', '--workers', '2', stdout=saida)
+
+        self.assertIn('Variantes geradas para 3 questões', saida.getvalue())
+        for questao in Questao.objects.exclude(imagem=''):
+            self.assertEqual(questao.variantes['origem'], questao.imagem.name)
@@ -0,0 +1,49 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post
+
+
+class InstrumentacaoMiddlewareTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.post = Post.objects.create(autor=self.user, titulo="Post 1",
+                                        texto="<p>Texto</p>", publicado_em=timezone.now())
+
+    def test_desligado_nao_altera_a_resposta(self):
+        response = self.client.get(reverse('post_list'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(INSTRUMENTACAO=True)
+    def test_server_timing_e_log(self):
+        with self.assertLogs('blog.instrumentacao', 'INFO') as logs:
+            response = self.client.get(reverse('questao_list'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="3 consultas"', response['Server-Timing'])
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        dados = json.loads(logs.records[0].getMessage())
+        self.assertEqual(dados['caminho'], reverse('questao_list'))
+        self.assertEqual(dados['consultas'], 3)
+        self.assertGreater(dados['templates_ms'], 0)
+        self.assertIn('SELECT', dados['consulta_mais_lenta'])
+        self.assertEqual(dados['alertas'], [])
+
+    @override_settings(INSTRUMENTACAO=True)
+    async def test_conta_consultas_das_views_async(self):
+        with self.assertLogs('blog.instrumentacao', 'INFO') as logs:
+            response = await self.async_client.get(reverse('post_detail', args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(json.loads(logs.records[0].getMessage())['consultas'], 0)
+
+    @override_settings(INSTRUMENTACAO=True, INSTRUMENTACAO_LIMITE_CONSULTAS=1)
+    def test_requisicao_acima_do_limite_gera_warning(self):
+        with self.assertLogs('blog.instrumentacao', 'WARNING') as logs:
+            self.client.get(reverse('questao_list'))
+        self.assertEqual(json.loads(logs.records[0].getMessage())['alertas'], ['consultas'])
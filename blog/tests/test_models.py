@@ -36,3 +36,19 @@ class PostModelTests(TestCase):
     def test_post_str(self):
         # Testa a representação em string do post
         self.assertEqual(str(self.post), 'Test Post')
+
+    def test_derivados_calculados_ao_salvar(self):
+        self.post.texto = '<p>Um <b>dois</b> tr&ecirc;s</p>' + '<p>palavra</p>' * 20
+        self.post.save()
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.resumo.startswith('<p>Um <b>dois</b> tr&ecirc;s</p>'))
+        self.assertTrue(self.post.resumo.endswith('…</p>'))
+        self.assertTrue(self.post.texto_plano.startswith('Um dois três palavra'))
+
+    def test_derivados_atualizados_com_update_fields(self):
+        self.post.texto = '<p>Novo</p>'
+        self.post.save(update_fields=['texto'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.resumo, '<p>Novo</p>')
+        self.assertEqual(self.post.texto_plano, 'Novo')
+
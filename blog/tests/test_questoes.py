@@ -0,0 +1,70 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Questao, Tema, Vestibular
+
+
+@override_settings(QUESTOES_POR_PAGINA=5)
+class QuestaoListViewTests(TestCase):
+    """
+    Testes para a listagem pública de questões (HTML e JSON).
+    """
+
+    def setUp(self):
+        self.enem = Vestibular.objects.create(nome='ENEM')
+        self.fuvest = Vestibular.objects.create(nome='FUVEST')
+        self.biologia = Tema.objects.create(nome='Biologia')
+        self.fisica = Tema.objects.create(nome='Física')
+        self.questoes = []
+        for i in range(12):
+            self.questoes.append(Questao.objects.create(
+                enunciado=f'Enunciado {i}', alternativas='A) 1 B) 2', resposta='A',
+                ano='2020' if i % 2 else '2021',
+                vestibular=self.enem if i % 3 else self.fuvest,
+                tema=self.biologia if i % 4 else self.fisica,
+            ))
+
+    def test_html(self):
+        response = self.client.get(reverse('questao_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'blog/questao_list.html')
+        self.assertEqual(len(response.context['questoes']), 5)
+        self.assertContains(response, 'Enunciado 11')
+        self.assertNotContains(response, 'Enunciado 6')
+
+    def test_numero_de_consultas_constante(self):
+        # Questões + vestibulares + temas, sem uma consulta por linha.
+        with self.assertNumQueries(3):
+            self.client.get(reverse('questao_list'))
+        for i in range(20):
+            Questao.objects.create(enunciado=f'Extra {i}', alternativas='-', resposta='-', ano='2022',
+                                   vestibular=Vestibular.objects.create(nome=f'V{i}'),
+                                   tema=Tema.objects.create(nome=f'T{i}'))
+        with self.assertNumQueries(3):
+            self.client.get(reverse('questao_list'))
+        with self.assertNumQueries(1):
+            self.client.get(reverse('questao_list_json'))
+
+    def test_filtros(self):
+        esperado = [q.pk for q in reversed(self.questoes)
+                    if q.vestibular == self.enem and q.tema == self.biologia and q.ano == '2020']
+        response = self.client.get(reverse('questao_list_json'), {
+            'vestibular': self.enem.pk, 'tema': self.biologia.pk, 'ano': '2020',
+        })
+        self.assertEqual([r['id'] for r in response.json()['resultados']], esperado)
+
+    def test_paginacao_json(self):
+        vistos = []
+        params = {'vestibular': self.enem.pk}
+        while True:
+            dados = self.client.get(reverse('questao_list_json'), params).json()
+            vistos += [r['id'] for r in dados['resultados']]
+            if not dados['next_cursor']:
+                break
+            params['depois'] = dados['next_cursor']
+        esperado = [q.pk for q in reversed(self.questoes) if q.vestibular == self.enem]
+        self.assertEqual(vistos, esperado)
+
+    def test_links_de_paginacao_preservam_filtros(self):
+        response = self.client.get(reverse('questao_list'), {'vestibular': self.enem.pk})
+        self.assertContains(response, f'?vestibular={self.enem.pk}&depois=')
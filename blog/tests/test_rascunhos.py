@@ -0,0 +1,129 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import AlteracaoRascunho, Post, Rascunho
+from ..rascunhos import (COMPACTAR_A_CADA, ConflitoDeVersao, DeltaInvalido, compor, criar_rascunho,
+                         documento, salvar_rascunho, validar)
+
+
+class DeltaTests(TestCase):
+
+    def test_compor(self):
+        doc = [{'insert': 'Olá mundo\n'}]
+        delta = [{'retain': 3, 'attributes': {'bold': True}}, {'insert': ','}, {'retain': 6}, {'insert': '!'}]
+        self.assertEqual(compor(doc, delta), [
+            {'insert': 'Olá', 'attributes': {'bold': True}},
+            {'insert': ', mundo!\n'},
+        ])
+        # Remover o atributo junta os trechos de novo.
+        self.assertEqual(compor(compor(doc, delta), [{'retain': 3, 'attributes': {'bold': None}}]),
+                         [{'insert': 'Olá, mundo!\n'}])
+        self.assertEqual(compor(doc, [{'retain': 3}, {'delete': 6}]), [{'insert': 'Olá\n'}])
+
+    def test_comprimentos_em_utf16_e_embeds(self):
+        doc = [{'insert': '😀a'}, {'insert': {'image': 'x.png'}}, {'insert': '\n'}]
+        self.assertEqual(validar([{'insert': '😀a'}, {'insert': {'image': 'x.png'}}, {'insert': '\n'}], 0), 5)
+        self.assertEqual(compor(doc, [{'retain': 2}, {'delete': 2}]), [{'insert': '😀\n'}])
+
+    def test_deltas_invalidos(self):
+        for delta in ({'insert': 'x'}, [{'insert': ''}], [{'retain': 0}], [{'retain': '2'}],
+                      [{'insert': 'a', 'delete': 1}], [{'mover': 1}], [{'retain': 11}]):
+            with self.subTest(delta=delta), self.assertRaises(DeltaInvalido):
+                validar(delta, 10)
+
+
+class RascunhoTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.texto = 'palavra ' * 12500 + '\n'
+        self.rascunho = criar_rascunho(self.user, [{'insert': self.texto}], 'Longo')
+
+    def test_salvar_grava_so_o_delta(self):
+        with CaptureQueriesContext(connection) as consultas:
+            versao = salvar_rascunho(self.rascunho.pk, self.user, 1, [{'retain': 8}, {'insert': 'nova '}])
+        self.assertEqual(versao, 2)
+        self.assertLess(max(len(str(q['sql'])) for q in consultas), 1000)
+        self.rascunho.refresh_from_db()
+        self.assertEqual(self.rascunho.comprimento, len(self.texto) + 5)
+        self.assertEqual(documento(self.rascunho)[0]['insert'][:21], 'palavra nova palavra ')
+
+    def test_versao_desatualizada(self):
+        salvar_rascunho(self.rascunho.pk, self.user, 1, [{'insert': 'a'}])
+        with self.assertRaises(ConflitoDeVersao) as conflito:
+            salvar_rascunho(self.rascunho.pk, self.user, 1, [{'insert': 'b'}])
+        self.assertEqual(conflito.exception.versao, 2)
+
+    def test_delta_alem_do_documento(self):
+        with self.assertRaises(DeltaInvalido):
+            salvar_rascunho(self.rascunho.pk, self.user, 1, [{'delete': len(self.texto) + 1}])
+        self.assertEqual(Rascunho.objects.get(pk=self.rascunho.pk).versao, 1)
+
+    def test_compactacao(self):
+        for versao in range(1, COMPACTAR_A_CADA + 1):
+            salvar_rascunho(self.rascunho.pk, self.user, versao, [{'insert': 'x'}])
+        self.rascunho.refresh_from_db()
+        self.assertEqual(self.rascunho.versao_base, COMPACTAR_A_CADA + 1)
+        self.assertFalse(AlteracaoRascunho.objects.exists())
+        self.assertEqual(documento(self.rascunho)[0]['insert'], 'x' * COMPACTAR_A_CADA + self.texto)
+
+    def test_substituir(self):
+        salvar_rascunho(self.rascunho.pk, self.user, 1, [{'insert': 'a'}])
+        salvar_rascunho(self.rascunho.pk, self.user, 2, [{'insert': 'Outro\n'}], substituir=True)
+        self.rascunho.refresh_from_db()
+        self.assertEqual(documento(self.rascunho), [{'insert': 'Outro\n'}])
+        self.assertFalse(AlteracaoRascunho.objects.exists())
+
+
+class RascunhoViewsTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.client.force_login(self.user)
+        self.url = reverse('rascunho_salvar')
+
+    def enviar(self, dados):
+        return self.client.post(self.url, json.dumps(dados), content_type='application/json')
+
+    def test_autosave(self):
+        response = self.enviar({'delta': [{'insert': 'Oi\n'}], 'titulo': 'Título'})
+        self.assertEqual(response.status_code, 201)
+        rascunho = response.json()['rascunho']
+        response = self.enviar({'rascunho': rascunho, 'versao': 1, 'delta': [{'retain': 2}, {'insert': '!'}]})
+        self.assertEqual(response.json(), {'rascunho': rascunho, 'versao': 2})
+
+        response = self.enviar({'rascunho': rascunho, 'versao': 1, 'delta': [{'insert': 'x'}]})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['versao'], 2)
+
+        dados = self.client.get(reverse('rascunho_detalhe', args=[rascunho])).json()
+        self.assertEqual((dados['versao'], dados['titulo'], dados['delta']), (2, 'Título', [{'insert': 'Oi!\n'}]))
+
+    def test_dados_invalidos(self):
+        self.assertEqual(self.enviar({'delta': 'texto'}).status_code, 400)
+        self.assertEqual(self.client.post(self.url, 'não é json', content_type='application/json').status_code, 400)
+        self.assertEqual(self.enviar({'delta': [], 'post': 999}).status_code, 404)
+
+    def test_rascunho_de_outro_usuario(self):
+        outro = get_user_model().objects.create_user(username='outro', password='12345')
+        rascunho = criar_rascunho(outro, [{'insert': 'Oi\n'}])
+        response = self.enviar({'rascunho': rascunho.pk, 'versao': 1, 'delta': [{'insert': 'x'}]})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get(reverse('rascunho_detalhe', args=[rascunho.pk])).status_code, 404)
+
+    def test_salvar_o_post_descarta_o_rascunho(self):
+        post = Post.objects.create(autor=self.user, titulo='Post', texto='<p>Texto</p>', publicado_em=timezone.now())
+        rascunho = criar_rascunho(self.user, [{'insert': 'Texto novo\n'}], post=post)
+        self.client.post(reverse('editar'), {'post_id': post.pk, 'titulo': 'Post', 'texto': '<p>Texto novo</p>',
+                                             'rascunho': rascunho.pk})
+        self.assertFalse(Rascunho.objects.exists())
+
+    def test_exige_login(self):
+        self.client.logout()
+        self.assertEqual(self.enviar({'delta': []}).status_code, 302)
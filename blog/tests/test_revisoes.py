@@ -0,0 +1,123 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post, Revisao
+from ..revisoes import (INTERVALO_COMPLETAS, aplicar, diferenca, garantir_revisao_inicial,
+                        registrar_revisao, texto_da_revisao)
+
+PARAGRAFOS = ''.join(f'<p>Parágrafo {i} com algumas palavras de texto.</p>' for i in range(200))
+
+
+class RevisoesTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.post = Post.objects.create(autor=self.user, titulo='Post', texto=PARAGRAFOS,
+                                        publicado_em=timezone.now())
+
+    def editar(self, texto, titulo='Post'):
+        self.post.texto = texto
+        self.post.titulo = titulo
+        self.post.save()
+        return registrar_revisao(self.post, self.user)
+
+    def test_diferenca_remonta_o_texto(self):
+        anterior = '<p>Um <b>texto</b> qualquer</p> com < solto'
+        novo = '<p>Um texto <i>bem</i> diferente</p> com < solto'
+        self.assertEqual(aplicar(anterior, diferenca(anterior, novo)), novo)
+
+    def test_revisoes_guardam_diferencas_e_remontam_cada_versao(self):
+        textos = [PARAGRAFOS]
+        self.assertTrue(registrar_revisao(self.post).completa)
+        for i in range(INTERVALO_COMPLETAS + 2):
+            textos.append(textos[-1].replace(f'Parágrafo {i} ', f'Parágrafo {i} editado '))
+            self.editar(textos[-1])
+
+        revisoes = list(self.post.revisoes.order_by('numero'))
+        self.assertEqual([r.profundidade for r in revisoes],
+                         list(range(INTERVALO_COMPLETAS)) + [0, 1, 2])
+        self.assertLess(revisoes[1].armazenado, revisoes[0].armazenado / 10)
+        for revisao, texto in zip(revisoes, textos):
+            # A remontagem lê só a cadeia desde a última completa.
+            with self.assertNumQueries(1):
+                self.assertEqual(texto_da_revisao(revisao), texto)
+
+    def test_sem_mudancas_nao_cria_revisao(self):
+        registrar_revisao(self.post)
+        self.assertIsNone(registrar_revisao(self.post))
+        self.assertIsNotNone(self.editar(PARAGRAFOS, titulo='Outro título'))
+        self.assertEqual(self.post.revisoes.count(), 2)
+
+    def test_reescrita_total_vira_revisao_completa(self):
+        registrar_revisao(self.post)
+        self.assertTrue(self.editar('<p>Tudo novo.</p>').completa)
+
+    def test_revisao_inicial_de_posts_antigos(self):
+        garantir_revisao_inicial(self.post)
+        garantir_revisao_inicial(self.post)
+        self.assertEqual(self.post.revisoes.count(), 1)
+
+
+class RevisoesViewsTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.client.force_login(self.user)
+        self.post = Post.objects.create(autor=self.user, titulo='Original', texto='<p>Texto original</p>',
+                                        publicado_em=timezone.now())
+
+    def test_editar_registra_o_texto_anterior_e_o_novo(self):
+        self.client.post(reverse('editar'), {'post_id': self.post.pk, 'titulo': 'Novo',
+                                             'texto': '<p>Texto novo</p>'})
+        revisoes = list(self.post.revisoes.order_by('numero'))
+        self.assertEqual([r.titulo for r in revisoes], ['Original', 'Novo'])
+        self.assertEqual(texto_da_revisao(revisoes[0]), '<p>Texto original</p>')
+        self.assertEqual(revisoes[1].autor, self.user)
+
+    def test_falha_na_revisao_desfaz_a_edicao(self):
+        garantir_revisao_inicial(self.post)
+        with mock.patch('blog.views.registrar_revisao', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError):
+            self.client.post(reverse('editar'), {'post_id': self.post.pk, 'titulo': 'Novo',
+                                                 'texto': '<p>Texto novo</p>'})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.titulo, 'Original')
+
+    def test_listar_e_restaurar(self):
+        self.client.post(reverse('editar'), {'post_id': self.post.pk, 'titulo': 'Novo',
+                                             'texto': '<p>Texto novo</p>'})
+        url = reverse('post_revisoes', args=[self.post.pk])
+        response = self.client.get(url, {'revisao': 1})
+        self.assertContains(response, 'Texto original')
+        self.assertContains(response, reverse('post_revisao_restaurar', args=[self.post.pk, 1]))
+
+        response = self.client.post(reverse('post_revisao_restaurar', args=[self.post.pk, 1]))
+        self.assertRedirects(response, f'{url}?revisao=1')
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.titulo, self.post.texto), ('Original', '<p>Texto original</p>'))
+        self.assertEqual(self.post.revisoes.count(), 3)
+
+    def test_restaurar_exige_post_e_revisao_existente(self):
+        garantir_revisao_inicial(self.post)
+        url = reverse('post_revisao_restaurar', args=[self.post.pk, 1])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(self.client.post(reverse('post_revisao_restaurar', args=[self.post.pk, 9])).status_code, 404)
+
+    def test_relatorio(self):
+        garantir_revisao_inicial(self.post)
+        saida = StringIO()
+        call_command('relatorio_revisoes', json=True, stdout=saida)
+        dados = json.loads(saida.getvalue())
+        self.assertEqual(dados['total']['revisoes'], 1)
+        self.assertEqual(dados['posts'][0]['post'], self.post.pk)
+        self.assertEqual(dados['total']['tamanho'], len('<p>Texto original</p>'))
+        saida = StringIO()
+        call_command('relatorio_revisoes', stdout=saida)
+        self.assertIn('1 revisões de 1 posts', saida.getvalue())
@@ -0,0 +1,120 @@
+import json
+import os
+import random
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Questao, Tema, Vestibular
+from ..simulado import contagem_por_tema, distribuir, ids_do_tema, sortear
+
+
+class DistribuirTests(TestCase):
+
+    def test_uniforme(self):
+        self.assertEqual(distribuir(9, {1: 10, 2: 10, 3: 10}), {1: 3, 2: 3, 3: 3})
+
+    def test_respeita_o_que_cada_tema_tem(self):
+        cotas = distribuir(10, {1: 2, 2: 20, 3: 0}, aleatorio=random.Random(1))
+        self.assertEqual(cotas, {1: 2, 2: 8})
+
+    def test_proporcional(self):
+        self.assertEqual(distribuir(10, {1: 80, 2: 20}, 'proporcional'), {1: 8, 2: 2})
+
+    def test_sobra_vai_para_temas_sorteados(self):
+        cotas = distribuir(4, {1: 5, 2: 5, 3: 5}, aleatorio=random.Random(1))
+        self.assertEqual(sum(cotas.values()), 4)
+        self.assertTrue(all(1 <= cota <= 2 for cota in cotas.values()))
+
+    def test_total_maior_que_o_banco(self):
+        self.assertEqual(distribuir(50, {1: 3, 2: 4}), {1: 3, 2: 4})
+
+    def test_modo_invalido(self):
+        with self.assertRaises(ValueError):
+            distribuir(5, {1: 5}, 'aleatoria')
+
+
+class SimuladoTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.enem = Vestibular.objects.create(nome='ENEM')
+        self.fuvest = Vestibular.objects.create(nome='FUVEST')
+        self.biologia = Tema.objects.create(nome='Biologia')
+        self.fisica = Tema.objects.create(nome='Física')
+        for i in range(20):
+            Questao.objects.create(
+                enunciado=f'Enunciado {i}', alternativas='A) 1 B) 2', resposta='A',
+                ano='2020' if i % 2 else '2021',
+                vestibular=self.enem if i % 5 else self.fuvest,
+                tema=self.biologia if i % 4 else self.fisica,
+            )
+
+    def test_sorteia_por_tema_com_filtros(self):
+        questoes = sortear({self.biologia.pk: 3, self.fisica.pk: 2}, vestibular=self.enem.pk, ano='2021',
+                           aleatorio=random.Random(1))
+        self.assertEqual(len(questoes), 5)
+        self.assertEqual(len({questao.pk for questao in questoes}), 5)
+        self.assertEqual(sum(questao.tema_id == self.fisica.pk for questao in questoes), 2)
+        for questao in questoes:
+            self.assertEqual((questao.vestibular_id, questao.ano), (self.enem.pk, '2021'))
+
+    def test_ids_candidatos_ficam_no_cache(self):
+        sortear({self.biologia.pk: 3})
+        # Só a leitura das questões sorteadas, sem varrer o banco de novo.
+        with self.assertNumQueries(1):
+            sortear({self.biologia.pk: 3})
+
+    def test_sorteio_so_le_os_temas_sorteados(self):
+        self.assertEqual(contagem_por_tema(), {self.biologia.pk: 15, self.fisica.pk: 5})
+        # A lista de Biologia e as questões; a de Física não é lida.
+        with self.assertNumQueries(2):
+            sortear({self.biologia.pk: 3})
+        with self.assertNumQueries(2):
+            sortear({self.fisica.pk: 1})
+
+    def test_candidatos_ja_lidos_nao_sao_relidos(self):
+        candidatos = {self.fisica.pk: ids_do_tema(self.fisica.pk)}
+        cache.clear()
+        with self.assertNumQueries(1):
+            questoes = sortear({self.fisica.pk: 2}, candidatos=candidatos)
+        self.assertEqual(len(questoes), 2)
+
+    def test_alteracoes_invalidam_os_candidatos(self):
+        contagem_por_tema()
+        ids_do_tema(self.fisica.pk)
+        nova = Questao.objects.create(enunciado='Nova', alternativas='-', resposta='-', ano='2022',
+                                      vestibular=self.enem, tema=self.fisica)
+        self.assertIn(nova.pk, ids_do_tema(self.fisica.pk))
+        self.assertEqual(contagem_por_tema()[self.fisica.pk], 6)
+        nova.delete()
+        self.assertNotIn(nova.pk, ids_do_tema(self.fisica.pk))
+        self.assertEqual(contagem_por_tema()[self.fisica.pk], 5)
+
+    def test_import_questoes_invalida_os_candidatos(self):
+        ids_do_tema(self.fisica.pk)
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, 'questoes.jsonl')
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'enunciado': 'Importada', 'alternativas': '-', 'ano': '2023',
+                                    'resposta': 'A', 'vestibular': 'ENEM', 'tema': 'Física'}) + '\n')
+            call_command('import_questoes', caminho, stdout=StringIO())
+        importada = Questao.objects.get(enunciado='Importada')
+        self.assertIn(importada.pk, ids_do_tema(self.fisica.pk))
+
+    def test_views(self):
+        response = self.client.get(reverse('questao_simulado'), {'quantidade': 6})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'blog/simulado.html')
+        self.assertEqual(len(response.context['questoes']), 6)
+
+        response = self.client.get(reverse('questao_simulado_json'),
+                                   {'por_tema': 2, 'tema': [self.fisica.pk], 'vestibular': self.enem.pk})
+        resultados = response.json()['resultados']
+        self.assertEqual(len(resultados), 2)
+        self.assertEqual({resultado['tema'] for resultado in resultados}, {'Física'})
+        self.assertNotIn('resposta', resultados[0])
@@ -0,0 +1,49 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from ..storage import StaticComprimido
+from ..vendor import VENDOR
+
+
+class VendorTagTests(SimpleTestCase):
+
+    def render(self, nome):
+        return Template("{% load vendor %}{% vendor nome %}").render(Context({'nome': nome}))
+
+    def test_usa_cdn_sem_copia_local(self):
+        with mock.patch('blog.templatetags.vendor.finders.find', return_value=None):
+            self.assertEqual(self.render('quill.js'), VENDOR['quill.js'][0])
+
+    def test_usa_copia_local(self):
+        with tempfile.TemporaryDirectory() as static:
+            caminho = os.path.join(static, VENDOR['quill.js'][1])
+            os.makedirs(os.path.dirname(caminho))
+            open(caminho, 'w').close()
+            with override_settings(STATICFILES_DIRS=[static]):
+                self.assertEqual(self.render('quill.js'), '/static/vendor/quill@2.0.2/quill.js')
+
+    def test_com_manifesto_usa_o_que_foi_publicado(self):
+        manifesto = {VENDOR['quill.js'][1]: 'vendor/quill@2.0.2/quill.123abc.js'}
+        with mock.patch.object(staticfiles_storage, 'hashed_files', manifesto):
+            self.assertEqual(self.render('quill.js'), '/static/vendor/quill@2.0.2/quill.123abc.js')
+            # Ausente do manifesto: CDN, mesmo que a cópia exista no disco.
+            self.assertEqual(self.render('katex.js'), VENDOR['katex.js'][0])
+
+
+class StaticComprimidoTests(SimpleTestCase):
+
+    def test_sem_manifesto_usa_nome_original(self):
+        with tempfile.TemporaryDirectory() as raiz:
+            storage = StaticComprimido(location=raiz, base_url='/static/')
+            self.assertEqual(storage.url('css/blog.css'), '/static/css/blog.css')
+
+    def test_com_manifesto_usa_nome_com_hash(self):
+        with tempfile.TemporaryDirectory() as raiz:
+            storage = StaticComprimido(location=raiz, base_url='/static/')
+            storage.hashed_files = {'css/blog.css': 'css/blog.123abc.css'}
+            self.assertEqual(storage.url('css/blog.css'), '/static/css/blog.123abc.css')
@@ -1,10 +1,23 @@
-from django.test import TestCase, Client
+import json
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.core.management import call_command
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import parse_http_date
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
 
 
+from .. import limites
+from ..cache import aversao, grupo_post
 from ..models import Post
 
 class PostListViewTests(TestCase):
@@ -52,6 +65,269 @@ class PostListViewTests(TestCase):
         self.assertTrue('posts' in response.context)
         self.assertEqual(len(response.context['posts']), 2)
 
+@override_settings(POSTS_POR_PAGINA=2)
+class PostListPaginacaoTests(TestCase):
+    """
+    Testes para a paginação por cursor de post_list.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        agora = timezone.now()
+        # Dois posts com o mesmo horário forçam o desempate pelo id.
+        datas = [agora - timedelta(hours=1), agora - timedelta(hours=2),
+                 agora - timedelta(hours=2), agora - timedelta(hours=3),
+                 agora - timedelta(hours=4)]
+        self.posts = [
+            Post.objects.create(autor=self.user, titulo=f"Post {i}",
+                                texto=f"<p>Texto {i}</p>", publicado_em=data)
+            for i, data in enumerate(datas)
+        ]
+        # Post agendado não aparece na listagem.
+        Post.objects.create(autor=self.user, titulo="Futuro", texto="<p>x</p>",
+                            publicado_em=agora + timedelta(days=1))
+
+    def titulos(self, response):
+        return [post.titulo for post in response.context['posts']]
+
+    def test_primeira_pagina(self):
+        response = self.client.get(reverse('post_list'))
+        self.assertEqual(self.titulos(response), ['Post 0', 'Post 2'])
+        self.assertIsNotNone(response.context['next_cursor'])
+        self.assertIsNone(response.context['prev_cursor'])
+
+    def test_navega_para_frente_e_para_tras(self):
+        response = self.client.get(reverse('post_list'))
+        response = self.client.get(reverse('post_list'), {'depois': response.context['next_cursor']})
+        self.assertEqual(self.titulos(response), ['Post 1', 'Post 3'])
+        segunda = response
+        response = self.client.get(reverse('post_list'), {'depois': response.context['next_cursor']})
+        self.assertEqual(self.titulos(response), ['Post 4'])
+        self.assertIsNone(response.context['next_cursor'])
+        response = self.client.get(reverse('post_list'), {'antes': response.context['prev_cursor']})
+        self.assertEqual(self.titulos(response), self.titulos(segunda))
+        response = self.client.get(reverse('post_list'), {'antes': response.context['prev_cursor']})
+        self.assertEqual(self.titulos(response), ['Post 0', 'Post 2'])
+        self.assertIsNone(response.context['prev_cursor'])
+
+    def test_cursor_invalido_volta_para_primeira_pagina(self):
+        response = self.client.get(reverse('post_list'), {'depois': 'lixo'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titulos(response), ['Post 0', 'Post 2'])
+
+    def test_nao_carrega_texto_completo(self):
+        response = self.client.get(reverse('post_list'))
+        for post in response.context['posts']:
+            self.assertIn('texto', post.get_deferred_fields())
+
+
+class PaginaCacheTests(TestCase):
+    """
+    Testes para o cache de post_list e post_detail.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username='testuser',
+            password='12345'
+        )
+        self.post = Post.objects.create(autor=self.user, titulo="Post 1",
+                                        texto="<p>Texto</p>", publicado_em=timezone.now())
+
+    def test_segunda_requisicao_nao_consulta_o_banco(self):
+        self.client.get(reverse('post_list'))
+        self.client.get(reverse('post_detail', args=[self.post.pk]))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('post_list'))
+            self.assertContains(response, 'Post 1')
+            response = self.client.get(reverse('post_detail', args=[self.post.pk]))
+            self.assertContains(response, 'Post 1')
+
+    def test_salvar_post_invalida_cache(self):
+        self.client.get(reverse('post_list'))
+        self.client.get(reverse('post_detail', args=[self.post.pk]))
+        self.post.titulo = 'Titulo Novo'
+        self.post.save()
+        self.assertContains(self.client.get(reverse('post_list')), 'Titulo Novo')
+        self.assertContains(self.client.get(reverse('post_detail', args=[self.post.pk])), 'Titulo Novo')
+
+    def test_publish_e_delete_invalidam_lista(self):
+        rascunho = Post.objects.create(autor=self.user, titulo="Rascunho", texto="<p>x</p>")
+        self.assertNotContains(self.client.get(reverse('post_list')), 'Rascunho')
+        rascunho.publish()
+        self.assertContains(self.client.get(reverse('post_list')), 'Rascunho')
+        rascunho.delete()
+        self.assertNotContains(self.client.get(reverse('post_list')), 'Rascunho')
+
+    def test_expira_quando_post_agendado_for_publicado(self):
+        Post.objects.create(autor=self.user, titulo="Agendado", texto="<p>x</p>",
+                            publicado_em=timezone.now() + timedelta(seconds=30))
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.client.get(reverse('post_list'))
+        timeout = cache_set.call_args.args[2]
+        self.assertGreater(timeout, 0)
+        self.assertLessEqual(timeout, 30)
+
+    def test_usuario_autenticado_nao_usa_cache(self):
+        self.client.get(reverse('post_list'))
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(reverse('post_list'))
+        self.assertTemplateUsed(response, 'blog/post_list.html')
+
+
+class GetCondicionalTests(TestCase):
+    """
+    Testes para o ETag/Last-Modified de post_list e post_detail.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.post = Post.objects.create(autor=self.user, titulo="Post 1",
+                                        texto="<p>Texto</p>", publicado_em=timezone.now())
+
+    def test_respostas_trazem_validadores(self):
+        for url in (reverse('post_list'), reverse('post_detail', args=[self.post.pk])):
+            response = self.client.get(url)
+            self.assertTrue(response.has_header('ETag'))
+            self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_etag_igual_responde_304_sem_consultas(self):
+        for url in (reverse('post_list'), reverse('post_detail', args=[self.post.pk])):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(0):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+
+    def test_if_modified_since(self):
+        url = reverse('post_detail', args=[self.post.pk])
+        ultima = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=ultima).status_code, 304)
+
+    def test_304_nao_carrega_o_texto(self):
+        cache.clear()
+        url = reverse('post_detail', args=[self.post.pk])
+        etag = self.client.get(url)['ETag']
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"texto"', queries[0]['sql'])
+
+    def test_edicao_muda_etag(self):
+        url = reverse('post_detail', args=[self.post.pk])
+        etag = self.client.get(url)['ETag']
+        lista = self.client.get(reverse('post_list'))['ETag']
+        self.post.titulo = 'Titulo Novo'
+        self.post.save(update_fields=['titulo'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(reverse('post_list'), HTTP_IF_NONE_MATCH=lista).status_code, 200)
+
+    def test_remocao_muda_etag_e_last_modified_da_lista(self):
+        outro = Post.objects.create(autor=self.user, titulo="Outro", texto="<p>x</p>",
+                                    publicado_em=timezone.now() - timedelta(days=1))
+        ontem = timezone.now() - timedelta(days=1)
+        Post.objects.update(atualizado_em=ontem, publicado_em=ontem)
+        cache.clear()
+        response = self.client.get(reverse('post_list'))
+        outro.delete()
+        depois = self.client.get(reverse('post_list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(depois.status_code, 200)
+        self.assertNotContains(depois, 'Outro')
+        self.assertGreater(parse_http_date(depois['Last-Modified']),
+                           parse_http_date(response['Last-Modified']))
+
+    def test_post_inexistente(self):
+        self.assertEqual(self.client.get(reverse('post_detail', args=[9999])).status_code, 404)
+
+
+class FeedTests(TestCase):
+    """
+    Testes para os feeds RSS e Atom.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.post = Post.objects.create(autor=self.user, titulo="Post 1",
+                                        texto="<p>" + "palavra " * 30 + "</p>",
+                                        publicado_em=timezone.now())
+        Post.objects.create(autor=self.user, titulo="Rascunho", texto="<p>x</p>")
+
+    def test_feeds_trazem_posts_publicados_com_resumo(self):
+        for nome, content_type in (('post_feed_rss', 'application/rss+xml'),
+                                   ('post_feed_atom', 'application/atom+xml')):
+            response = self.client.get(reverse(nome))
+            self.assertTrue(response['Content-Type'].startswith(content_type))
+            self.assertContains(response, 'Post 1')
+            self.assertContains(response, reverse('post_detail', args=[self.post.pk]))
+            self.assertNotContains(response, 'Rascunho')
+            self.assertNotContains(response, 'palavra ' * 11)
+
+    def test_feed_em_cache_e_condicional(self):
+        url = reverse('post_feed_atom')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(url), 'Post 1')
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_edicao_e_remocao_invalidam_feed(self):
+        url = reverse('post_feed_rss')
+        self.client.get(url)
+        self.post.titulo = 'Titulo Novo'
+        self.post.save()
+        self.assertContains(self.client.get(url), 'Titulo Novo')
+        self.post.delete()
+        self.assertNotContains(self.client.get(url), 'Titulo Novo')
+
+
+class ViewsAssincronasTests(TestCase):
+    """
+    Testes para post_list, post_detail e login_view servidas via ASGI.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='testuser', password='12345')
+        self.post = Post.objects.create(autor=self.user, titulo="Post 1",
+                                        texto="<p>Texto</p>", publicado_em=timezone.now())
+
+    async def test_post_list_e_post_detail(self):
+        response = await self.async_client.get(reverse('post_list'))
+        self.assertContains(response, 'Post 1')
+        response = await self.async_client.get(reverse('post_detail', args=[self.post.pk]))
+        self.assertContains(response, 'Texto')
+        response = await self.async_client.get(reverse('post_detail', args=[9999]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_cache_e_get_condicional(self):
+        url = reverse('post_detail', args=[self.post.pk])
+        etag = (await self.async_client.get(url))['ETag']
+        response = await self.async_client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertIsNotNone(await cache.aget(f'blog:valor:{grupo_post(self.post.pk)}:'
+                                              f'{await aversao(grupo_post(self.post.pk))}:modificacoes'))
+
+    async def test_login(self):
+        response = await self.async_client.post(reverse('login'), {'username': 'testuser', 'password': 'errada'})
+        self.assertContains(response, 'Usuário ou Senha inválidas')
+        response = await self.async_client.post(reverse('login'), {'username': 'testuser', 'password': '12345'})
+        self.assertRedirects(response, reverse('painel'), fetch_redirect_response=False)
+        self.assertIn('sessionid', response.cookies)
+
+    async def test_usuario_autenticado_nao_usa_cache(self):
+        await self.async_client.get(reverse('post_list'))
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('post_list'))
+        self.assertTemplateUsed(response, 'blog/post_list.html')
+
+
 class PostDetailViewTests(TestCase):
     """
     Testes para a view post_detail.
@@ -176,6 +452,74 @@ class AuthViewsTest(TestCase):
         self.assertRedirects(response, reverse('login'))
         self.assertFalse(response.wsgi_request.user.is_authenticated)
 
+@override_settings(LOGIN_LIMITE_IP=4, LOGIN_LIMITE_USUARIO=2, LOGIN_JANELA=100)
+class LimiteDeLoginTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        get_user_model().objects.create_user(username='testuser', password='12345')
+
+    def tentar(self, username='testuser', password='errada'):
+        return self.client.post(reverse('login'), {'username': username, 'password': password})
+
+    def test_limite_por_usuario_recusa_antes_do_hash(self):
+        self.tentar()
+        self.tentar(username=' TestUser')
+        with mock.patch('blog.views.aauthenticate') as autenticar:
+            response = self.tentar(password='12345')
+        autenticar.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertContains(response, 'Muitas tentativas', status_code=429)
+        self.assertLessEqual(int(response['Retry-After']), 100)
+        self.assertEqual(limites.rejeicoes(), {'ip': 0, 'usuario': 1})
+
+    def test_limite_por_ip(self):
+        for i in range(4):
+            self.assertEqual(self.tentar(username=f'usuario{i}').status_code, 200)
+        self.assertEqual(self.tentar(username='outro').status_code, 429)
+        self.assertEqual(limites.rejeicoes()['ip'], 1)
+
+    def test_login_bem_sucedido_nao_consome_o_limite(self):
+        for _ in range(6):
+            self.assertRedirects(self.tentar(password='12345'), reverse('painel'))
+        self.tentar()
+        self.tentar()
+        self.assertEqual(self.tentar().status_code, 429)
+
+    async def test_janela_deslizante(self):
+        request = RequestFactory().post(reverse('login'))
+        with mock.patch('blog.limites.time.time', return_value=1000.0):
+            self.assertIsNone(await limites.aregistrar_tentativa(request, 'testuser'))
+            self.assertIsNone(await limites.aregistrar_tentativa(request, 'testuser'))
+        # Metade da janela anterior ainda conta: 2 * 0.5 + 1 e depois + 2.
+        with mock.patch('blog.limites.time.time', return_value=1150.0):
+            self.assertIsNone(await limites.aregistrar_tentativa(request, 'testuser'))
+            self.assertEqual(await limites.aregistrar_tentativa(request, 'testuser'), 50)
+        with mock.patch('blog.limites.time.time', return_value=1300.0):
+            self.assertIsNone(await limites.aregistrar_tentativa(request, 'testuser'))
+
+    def test_contadores_mantem_o_tempo_de_expiracao(self):
+        for _ in range(3):
+            self.tentar()
+        agora = time.time()
+        janela = int(agora // 100)
+        chave = cache.make_and_validate_key(f'blog:login:ip:127.0.0.1:{janela}')
+        # Criado com o dobro da janela, não com o timeout padrão do cache.
+        self.assertGreater(cache._expire_info[chave] - agora, 150)
+        self.assertIsNone(cache._expire_info[cache.make_and_validate_key('blog:login:rejeitadas:usuario')])
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=agora + 301):
+            self.assertEqual(limites.rejeicoes(), {'ip': 0, 'usuario': 1})
+
+    def test_comando_mostra_e_zera_as_rejeicoes(self):
+        for _ in range(3):
+            self.tentar()
+        saida = StringIO()
+        call_command('limites_login', zerar=True, stdout=saida)
+        self.assertEqual(json.loads(saida.getvalue()), {'rejeitadas': {'ip': 0, 'usuario': 1}})
+        self.assertEqual(limites.rejeicoes(), {'ip': 0, 'usuario': 0})
+
+
 class CriarPostViewTest(TestCase):
 
     def setUp(self):
@@ -290,6 +634,31 @@ class EditarPostViewTest(TestCase):
         self.assertIn('posts', response.context)
         self.assertIn('form', response.context)
 
+    def test_editar_view_get_nao_inclui_texto(self):
+        """The edit page lists titles only; bodies are fetched from post_json."""
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Post de Teste')
+        self.assertContains(response, reverse('post_json', args=[self.post.pk]))
+        self.assertNotContains(response, 'Conteúdo do post de teste')
+
+    def test_post_json(self):
+        """Test the JSON endpoint used to load a single post into the editor."""
+        self.client.login(username='testuser', password='12345')
+        response = self.client.get(reverse('post_json', args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'id': self.post.pk,
+            'titulo': 'Post de Teste',
+            'texto': 'Conteúdo do post de teste',
+        })
+        self.assertEqual(self.client.get(reverse('post_json', args=[999])).status_code, 404)
+
+    def test_post_json_requires_login(self):
+        """Anonymous users are redirected to the login page."""
+        response = self.client.get(reverse('post_json', args=[self.post.pk]))
+        self.assertEqual(response.status_code, 302)
+
     def test_editar_view_post_valid(self):
         """Test the POST request to the editar view with valid data."""
         self.client.login(username='testuser', password='12345')
@@ -392,3 +761,23 @@ class DeletarPostViewTest(TestCase):
         remaining_posts = Post.objects.all()
         self.assertEqual(len(remaining_posts), 2)
 
+    def test_deletar_view_paginates(self):
+        """The list is paginated and the total comes from a COUNT query."""
+        self.client.login(username='testuser', password='12345')
+        with override_settings(POSTS_POR_PAGINA_PAINEL=1):
+            response = self.client.get(self.url)
+            self.assertEqual(len(response.context['posts']), 1)
+            self.assertEqual(response.context['n_posts'], 2)
+            self.assertTrue(response.context['posts'].has_next())
+            response = self.client.get(self.url, {'page': 2})
+            self.assertEqual(response.context['posts'][0], self.post1)
+
+    def test_deletar_view_bulk(self):
+        """Several selected posts are removed in a single POST."""
+        self.client.login(username='testuser', password='12345')
+        post3 = Post.objects.create(autor=self.user, titulo='Post de Teste 3',
+                                    texto='Conteúdo 3', publicado_em=timezone.now())
+        response = self.client.post(self.url, {'post_ids': [self.post1.id, post3.id, 'x']})
+        self.assertRedirects(response, self.url)
+        self.assertEqual(list(Post.objects.values_list('titulo', flat=True)), ['Post de Teste 2'])
+
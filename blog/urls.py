@@ -7,12 +7,28 @@ from . import views
 urlpatterns = [
     path('', views.post_list, name='post_list'),
     path('post/<int:pk>/', views.post_detail, name='post_detail'),
+    path('feed/rss/', views.post_feed_rss, name='post_feed_rss'),
+    path('feed/atom/', views.post_feed_atom, name='post_feed_atom'),
+    path('post/<int:pk>/json/', views.post_json, name='post_json'),
     path('painel/', views.painel_view, name='painel'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('criar_post/', views.criar_post, name='criar_post'),
     path('editar/', views.editar, name='editar'),
     path('deletar/', views.deletar, name='deletar'),
+    path('rascunhos/', views.rascunho_salvar, name='rascunho_salvar'),
+    path('rascunhos/<int:pk>/', views.rascunho_detalhe, name='rascunho_detalhe'),
+    path('post/<int:pk>/revisoes/', views.post_revisoes, name='post_revisoes'),
+    path('post/<int:pk>/revisoes/<int:numero>/restaurar/', views.post_revisao_restaurar,
+         name='post_revisao_restaurar'),
+    path('questoes/', views.questao_list, name='questao_list'),
+    path('questoes/json/', views.questao_list_json, name='questao_list_json'),
+    path('questoes/busca/', views.questao_busca, name='questao_busca'),
+    path('questoes/simulado/', views.questao_simulado, name='questao_simulado'),
+    path('questoes/simulado/json/', views.questao_simulado_json, name='questao_simulado_json'),
+    path('questoes/respostas/', views.questao_responder, name='questao_responder'),
+    path('questoes/exportar/', views.questao_exportar, name='questao_exportar'),
+    path('questoes/estatisticas/', views.questao_estatisticas, name='questao_estatisticas'),
 ]
 
 if settings.DEBUG:
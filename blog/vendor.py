@@ -0,0 +1,53 @@
+"""
+Bibliotecas de front-end servidas pelo próprio site.
+
+Cada entrada liga um nome usado nos templates (``{% vendor 'nome' %}``) à
+URL fixa da CDN e ao caminho da cópia local em ``blog/static``. O comando
+``vendor_static`` baixa as cópias; enquanto um arquivo não tiver sido
+baixado, a tag devolve a URL da CDN. O ``collectstatic`` recusa publicar
+sem as cópias, a não ser com ``--permitir-cdn``.
+
+As cópias ficam no repositório, em ``blog/static/vendor``, com os source
+maps citados nos arquivos. Falta o highlight.js (só usado pelo editor, no
+painel): rode o ``vendor_static`` em uma máquina com acesso à CDN e
+versione o resultado.
+"""
+
+VENDOR = {
+    'bootstrap.css': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css',
+        'vendor/bootstrap@5.3.3/css/bootstrap.min.css',
+    ),
+    'bootstrap.js': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js',
+        'vendor/bootstrap@5.3.3/js/bootstrap.bundle.min.js',
+    ),
+    'katex.css': (
+        'https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/katex.min.css',
+        'vendor/katex@0.16.9/katex.min.css',
+    ),
+    'katex.js': (
+        'https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/katex.min.js',
+        'vendor/katex@0.16.9/katex.min.js',
+    ),
+    'katex-auto-render.js': (
+        'https://cdn.jsdelivr.net/npm/katex@0.16.9/dist/contrib/auto-render.min.js',
+        'vendor/katex@0.16.9/contrib/auto-render.min.js',
+    ),
+    'quill.css': (
+        'https://cdn.jsdelivr.net/npm/quill@2.0.2/dist/quill.snow.css',
+        'vendor/quill@2.0.2/quill.snow.css',
+    ),
+    'quill.js': (
+        'https://cdn.jsdelivr.net/npm/quill@2.0.2/dist/quill.js',
+        'vendor/quill@2.0.2/quill.js',
+    ),
+    'highlight.js': (
+        'https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js',
+        'vendor/highlight.js@11.9.0/highlight.min.js',
+    ),
+    'highlight.css': (
+        'https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/atom-one-dark.min.css',
+        'vendor/highlight.js@11.9.0/styles/atom-one-dark.min.css',
+    ),
+}
@@ -1,30 +1,134 @@
-from django.shortcuts import render, get_object_or_404, redirect, HttpResponse
+import hashlib
+import json
+import math
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Max, Min
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import render, aget_object_or_404, get_object_or_404, redirect, HttpResponse
 from django.utils import timezone
-from django.contrib.auth import authenticate, login, logout
+from django.utils.http import urlencode
+from django.contrib.auth import aauthenticate, alogin, logout
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
+from django.views.decorators.http import require_POST
 from django.utils import timezone
 
 
-from .models import Post
+from . import exportacao, limites
+from .busca import buscar_questoes
+from .estatisticas import registrar_respostas
+from .cache import GRUPO_LISTA, cache_pagina, condicional, grupo_post, memorizar, modificado_em, versao
+from .feeds import UltimosPostsAtom, UltimosPostsRss
+from .models import Estatistica, Post, Questao, Rascunho, Revisao, Tema, Vestibular
 from .forms import PostForm
+from .paginacao import apaginar, paginar
+from .rascunhos import ConflitoDeVersao, DeltaInvalido, criar_rascunho, documento, salvar_rascunho
+from .revisoes import garantir_revisao_inicial, registrar_revisao, relatorio, texto_da_revisao
+from .simulado import DISTRIBUICOES, contagem_por_tema, distribuir, sortear
 
+BUSCA_LIMITE_MAXIMO = 50
+SIMULADO_MAXIMO = 100
+ESTATISTICAS_LIMITE = 500
 
-def post_list(request):
-    posts = Post.objects.filter(publicado_em__lte=timezone.now()).order_by('-publicado_em')
-    return render(request, 'blog/post_list.html', {'posts': posts})
 
-def post_detail(request, pk):
-    post = get_object_or_404(Post, pk=pk)
+def _ate_proxima_publicacao(request):
+    """Segundos até um post agendado entrar na listagem."""
+    proxima = (Post.objects.filter(publicado_em__gt=timezone.now())
+               .aggregate(proxima=Min('publicado_em'))['proxima'])
+    if proxima is None:
+        return settings.CACHE_PAGINAS_TIMEOUT
+    return max(1, math.ceil((proxima - timezone.now()).total_seconds()))
+
+
+def _modificacoes_lista(request):
+    def calcular():
+        return (Post.objects.filter(publicado_em__lte=timezone.now())
+                .aggregate(atualizado=Max('atualizado_em'), publicado=Max('publicado_em')))
+    return memorizar(GRUPO_LISTA, 'modificacoes', calcular,
+                     timeout=lambda: _ate_proxima_publicacao(request))
+
+
+def _post_list_last_modified(request):
+    # A hora da invalidação cobre os posts removidos, que somem do banco.
+    datas = [*_modificacoes_lista(request).values(), modificado_em(GRUPO_LISTA)]
+    return max(filter(None, datas), default=None)
+
+
+def _post_list_etag(request):
+    base = f'{versao(GRUPO_LISTA)}:{_post_list_last_modified(request)}:{request.get_full_path()}'
+    return hashlib.md5(base.encode()).hexdigest()
+
+
+def _modificacoes_post(request, pk):
+    return memorizar(grupo_post(pk), 'modificacoes', lambda: (
+        Post.objects.filter(pk=pk).values('atualizado_em', 'publicado_em').first()
+    ))
+
+
+def _post_last_modified(request, pk):
+    modificacoes = _modificacoes_post(request, pk)
+    if modificacoes is None:
+        return None
+    return max(filter(None, modificacoes.values()))
+
+
+def _post_etag(request, pk):
+    modificacoes = _modificacoes_post(request, pk)
+    if modificacoes is None:
+        return None
+    return f"post-{pk}-{modificacoes['atualizado_em'].timestamp()}"
+
+
+# condicional fica por fora do cache: um 304 não precisa nem da página guardada.
+@condicional(etag_func=_post_list_etag, last_modified_func=_post_list_last_modified)
+@cache_pagina(GRUPO_LISTA, timeout=_ate_proxima_publicacao)
+async def post_list(request):
+    posts = (Post.objects.filter(publicado_em__lte=timezone.now())
+             .only('id', 'titulo', 'publicado_em', 'resumo'))
+    pagina = await apaginar(posts, ('publicado_em', 'id'),
+                     depois=request.GET.get('depois'),
+                     antes=request.GET.get('antes'),
+                     tamanho=settings.POSTS_POR_PAGINA)
+    return render(request, 'blog/post_list.html', {
+        'posts': pagina.itens,
+        'next_cursor': pagina.proximo,
+        'prev_cursor': pagina.anterior,
+    })
+
+# Os feeds mudam junto com a listagem e usam o mesmo grupo e validadores.
+post_feed_rss = condicional(etag_func=_post_list_etag, last_modified_func=_post_list_last_modified)(
+    cache_pagina(GRUPO_LISTA, timeout=_ate_proxima_publicacao)(UltimosPostsRss())
+)
+post_feed_atom = condicional(etag_func=_post_list_etag, last_modified_func=_post_list_last_modified)(
+    cache_pagina(GRUPO_LISTA, timeout=_ate_proxima_publicacao)(UltimosPostsAtom())
+)
+
+@condicional(etag_func=_post_etag, last_modified_func=_post_last_modified)
+@cache_pagina(lambda request, pk: grupo_post(pk))
+async def post_detail(request, pk):
+    post = await aget_object_or_404(Post.objects.defer('resumo', 'texto_plano'), pk=pk)
     return render(request, 'blog/post_detail.html', {'post': post})
 
-def login_view(request):
+async def login_view(request):
     if request.method == "POST":
         username = request.POST['username']
         password = request.POST['password']
-        user = authenticate(request, username=username, password=password)
+        espera = await limites.aregistrar_tentativa(request, username)
+        if espera is not None:
+            # Recusada antes do authenticate(), sem calcular o hash da senha.
+            response = render(request, 'blog/login.html', {
+                'error': 'Muitas tentativas de login. Tente novamente em alguns minutos.',
+            }, status=429)
+            response['Retry-After'] = str(espera)
+            return response
+        user = await aauthenticate(request, username=username, password=password)
         if user is not None:
-            login(request, user)
+            await limites.aregistrar_sucesso(request, username)
+            await alogin(request, user)
             return redirect('painel')
         else:
             return render(request, 'blog/login.html', {'error': 'Usuário ou Senha inválidas'})
@@ -39,6 +143,12 @@ def logout_view(request):
     logout(request)
     return redirect('login')
 
+def _descartar_rascunho(request):
+    # O rascunho do autosave não serve mais depois que o post é salvo.
+    rascunho = request.POST.get('rascunho', '')
+    if rascunho.isdigit():
+        Rascunho.objects.filter(pk=rascunho, autor=request.user).delete()
+
 @login_required
 def criar_post(request):
     if request.method == 'POST':
@@ -48,24 +158,39 @@ def criar_post(request):
             post.autor = request.user
             post.publicado_em = timezone.now()
             post.titulo = request.POST.get('titulo', 'Sem Título')
-            post.save()
+            # O post e a sua revisão são gravados juntos, ou nenhum dos dois.
+            with transaction.atomic():
+                post.save()
+                registrar_revisao(post, request.user)
+            _descartar_rascunho(request)
             return redirect('post_list')  # Redirecione para a lista de posts após a criação
     else:
         form = PostForm()
     return render(request, 'blog/criar.html', {'form': form})
 
+@login_required
+def post_json(request, pk):
+    post = get_object_or_404(Post.objects.only('id', 'titulo', 'texto'), pk=pk)
+    return JsonResponse({'id': post.pk, 'titulo': post.titulo, 'texto': post.texto})
+
 @login_required
 def editar(request):
-    posts = Post.objects.all().order_by('-publicado_em')
+    # O texto de cada post é carregado sob demanda via post_json.
+    posts = Post.objects.only('id', 'titulo').order_by('-publicado_em')
 
     if request.method == 'POST':
         post_id = request.POST.get('post_id')
         post = get_object_or_404(Post, pk=post_id)
+        # Antes do form, que altera a instância ao validar.
+        garantir_revisao_inicial(post)
         form = PostForm(request.POST, instance=post)
         if form.is_valid():
             post = form.save(commit=False)
             post.publicado_em = timezone.now()  # Atualiza a data de publicação
-            post.save()
+            with transaction.atomic():
+                post.save()
+                registrar_revisao(post, request.user)
+            _descartar_rascunho(request)
             return redirect('post_list')  # Redireciona para a lista de posts após a edição
     else:
         form = PostForm()
@@ -73,13 +198,262 @@ def editar(request):
     return render(request, 'blog/editar.html', {'posts': posts, 'form': form})
 
 
+@login_required
+@require_POST
+def rascunho_salvar(request):
+    """
+    Autosave do editor, em JSON: ``{"rascunho": 1, "versao": 3, "delta": [...],
+    "titulo": "..."}``, com o Delta das mudanças feitas sobre ``versao``.
+    Sem ``rascunho``, cria um rascunho a partir do delta (do ``post``
+    informado, na edição). Com ``"substituir": true``, o delta é o
+    documento inteiro, para o editor se recuperar de um conflito.
+    """
+    try:
+        dados = json.loads(request.body)
+        delta = dados['delta']
+        titulo = dados.get('titulo')
+        if titulo is not None:
+            titulo = str(titulo)[:200]
+        if dados.get('rascunho') is None:
+            post = None
+            if dados.get('post') is not None:
+                post = get_object_or_404(Post.objects.only('id'), pk=int(dados['post']))
+            rascunho = criar_rascunho(request.user, delta, titulo or '', post)
+            return JsonResponse({'rascunho': rascunho.pk, 'versao': rascunho.versao}, status=201)
+        rascunho_id = int(dados['rascunho'])
+        versao = salvar_rascunho(rascunho_id, request.user, int(dados['versao']), delta,
+                                 titulo, substituir=bool(dados.get('substituir')))
+    except ConflitoDeVersao as conflito:
+        return JsonResponse({'erro': str(conflito), 'versao': conflito.versao}, status=409)
+    except Rascunho.DoesNotExist:
+        return JsonResponse({'erro': 'Rascunho não encontrado.'}, status=404)
+    except (ValueError, TypeError, KeyError) as erro:
+        return JsonResponse({'erro': str(erro) if isinstance(erro, DeltaInvalido) else 'Dados inválidos.'},
+                            status=400)
+    return JsonResponse({'rascunho': rascunho_id, 'versao': versao})
+
+
+@login_required
+def rascunho_detalhe(request, pk):
+    # A mesma trava do compactar: sem ela, uma compactação entre a leitura do
+    # rascunho e a dos deltas apagaria deltas que o conteúdo lido não tem.
+    with transaction.atomic():
+        rascunho = get_object_or_404(Rascunho.objects.select_for_update(), pk=pk, autor=request.user)
+        delta = documento(rascunho)
+    return JsonResponse({
+        'rascunho': rascunho.pk,
+        'post': rascunho.post_id,
+        'versao': rascunho.versao,
+        'titulo': rascunho.titulo,
+        'delta': delta,
+        'atualizado_em': rascunho.atualizado_em.isoformat(),
+    })
+
+
+@login_required
+def post_revisoes(request, pk):
+    post = get_object_or_404(Post.objects.only('id', 'titulo'), pk=pk)
+    revisoes = post.revisoes.defer('dados').select_related('autor').order_by('-numero')
+    paginator = Paginator(revisoes, settings.POSTS_POR_PAGINA_PAINEL)
+    page = paginator.get_page(request.GET.get('page'))
+    selecionada = texto = None
+    numero = request.GET.get('revisao', '')
+    if numero.isdigit():
+        selecionada = get_object_or_404(revisoes, numero=numero)
+        texto = texto_da_revisao(selecionada)
+    resumo = relatorio(posts=[post.pk])
+    return render(request, 'blog/revisoes.html', {
+        'post': post, 'revisoes': page, 'selecionada': selecionada, 'texto': texto,
+        'resumo': resumo[0] if resumo else None,
+    })
+
+
+@login_required
+@require_POST
+def post_revisao_restaurar(request, pk, numero):
+    revisao = get_object_or_404(Revisao.objects.defer('dados'), post_id=pk, numero=numero)
+    post = get_object_or_404(Post, pk=pk)
+    post.titulo = revisao.titulo
+    post.texto = texto_da_revisao(revisao)
+    with transaction.atomic():
+        post.save()
+        # A restauração vira uma revisão nova; o histórico não é reescrito.
+        registrar_revisao(post, request.user)
+    return redirect(f"{reverse('post_revisoes', args=[pk])}?revisao={numero}")
+
+
 @login_required
 def deletar(request):
     if request.method == 'POST':
-        post_id = request.POST.get('post_id')
-        post = get_object_or_404(Post, pk=post_id)
-        post.delete()
+        post_ids = [pk for pk in request.POST.getlist('post_ids') if pk.isdigit()]
+        if post_ids:
+            # Exclusão em massa: um único DELETE para todos os selecionados.
+            with transaction.atomic():
+                Post.objects.filter(pk__in=post_ids).only('id').delete()
+        else:
+            post_id = request.POST.get('post_id')
+            post = get_object_or_404(Post, pk=post_id)
+            post.delete()
         return redirect('deletar')  # Substitua pelo nome da sua view de listagem
 
-    posts = Post.objects.all()
-    return render(request, 'blog/deletar.html', {'posts': posts, 'n_posts': len(posts)})
+    posts = Post.objects.only('id', 'titulo', 'publicado_em').order_by('-publicado_em', '-id')
+    paginator = Paginator(posts, settings.POSTS_POR_PAGINA_PAINEL)
+    page = paginator.get_page(request.GET.get('page'))
+    return render(request, 'blog/deletar.html', {'posts': page, 'n_posts': paginator.count})
+
+
+def _filtros_questao(request):
+    """Filtros de vestibular/tema/ano vindos da query string."""
+    filtros = {}
+    for campo in ('vestibular', 'tema', 'ano'):
+        valor = request.GET.get(campo, '')
+        if valor.isdigit():
+            filtros[campo] = valor
+    return filtros
+
+def _questao_json(questao):
+    return {
+        'id': questao.pk,
+        'enunciado': questao.enunciado,
+        'alternativas': questao.alternativas,
+        'ano': questao.ano,
+        'vestibular': questao.vestibular.nome,
+        'tema': questao.tema.nome,
+    }
+
+def questao_busca(request):
+    try:
+        limite = min(int(request.GET.get('limite', 20)), BUSCA_LIMITE_MAXIMO)
+    except ValueError:
+        limite = 20
+    questoes = buscar_questoes(request.GET.get('q', ''), **_filtros_questao(request))
+    resultados = []
+    for questao in questoes[:max(limite, 1)]:
+        dados = _questao_json(questao)
+        dados['relevancia'] = questao.relevancia
+        resultados.append(dados)
+    return JsonResponse({'resultados': resultados})
+
+def _pagina_questoes(request, filtros):
+    questoes = Questao.objects.select_related('vestibular', 'tema').filtrar(**filtros)
+    return paginar(questoes, ('id',),
+                   depois=request.GET.get('depois'),
+                   antes=request.GET.get('antes'),
+                   tamanho=settings.QUESTOES_POR_PAGINA)
+
+def questao_list(request):
+    filtros = _filtros_questao(request)
+    pagina = _pagina_questoes(request, filtros)
+    return render(request, 'blog/questao_list.html', {
+        'questoes': pagina.itens,
+        'next_cursor': pagina.proximo,
+        'prev_cursor': pagina.anterior,
+        'filtros': filtros,
+        'filtros_qs': urlencode(filtros),
+        'vestibulares': list(Vestibular.objects.order_by('nome')),
+        'temas': list(Tema.objects.order_by('nome')),
+    })
+
+def questao_list_json(request):
+    pagina = _pagina_questoes(request, _filtros_questao(request))
+    return JsonResponse({
+        'resultados': [_questao_json(questao) for questao in pagina],
+        'next_cursor': pagina.proximo,
+        'prev_cursor': pagina.anterior,
+    })
+
+def _simulado(request):
+    """Questões sorteadas conforme a query string, e os parâmetros usados."""
+    filtros = _filtros_questao(request)
+    filtros.pop('tema', None)
+    temas = [int(tema) for tema in request.GET.getlist('tema') if tema.isdigit()]
+    # Só as contagens: as listas de ids são lidas depois, e só dos temas sorteados.
+    disponiveis = {tema: quantidade for tema, quantidade in contagem_por_tema(**filtros).items()
+                   if not temas or tema in temas}
+    distribuicao = request.GET.get('distribuicao')
+    if distribuicao not in DISTRIBUICOES:
+        distribuicao = DISTRIBUICOES[0]
+    try:
+        por_tema = int(request.GET.get('por_tema', 0))
+    except ValueError:
+        por_tema = 0
+    try:
+        quantidade = int(request.GET.get('quantidade', 10))
+    except ValueError:
+        quantidade = 10
+
+    if por_tema > 0:
+        # N por tema, respeitando o limite total do simulado.
+        disponiveis = {tema: min(por_tema, n) for tema, n in disponiveis.items()}
+        quantidade = SIMULADO_MAXIMO
+    cotas = distribuir(max(0, min(quantidade, SIMULADO_MAXIMO)), disponiveis, distribuicao)
+    parametros = {**filtros, 'temas': temas, 'quantidade': quantidade,
+                  'por_tema': por_tema, 'distribuicao': distribuicao}
+    return sortear(cotas, **filtros), parametros
+
+def questao_simulado(request):
+    questoes, parametros = _simulado(request)
+    return render(request, 'blog/simulado.html', {
+        'questoes': questoes,
+        'parametros': parametros,
+        'distribuicoes': DISTRIBUICOES,
+        'vestibulares': list(Vestibular.objects.order_by('nome')),
+        'temas': list(Tema.objects.order_by('nome')),
+    })
+
+def questao_simulado_json(request):
+    questoes, _ = _simulado(request)
+    return JsonResponse({'resultados': [_questao_json(questao) for questao in questoes]})
+
+@require_POST
+def questao_responder(request):
+    """
+    Recebe um lote de respostas em JSON:
+    ``{"respostas": [{"questao": 1, "resposta": "A"}, ...]}``.
+    """
+    try:
+        respostas = [(int(item['questao']), str(item['resposta'])[:200])
+                     for item in json.loads(request.body)['respostas']]
+    except (ValueError, TypeError, KeyError):
+        return JsonResponse({'erro': 'Lote de respostas inválido.'}, status=400)
+    if len(respostas) > SIMULADO_MAXIMO:
+        return JsonResponse({'erro': f'Envie no máximo {SIMULADO_MAXIMO} respostas por vez.'}, status=400)
+    tentativas = registrar_respostas(respostas, usuario=request.user)
+    return JsonResponse({
+        'resultados': [{'questao': t.questao_id, 'correta': t.correta} for t in tentativas],
+        'acertos': sum(t.correta for t in tentativas),
+        'total': len(tentativas),
+    })
+
+@login_required
+def questao_exportar(request):
+    """Banco de questões, filtrado como a listagem, em JSONL, CSV ou ZIP com as imagens."""
+    formato = request.GET.get('formato', 'jsonl')
+    if formato not in exportacao.FORMATOS:
+        return JsonResponse({'erro': 'Formato inválido.'}, status=400)
+    # Sob ASGI um gerador síncrono seria lido inteiro antes do envio.
+    exportar = exportacao.aexportar if isinstance(request, ASGIRequest) else exportacao.exportar
+    response = StreamingHttpResponse(exportar(formato, _filtros_questao(request)),
+                                     content_type=exportacao.TIPOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="questoes.{formato}"'
+    return response
+
+def questao_estatisticas(request):
+    """Contadores já agregados por questão, tema ou vestibular (ou do próprio usuário)."""
+    tipo = request.GET.get('tipo', Estatistica.Tipo.TEMA)
+    if tipo not in Estatistica.Tipo.values:
+        return JsonResponse({'erro': 'Tipo inválido.'}, status=400)
+    estatisticas = Estatistica.objects.filter(tipo=tipo).order_by('chave')
+    if tipo == Estatistica.Tipo.USUARIO:
+        if not request.user.is_authenticated:
+            return JsonResponse({'erro': 'Faça login para ver as suas estatísticas.'}, status=403)
+        estatisticas = estatisticas.filter(chave=request.user.pk)
+    ids = [int(chave) for chave in request.GET.getlist('id') if chave.isdigit()]
+    if ids:
+        estatisticas = estatisticas.filter(chave__in=ids)
+    return JsonResponse({'resultados': [{
+        'id': estatistica.chave,
+        'tentativas': estatistica.tentativas,
+        'acertos': estatistica.acertos,
+        'taxa_de_acerto': round(estatistica.taxa_de_acerto, 4),
+    } for estatistica in estatisticas[:ESTATISTICAS_LIMITE]]})
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+# Lido nas settings: sob ASGI as conexões persistentes ficam desligadas.
+os.environ.setdefault('SERVIDOR_ASGI', 'True')
 
 application = get_asgi_application()
@@ -49,13 +49,17 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    # Antes do staticfiles, para o collectstatic do blog substituir o original.
     'blog',
+    'django.contrib.staticfiles',
     'django_quill',
 ]
 
 MIDDLEWARE = [
+    # Primeiro, para medir a pilha inteira; só fica ativo com INSTRUMENTACAO.
+    'blog.middleware.InstrumentacaoMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.WhiteNoiseAssincrono',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -92,6 +96,58 @@ DATABASES = {
     'default': env.db()
 }
 
+# Conexões persistentes no WSGI: cada thread do servidor reaproveita a sua
+# entre requisições, testando-a antes do reuso. Sob ASGI (mysite/asgi.py
+# define SERVIDOR_ASGI) a conexão também pertence à thread que a abriu, mas
+# as requisições não passam sempre pelas mesmas threads: as conexões se
+# acumulariam em vez de serem reaproveitadas, e a documentação do Django
+# pede para desligá-las no modo async. Lá o padrão é fechar a cada requisição; para reaproveitar, use um
+# pooler externo (PgBouncer, em modo transaction) na DATABASE_URL. Valores
+# na DATABASE_URL (?conn_max_age=...) têm precedência. O SQLite, usado
+# localmente e nos testes, continua abrindo uma conexão por requisição.
+SERVIDOR_ASGI = env.bool('SERVIDOR_ASGI', default=False)
+if DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault(
+        'CONN_MAX_AGE', env.int('DB_CONN_MAX_AGE', default=0 if SERVIDOR_ASGI else 60))
+    DATABASES['default'].setdefault('CONN_HEALTH_CHECKS', env.bool('DB_CONN_HEALTH_CHECKS', default=True))
+    DATABASES['default'].setdefault('OPTIONS', {}).setdefault(
+        'connect_timeout', env.int('DB_CONNECT_TIMEOUT', default=5))
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Tempo máximo (segundos) que post_list e post_detail ficam em cache.
+CACHE_PAGINAS_TIMEOUT = env.int('CACHE_PAGINAS_TIMEOUT', default=600)
+
+
+# Sessões e autenticação
+# https://docs.djangoproject.com/en/5.0/topics/http/sessions/
+
+# 'cached_db' lê a sessão do cache e só grava no banco; 'signed_cookies'
+# guarda a sessão no próprio cookie (sem banco, mas sem como revogá-la no
+# servidor); 'db' é o padrão do Django.
+SESSOES = env('SESSOES', default='cached_db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSOES]
+
+AUTHENTICATION_BACKENDS = [
+    'blog.autenticacao.BackendComCache',
+    # As sessões criadas antes do BackendComCache guardam o caminho deste; sem
+    # ele na lista, todos os usuários seriam deslogados no deploy.
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Segundos que o usuário da sessão fica na memória de cada processo
+# (blog.autenticacao); 0 desliga.
+CACHE_USUARIOS_TIMEOUT = env.int('CACHE_USUARIOS_TIMEOUT', default=30)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -133,6 +189,17 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'blog/static'),
 ]
 
+# Nomes com hash e .gz/.br gerados no collectstatic; o WhiteNoise serve os
+# arquivos com hash com cache de um ano (immutable).
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'blog.storage.StaticComprimido',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -159,6 +226,10 @@ QUILL_CONFIGS = {
     }
 }
 
+POSTS_POR_PAGINA = env.int('POSTS_POR_PAGINA', default=10)
+POSTS_POR_PAGINA_PAINEL = env.int('POSTS_POR_PAGINA_PAINEL', default=50)
+QUESTOES_POR_PAGINA = env.int('QUESTOES_POR_PAGINA', default=20)
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'painel'
 LOGOUT_REDIRECT_URL = 'login'
@@ -169,4 +240,19 @@ X_FRAME_OPTIONS = 'SAMEORIGIN'  # Permite que a página seja exibida em um ifram
 
 # media files
 MEDIA_ROOT =  os.path.join(BASE_DIR, 'media')
-MEDIA_URL = '/media/'
\ No newline at end of file
+MEDIA_URL = '/media/'
+
+# Geração das variantes das imagens das questões (blog.imagens).
+IMAGENS_ASSINCRONO = env.bool('IMAGENS_ASSINCRONO', default=True)
+IMAGENS_WORKERS = env.int('IMAGENS_WORKERS', default=2)
+
+# Métricas por requisição (blog.middleware.InstrumentacaoMiddleware).
+INSTRUMENTACAO = env.bool('INSTRUMENTACAO', default=False)
+INSTRUMENTACAO_LIMITE_MS = env.int('INSTRUMENTACAO_LIMITE_MS', default=500)
+INSTRUMENTACAO_LIMITE_CONSULTAS = env.int('INSTRUMENTACAO_LIMITE_CONSULTAS', default=30)
+
+# Limite de tentativas de login (blog.limites), em uma janela deslizante de
+# LOGIN_JANELA segundos, por IP e por nome de usuário.
+LOGIN_JANELA = env.int('LOGIN_JANELA', default=300)
+LOGIN_LIMITE_IP = env.int('LOGIN_LIMITE_IP', default=20)
+LOGIN_LIMITE_USUARIO = env.int('LOGIN_LIMITE_USUARIO', default=5)